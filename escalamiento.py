@@ -0,0 +1,223 @@
+#   COMPILADOR LITTLE DUCK - REPORTE DE ESCALAMIENTO
+#   Compila y ejecuta programas generados de tamaño N creciente, mide cada fase
+#   (léxico, parser, semántica, código, guardado y ejecución en la VM) y marca las
+#   que crecen más rápido que N.
+#
+#   Uso: python escalamiento.py [--eje=funciones,estatutos,...] [--tamanos=N,N,...] [--repeticiones=N]
+
+import contextlib
+import gc
+import math
+import os
+import sys
+import tempfile
+import time
+
+from main_virtual import (CompilationContext, SourceText, VirtualMachine, get_lexer, get_parser,
+                          check_program, generate_program, save_intermediate_code)
+from generador_programas import generar_programa
+
+###############################################################
+#              EJES DE CRECIMIENTO
+###############################################################
+
+# Cada eje hace crecer una dimensión del programa con el resto fijo. Las formas se
+# eligen para que el tamaño del programa crezca en proporción a N y quepan en los
+# segmentos de memoria (los temporales son del programa completo, 1000 por tipo): un
+# eje que llega a un límite se reporta como tal y no se mide con N mayores.
+AXES = {
+    'funciones': (lambda n: dict(functions=n, statements=10, depth=0, expression_length=1, recursion_depth=0),
+                  (250, 500, 1000, 2000)),
+    'estatutos': (lambda n: dict(functions=1, statements=n, depth=0, expression_length=1, recursion_depth=0),
+                  (1000, 2000, 4000, 8000)),
+    'variables': (lambda n: dict(functions=10, variables=n, depth=0, expression_length=1, recursion_depth=0),
+                  (200, 400, 800, 1600)),
+    'anidamiento': (lambda n: dict(functions=1, statements=2 * n + 2, depth=n, expression_length=1, recursion_depth=0),
+                    (25, 50, 100, 200)),
+    'expresion': (lambda n: dict(functions=0, statements=2, depth=0, expression_length=n, recursion_depth=0),
+                  (50, 100, 200, 400)),
+    'recursion': (lambda n: dict(functions=0, statements=0, depth=0, recursion_depth=n),
+                  (100, 200, 400, 800)),
+}
+
+PHASES = ('léxico', 'parser', 'semántica', 'código', 'guardado', 'VM')
+
+# Exponente de N a partir del cual una fase se marca como superlineal, y tiempo mínimo
+# para tomar en cuenta una medición (las más cortas son sobre todo ruido)
+SUPERLINEAR_EXPONENT = 1.2
+MIN_SECONDS = 0.001
+
+###############################################################
+#              MEDICIÓN
+###############################################################
+
+class TokenReplay:
+    """Entrega al parser tokens ya leídos, para medir el parser sin el lexer"""
+
+    def __init__(self, tokens_list):
+        self._tokens = iter(tokens_list)
+
+    def token(self):
+        return next(self._tokens, None)
+
+class PhaseLimit(Exception):
+    """Una fase no pudo con el programa (segmento de memoria o recursión de Python agotados)"""
+
+    def __init__(self, phase, error):
+        super().__init__(f"{phase}: {type(error).__name__}: {error}")
+
+def measure_phases(codigo, workdir):
+    """Compila y ejecuta codigo una vez; retorna ({fase: segundos}, tokens, cuádruplos).
+
+    Como timeit, mide con el recolector de basura apagado: una recolección completa
+    cuesta según todo lo que sigue vivo y cae en la fase que le toque, lo que vuelve
+    ruidosa la comparación entre tamaños."""
+    gc.collect()
+    gc.disable()
+    try:
+        return run_phases(codigo, workdir)
+    finally:
+        gc.enable()
+
+def run_phases(codigo, workdir):
+    ctx = CompilationContext(quiet=True)
+    ctx.source = SourceText(codigo)
+    times = {}
+    phase = 'léxico'
+    try:
+        start = time.perf_counter()
+        lexer = get_lexer(ctx)
+        lexer.input(codigo)
+        tokens_list = list(iter(lexer.token, None))
+        times['léxico'] = time.perf_counter() - start
+
+        phase = 'parser'
+        start = time.perf_counter()
+        program = get_parser(ctx).parse(lexer=TokenReplay(tokens_list))
+        times['parser'] = time.perf_counter() - start
+
+        phase = 'semántica'
+        start = time.perf_counter()
+        check_program(ctx, program)
+        times['semántica'] = time.perf_counter() - start
+        if ctx.diagnostics:
+            raise RuntimeError(f"El programa generado tiene errores: {ctx.diagnostics[0].message}")
+
+        phase = 'código'
+        start = time.perf_counter()
+        generate_program(ctx, program)
+        times['código'] = time.perf_counter() - start
+
+        phase = 'guardado'
+        start = time.perf_counter()
+        save_intermediate_code(os.path.join(workdir, 'programa.txt'), ctx)
+        times['guardado'] = time.perf_counter() - start
+
+        phase = 'VM'
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            virtual_machine = VirtualMachine()
+            virtual_machine.load_program(ctx.quadruples, ctx.constants_table, ctx.function_directory,
+                                         ctx.memory_manager.get_memory_usage())
+            success = virtual_machine.run()
+            times['VM'] = time.perf_counter() - start
+        if not success:
+            raise RuntimeError("El programa generado falló en la máquina virtual")
+    except (MemoryError, RecursionError) as e:
+        raise PhaseLimit(phase, e) from None
+    return times, len(tokens_list), len(ctx.quadruples)
+
+def growth_exponent(sizes, seconds):
+    """Pendiente de log(tiempo) contra log(N) por mínimos cuadrados (None si hay menos de dos puntos)"""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t >= MIN_SECONDS]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+###############################################################
+#              REPORTE
+###############################################################
+
+def medir_eje(name, sizes=None, repetitions=3):
+    """Mide un eje e imprime su tabla; retorna las fases que crecen más rápido que N"""
+    shape, default_sizes = AXES[name]
+    sizes = sorted(sizes or default_sizes)
+    print(f"\nEje: {name}")
+    print(f"{'N':>7} {'tokens':>9} {'cuádruplos':>11}" + ''.join(f"{phase:>11}" for phase in PHASES))
+    measured = []
+    best = {phase: [] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            try:
+                codigo = generar_programa(**shape(n))
+            except (ValueError, RecursionError) as e:
+                print(f"{n:>7}  no se puede generar: {e}")
+                break
+            try:
+                runs = [measure_phases(codigo, workdir) for _ in range(repetitions)]
+            except PhaseLimit as e:
+                print(f"{n:>7}  límite alcanzado en {e}")
+                break
+            _, token_count, quad_count = runs[0]
+            measured.append(n)
+            row = f"{n:>7} {token_count:>9} {quad_count:>11}"
+            for phase in PHASES:
+                seconds = min(times[phase] for times, _, _ in runs)
+                best[phase].append(seconds)
+                row += f"{seconds * 1000:>9.1f}ms"
+            print(row)
+    superlinear = []
+    row = f"{'N^k':>7} {'':>9} {'':>11}"
+    for phase in PHASES:
+        exponent = growth_exponent(measured, best[phase])
+        row += f"{'-' if exponent is None else f'{exponent:.2f}':>11}"
+        if exponent is not None and exponent > SUPERLINEAR_EXPONENT:
+            superlinear.append((phase, exponent))
+    print(row)
+    for phase, exponent in superlinear:
+        print(f"⚠️  {name}: la fase '{phase}' crece como N^{exponent:.2f} (más rápido que lineal)")
+    return superlinear
+
+if __name__ == "__main__":
+    ejes = list(AXES)
+    tamanos = None
+    repeticiones = 3
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        try:
+            if opcion == '--eje':
+                ejes = [eje for eje in valor.split(',') if eje]
+                desconocidos = [eje for eje in ejes if eje not in AXES]
+                if desconocidos:
+                    raise ValueError(f"eje desconocido '{desconocidos[0]}' (ejes: {', '.join(AXES)})")
+            elif opcion == '--tamanos':
+                tamanos = [int(n) for n in valor.split(',') if n]
+                if any(n < 1 for n in tamanos):
+                    raise ValueError("--tamanos requiere enteros positivos")
+            elif opcion == '--repeticiones':
+                repeticiones = int(valor)
+                if repeticiones < 1:
+                    raise ValueError("--repeticiones requiere un entero positivo")
+            else:
+                raise ValueError(f"opción desconocida '{arg}'")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python escalamiento.py [--eje=funciones,estatutos,...] [--tamanos=N,N,...] [--repeticiones=N]",
+                  file=sys.stderr)
+            sys.exit(2)
+
+    print("="*70)
+    print("ESCALAMIENTO DEL COMPILADOR LITTLE DUCK (mejor de "
+          f"{repeticiones} {'repetición' if repeticiones == 1 else 'repeticiones'}, tiempos en ms)")
+    print("="*70)
+    marcadas = []
+    for eje in ejes:
+        marcadas.extend(medir_eje(eje, tamanos, repeticiones))
+    print()
+    if marcadas:
+        print(f"⚠️  {len(marcadas)} fases crecen más rápido que lineal")
+        sys.exit(1)
+    print("✅ Todas las fases crecen de forma lineal o menor")
@@ -0,0 +1,230 @@
+#   COMPILADOR LITTLE DUCK - GENERADOR DE PROGRAMAS
+#   Programas válidos y de tamaño controlado para medir el compilador y la máquina
+#   virtual: número de funciones, variables por scope, estatutos, profundidad de
+#   anidamiento, longitud de las expresiones y profundidad de la recursión.
+#
+#   Uso: python generador_programas.py [--funciones=N] [--variables=N] [--estatutos=N]
+#        [--anidamiento=N] [--expresion=N] [--recursion=N] [--semilla=N] > programa.txt
+
+import random
+import sys
+
+###############################################################
+#              FORMA DE LOS PROGRAMAS
+###############################################################
+
+# Los programas terminan y no tienen errores en tiempo de ejecución:
+# - Cada ciclo usa su propio contador (k0, k1, ...) y da LOOP_ITERATIONS vueltas; a
+#   partir de MAX_LOOP_NESTING niveles de ciclos el anidamiento sigue solo con if.
+# - Las funciones impares llaman solo a funciones pares anteriores, que no llaman a
+#   nadie, y main llama a cada función una vez: la ejecución crece linealmente.
+# - Una expresión tiene una sola variable y el resto constantes, así los valores
+#   crecen de forma lineal (sin enteros enormes que distorsionen las mediciones), y
+#   solo divide entre constantes distintas de cero.
+# - Las constantes salen de conjuntos pequeños para no agotar su segmento de memoria.
+
+LOOP_ITERATIONS = 2
+MAX_LOOP_NESTING = 2
+# La VM permite 1000 llamadas anidadas; recursiva(n) hace n + 1
+MAX_RECURSION_DEPTH = 999
+
+# Tipo de la k-ésima variable de cada scope: la mitad enteras
+_VARIABLE_TYPES = ('int', 'int', 'float', 'string')
+_STRINGS = tuple(f'"texto {i}"' for i in range(8))
+_FLOATS = ('0.5', '1.5', '2.25', '3.75')
+_RELOPS = ('>', '<', '>=', '<=', '==', '!=')
+
+def scope_variables(prefix, count):
+    """Nombres de las variables de un scope agrupados por tipo"""
+    names = {'int': [], 'float': [], 'string': []}
+    for k in range(count):
+        names[_VARIABLE_TYPES[k % len(_VARIABLE_TYPES)]].append(f'{prefix}{k}')
+    return names
+
+def declare(names, counters):
+    """Línea de declaración 'var' de un scope (con los contadores de ciclos entre los enteros)"""
+    groups = [f"{', '.join(names['int'] + counters)} : int;"]
+    groups.extend(f"{', '.join(names[var_type])} : {var_type};"
+                  for var_type in ('float', 'string') if names[var_type])
+    return 'var ' + '\n    '.join(groups)
+
+def function_params(index):
+    """Parámetros de la función index: de 0 a 2, enteros y flotantes alternados"""
+    return [(f'p{j}', 'int' if j % 2 == 0 else 'float') for j in range(index % 3)]
+
+class ProgramGenerator:
+    """Escribe un programa con la forma pedida; la misma semilla da el mismo programa"""
+
+    def __init__(self, functions, variables, statements, depth, expression_length, recursion_depth, seed):
+        self.functions = functions
+        self.variables = variables
+        self.statements = statements
+        self.depth = depth
+        self.expression_length = expression_length
+        self.recursion_depth = recursion_depth
+        self.random = random.Random(seed)
+        self.counters = [f'k{level}' for level in range(min(depth, MAX_LOOP_NESTING))]
+        self.lines = []
+
+    def emit(self, level, text):
+        self.lines.append('  ' * level + text)
+
+    def generate(self):
+        globals_ = scope_variables('g', self.variables)
+        self.emit(0, 'program sintetico;')
+        self.emit(0, declare(globals_, self.counters))
+        self.emit(0, '')
+        for index in range(self.functions):
+            self.function(index)
+        if self.recursion_depth > 0:
+            self.emit(0, 'void recursiva(n : int)')
+            self.emit(0, '[ {')
+            self.emit(2, 'if (n > 0) {')
+            self.emit(3, 'recursiva(n - 1);')
+            self.emit(2, '};')
+            self.emit(1, '}')
+            self.emit(0, '];')
+            self.emit(0, '')
+        self.emit(0, 'main {')
+        self.block(globals_, [], self.statements, 1, 0, 0)
+        for index in range(self.functions):
+            self.emit(1, self.call(globals_, index))
+        if self.recursion_depth > 0:
+            self.emit(1, f'recursiva({self.recursion_depth});')
+        self.emit(1, f"print({', '.join(globals_['int'][:3])});")
+        self.emit(0, '}')
+        self.emit(0, 'end')
+        return '\n'.join(self.lines) + '\n'
+
+    def function(self, index):
+        params = function_params(index)
+        names = scope_variables('v', self.variables)
+        for name, param_type in params:
+            names[param_type].append(name)
+        # Solo las funciones impares llaman, y solo a pares anteriores (que no llaman a nadie)
+        callees = list(range(0, index, 2))[-8:] if index % 2 == 1 else []
+        self.emit(0, f"void f{index}({', '.join(f'{name} : {param_type}' for name, param_type in params)})")
+        self.emit(0, '[ ' + declare(scope_variables('v', self.variables), self.counters))
+        self.emit(1, '{')
+        self.block(names, callees, self.statements, 2, 0, 0)
+        self.emit(1, '}')
+        self.emit(0, '];')
+        self.emit(0, '')
+
+    def block(self, names, callees, budget, indent, level, loops):
+        """Emite budget estatutos (los anidados cuentan); el primero llega a la profundidad máxima"""
+        first = True
+        while budget > 0:
+            budget -= 1
+            if level < self.depth and budget > 0 and (first or self.random.random() < 0.2):
+                inner = max(1, budget - 1) if first else self.random.randint(1, min(3, budget))
+                budget -= inner
+                self.compound(names, callees, inner, indent, level, loops)
+            else:
+                self.simple(names, callees, indent)
+            first = False
+
+    def compound(self, names, callees, budget, indent, level, loops):
+        kind = self.random.choice(('if', 'if_else', 'while', 'do') if loops < MAX_LOOP_NESTING else ('if', 'if_else'))
+        if kind in ('while', 'do'):
+            counter = self.counters[loops]
+            self.emit(indent, f'{counter} = 0;')
+            condition = f'{counter} < {LOOP_ITERATIONS}'
+            self.emit(indent, f'while ({condition}) {{' if kind == 'while' else 'do {')
+            self.block(names, callees, budget, indent + 1, level + 1, loops + 1)
+            self.emit(indent + 1, f'{counter} = {counter} + 1;')
+            self.emit(indent, '};' if kind == 'while' else f'}} while ({condition});')
+            return
+        variable = self.random.choice(names['int'])
+        relop = self.random.choice(_RELOPS)
+        self.emit(indent, f'if ({variable} {relop} {self.random.randint(0, 9)}) {{')
+        if kind == 'if':
+            self.block(names, callees, budget, indent + 1, level + 1, loops)
+        else:
+            then_budget = (budget + 1) // 2
+            self.block(names, callees, then_budget, indent + 1, level + 1, loops)
+            self.emit(indent, '} else {')
+            self.block(names, callees, max(1, budget - then_budget), indent + 1, level + 1, loops)
+        self.emit(indent, '};')
+
+    def simple(self, names, callees, indent):
+        choice = self.random.random()
+        if choice < 0.15 and callees:
+            self.emit(indent, self.call(names, self.random.choice(callees)))
+        elif choice < 0.3:
+            args = [self.random.choice(_STRINGS)] + self.random.sample(names['int'], min(2, len(names['int'])))
+            self.emit(indent, f"print({', '.join(args)});")
+        elif choice < 0.4 and names['string']:
+            self.emit(indent, f"{self.random.choice(names['string'])} = {self.random.choice(_STRINGS)};")
+        elif choice < 0.6 and names['float']:
+            self.emit(indent, f"{self.random.choice(names['float'])} = {self.expression(names, True)};")
+        else:
+            self.emit(indent, f"{self.random.choice(names['int'])} = {self.expression(names, False)};")
+
+    def expression(self, names, floating):
+        """Una variable seguida de expression_length - 1 constantes; a veces con paréntesis"""
+        operands = [self.random.choice(names['int'] + (names['float'] if floating else []))]
+        operators = ('+', '-', '*', '/') if floating else ('+', '-')
+        for _ in range(self.expression_length - 1):
+            operator = self.random.choice(operators)
+            constant = self.random.choice(_FLOATS) if floating and operator != '/' else str(self.random.randint(1, 9))
+            if len(operands) > 1 and self.random.random() < 0.2:
+                operands = ['(' + ' '.join(operands) + ')']
+            operands.extend((operator, constant))
+        return ' '.join(operands)
+
+    def call(self, names, index):
+        args = []
+        for _, param_type in function_params(index):
+            pool = names['int'] + (names['float'] if param_type == 'float' else [])
+            args.append(self.random.choice(pool) if self.random.random() < 0.5 else str(self.random.randint(0, 9)))
+        return f"f{index}({', '.join(args)});"
+
+###############################################################
+#              FUNCIÓN PRINCIPAL
+###############################################################
+
+def generar_programa(functions=10, variables=4, statements=10, depth=2, expression_length=3,
+                     recursion_depth=10, seed=0):
+    """Retorna el código fuente de un programa Little Duck válido con la forma indicada.
+
+    statements cuenta los estatutos de cada función y de main, incluidos los anidados;
+    depth es la profundidad máxima de anidamiento (la alcanza el primer estatuto de cada
+    cuerpo si statements lo permite) y expression_length el número de operandos de cada
+    expresión asignada."""
+    if variables < 1 or statements < 0 or functions < 0 or depth < 0 or expression_length < 1:
+        raise ValueError("Se requieren variables >= 1, expression_length >= 1 y los demás parámetros >= 0")
+    if not 0 <= recursion_depth <= MAX_RECURSION_DEPTH:
+        raise ValueError(f"recursion_depth debe estar entre 0 y {MAX_RECURSION_DEPTH}")
+    return ProgramGenerator(functions, variables, statements, depth, expression_length,
+                            recursion_depth, seed).generate()
+
+# Opción de la línea de comandos -> parámetro de generar_programa
+OPTIONS = {
+    '--funciones': 'functions',
+    '--variables': 'variables',
+    '--estatutos': 'statements',
+    '--anidamiento': 'depth',
+    '--expresion': 'expression_length',
+    '--recursion': 'recursion_depth',
+    '--semilla': 'seed',
+}
+
+if __name__ == "__main__":
+    parametros = {}
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        if opcion not in OPTIONS:
+            print(f"ERROR: opción desconocida '{arg}'", file=sys.stderr)
+            print("Uso: python generador_programas.py [" + "=N] [".join(OPTIONS) + "=N]", file=sys.stderr)
+            sys.exit(2)
+        try:
+            parametros[OPTIONS[opcion]] = int(valor)
+        except ValueError:
+            print(f"ERROR: {opcion} requiere un entero", file=sys.stderr)
+            sys.exit(2)
+    try:
+        sys.stdout.write(generar_programa(**parametros))
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,395 @@
+#   COMPILADOR LITTLE DUCK - NÚCLEO LÉXICO Y GRAMATICAL
+#   Tokens, reglas del lexer, precedencia y cubo semántico compartidos por los front-ends
+#   (main_virtual, main_improved, main_semantico y semantica).
+#   Las tablas del lexer y del parser LALR se construyen o cargan una sola
+#   vez por proceso; cada front-end solo define sus producciones p_*.
+
+import ply.lex as lex
+import ply.yacc as yacc
+import os
+import sys
+import threading
+
+###############################################################
+#                    ANÁLISIS LÉXICO
+###############################################################
+
+# Palabras reservadas
+reserved = {
+    'program': 'PROGRAM',
+    'var': 'VAR',
+    'int': 'INT',
+    'float': 'FLOAT',
+    'void': 'VOID',
+    'if': 'IF',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'do': 'DO',
+    'print': 'PRINT',
+    'main': 'MAIN',
+    'end': 'END',
+    'string': 'STRING'
+}
+
+# Tokens
+tokens = [
+    'CONST_INT',
+    'CONST_FLOAT',
+    'CONST_STRING',
+    'ID',
+    'OP_ASIGNA',
+    'OP_SUMA',
+    'OP_RESTA',
+    'OP_MULT',
+    'OP_DIV',
+    'OP_EQ',
+    'OP_NEQ',
+    'OP_LEQ',
+    'OP_GEQ',
+    'OP_LT',
+    'OP_GT',
+    'LPAREN',
+    'RPAREN',
+    'LBRACE',
+    'RBRACE',
+    'LBRACK',
+    'RBRACK',
+    'COMMA',
+    'SEMICOL',
+    'COLON',
+] + list(reserved.values())
+
+t_ignore = ' \t\r'
+
+# Operadores
+t_OP_EQ = r'=='
+t_OP_NEQ = r'!='
+t_OP_LEQ = r'<='
+t_OP_GEQ = r'>='
+t_OP_LT = r'<'
+t_OP_GT = r'>'
+t_OP_ASIGNA = r'='
+t_OP_SUMA = r'\+'
+t_OP_RESTA = r'-'
+t_OP_MULT = r'\*'
+t_OP_DIV = r'/'
+
+# Delimitadores
+t_LPAREN = r'\('
+t_RPAREN = r'\)'
+t_LBRACE = r'\{'
+t_RBRACE = r'\}'
+t_LBRACK = r'\['
+t_RBRACK = r'\]'
+t_COMMA = r','
+t_SEMICOL = r';'
+t_COLON = r':'
+
+def t_COMMENT_BLOCK(t):
+    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
+    pass
+
+def t_COMMENT(t):
+    r'(//[^\n]*)|(\#[^\n]*)'
+    pass
+
+def t_newline(t):
+    r'\n+'
+    t.lexer.lineno += len(t.value)
+
+def t_CONST_FLOAT(t):
+    r'\d+\.\d+(?:[eE][\+\-]?\d+)?'
+    t.value = float(t.value)
+    return t
+
+def t_CONST_INT(t):
+    r'\d+'
+    t.value = int(t.value)
+    return t
+
+def t_CONST_STRING(t):
+    r'"([^"\\]|\\.)*"'
+    t.value = t.value[1:-1]
+    return t
+
+def t_ID(t):
+    r'[A-Za-z_][A-Za-z0-9_]*'
+    t.type = reserved.get(t.value, 'ID')
+    if t.type == 'ID':
+        # Internado: cada identificador es un único objeto str (hash y comparación por identidad)
+        t.value = sys.intern(t.value)
+    return t
+
+def t_error(t):
+    error_msg = f"ERROR LÉXICO en línea {t.lineno}: Carácter ilegal '{t.value[0]}'"
+    t.lexer.report_error(error_msg, t.lineno, t.lexpos)
+    t.lexer.skip(1)
+
+###############################################################
+#              PRECEDENCIA DE OPERADORES
+###############################################################
+
+# Cada front-end la importa junto con tokens para que yacc la encuentre en su módulo
+precedence = (
+    ('left', 'OP_EQ', 'OP_NEQ', 'OP_LT', 'OP_GT', 'OP_LEQ', 'OP_GEQ'), 
+    ('left', 'OP_SUMA', 'OP_RESTA'),
+    ('left', 'OP_MULT', 'OP_DIV'),
+)
+
+###############################################################
+#                    CUBO SEMÁNTICO
+###############################################################
+
+# Códigos enteros de tipos y operadores con los que se indexa el cubo
+TYPES = ('int', 'float', 'string', 'bool', 'error')
+INT, FLOAT, STRING, BOOL, ERROR = range(len(TYPES))
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+
+OPERATORS = ('+', '-', '*', '/', '>', '<', '>=', '<=', '==', '!=', '=')
+OPERATOR_CODES = {operator: code for code, operator in enumerate(OPERATORS)}
+
+# Definición única del cubo: {operador: {tipo izquierdo: {tipo derecho: resultado}}}
+_RELATIONAL = {
+    'int': {'int': 'bool', 'float': 'bool'},
+    'float': {'int': 'bool', 'float': 'bool'},
+    'string': {'string': 'bool'}
+}
+
+SEMANTIC_RULES = {
+    '+': {
+        'int': {'int': 'int', 'float': 'float'},
+        'float': {'int': 'float', 'float': 'float'},
+        'string': {'string': 'string', 'int': 'string', 'float': 'string'}
+    },
+    '-': {
+        'int': {'int': 'int', 'float': 'float'},
+        'float': {'int': 'float', 'float': 'float'}
+    },
+    '*': {
+        'int': {'int': 'int', 'float': 'float'},
+        'float': {'int': 'float', 'float': 'float'},
+        'string': {'int': 'string'}
+    },
+    '/': {
+        'int': {'int': 'float', 'float': 'float'},
+        'float': {'int': 'float', 'float': 'float'}
+    },
+    '>': _RELATIONAL,
+    '<': _RELATIONAL,
+    '>=': _RELATIONAL,
+    '<=': _RELATIONAL,
+    '==': _RELATIONAL,
+    '!=': _RELATIONAL,
+    '=': {
+        'int': {'int': 'int', 'float': 'error'},
+        'float': {'int': 'float', 'float': 'float'},
+        'string': {'string': 'string'}
+    }
+}
+
+def build_semantic_cube(overrides=None):
+    """Construye el cubo como tuplas anidadas: cube[operador][izquierdo][derecho] -> código o None.
+
+    overrides tiene la forma de SEMANTIC_RULES; un resultado None quita la combinación."""
+    cube = [[[None] * len(TYPES) for _ in TYPES] for _ in OPERATORS]
+    for rules in (SEMANTIC_RULES, overrides or {}):
+        for operator, left_types in rules.items():
+            for left, right_types in left_types.items():
+                for right, result in right_types.items():
+                    code = None if result is None else TYPE_CODES[result]
+                    cube[OPERATOR_CODES[operator]][TYPE_CODES[left]][TYPE_CODES[right]] = code
+    return tuple(tuple(tuple(row) for row in plane) for plane in cube)
+
+# Cubo del compilador (main_virtual); los demás front-ends declaran sus diferencias
+SEMANTIC_CUBE = build_semantic_cube()
+
+def semantic_result(cube, operator, type1, type2):
+    """Consulta el cubo con nombres de tipo; retorna el nombre del resultado o None"""
+    try:
+        result = cube[OPERATOR_CODES[operator]][TYPE_CODES[type1]][TYPE_CODES[type2]]
+    except (KeyError, TypeError):
+        return None  # Operador o tipo fuera del cubo
+    return None if result is None else TYPES[result]
+
+###############################################################
+#              CACHÉ DE TABLAS DEL LEXER Y DEL PARSER
+###############################################################
+
+# Directorio donde se guardan las tablas generadas por PLY.
+# Se puede redirigir con la variable de entorno LITTLE_DUCK_CACHE_DIR.
+TABLES_CACHE_DIR = os.environ.get(
+    'LITTLE_DUCK_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '__plycache__')
+)
+
+def _table_key(namespace, prefix):
+    """Hash de las reglas (prefijo t_ o p_) y de las definiciones de tokens"""
+    import hashlib  # Diferido: solo se necesita al construir el compilador
+    h = hashlib.sha256()
+    h.update(f"{lex.__version__}|{namespace['tokens']!r}|{reserved!r}".encode())
+    if prefix == 'p_':
+        h.update(f"{namespace['precedence']!r}|{namespace['start']!r}".encode())
+    else:
+        h.update(repr(namespace['t_ignore']).encode())
+
+    # Las reglas se recorren en orden de definición, que es el orden que usa PLY
+    rules = [(name, value) for name, value in namespace.items() if name.startswith(prefix)]
+    functions = sorted((value.__code__.co_firstlineno, name, value.__doc__)
+                       for name, value in rules if callable(value))
+    strings = sorted((name, value) for name, value in rules if isinstance(value, str))
+    for _, name, doc in functions:
+        h.update(f"{name}:{doc}\n".encode())
+    for name, value in strings:
+        h.update(f"{name}={value}\n".encode())
+    return h.hexdigest()[:16]
+
+def _table_path(module, kind, key, extension):
+    """Ruta del archivo de tablas para un módulo y una versión de su gramática"""
+    base = os.path.splitext(os.path.basename(module.__file__))[0]
+    return os.path.join(TABLES_CACHE_DIR, f"{base}_{kind}_{key}{extension}")
+
+def _temp_table_path(path):
+    """Ruta temporal (por proceso) donde se escribe una tabla antes de publicarla"""
+    stem, extension = os.path.splitext(path)
+    return f"{stem}_{os.getpid()}{extension}"
+
+def _ensure_cache_dir():
+    """Crea el directorio de caché; retorna False si no se puede escribir en él"""
+    try:
+        os.makedirs(TABLES_CACHE_DIR, exist_ok=True)
+        return os.access(TABLES_CACHE_DIR, os.W_OK)
+    except OSError:
+        return False
+
+def _publish_table(tmp_path, path):
+    """Publica atómicamente una tabla recién escrita y borra las de claves anteriores"""
+    try:
+        os.replace(tmp_path, path)
+        filename = os.path.basename(path)
+        stem, extension = os.path.splitext(filename)
+        prefix = stem[:stem.rindex('_') + 1]
+        for other in os.listdir(TABLES_CACHE_DIR):
+            if other != filename and other.startswith(prefix) and other.endswith(extension) \
+                    and len(other) == len(filename):
+                os.remove(os.path.join(TABLES_CACHE_DIR, other))
+    except OSError:
+        pass  # Otro proceso publicó o borró la tabla al mismo tiempo
+
+class _GrammarLogger(yacc.PlyLogger):
+    """Logger de yacc que omite los avisos de tokens sin usar.
+
+    Los tokens son comunes a todos los front-ends y cada gramática usa solo
+    un subconjunto (semantica.py no tiene funciones ni ciclos)."""
+
+    def warning(self, msg, *args, **kwargs):
+        if 'not used' in msg or 'unused token' in msg:
+            return
+        super().warning(msg, *args, **kwargs)
+
+def build_lexer():
+    """Construye el lexer reutilizando la tabla en disco si las reglas no cambiaron"""
+    module = sys.modules[__name__]
+    path = _table_path(module, 'lextab', _table_key(vars(module), 't_'), '.py')
+    if os.path.exists(path):
+        try:
+            import importlib.util  # Diferido: solo se necesita al cargar la tabla
+            spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+            lextab = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(lextab)
+            return lex.lex(module=module, optimize=True, lextab=lextab)
+        except Exception:
+            pass  # Tabla corrupta o de otra versión de PLY: se reconstruye
+
+    new_lexer = lex.lex(module=module)
+    if _ensure_cache_dir():
+        tmp_path = _temp_table_path(path)
+        try:
+            new_lexer.writetab(os.path.basename(tmp_path)[:-3], TABLES_CACHE_DIR)
+            _publish_table(tmp_path, path)
+        except OSError:
+            pass
+    return new_lexer
+
+def build_parser(module):
+    """Construye el parser LALR de un front-end reutilizando la tabla en disco si su gramática no cambió"""
+    path = _table_path(module, 'parsetab', _table_key(vars(module), 'p_'), '.pickle')
+    if os.path.exists(path):
+        try:
+            lr_table = yacc.LRTable()
+            lr_table.read_pickle(path)
+            lr_table.bind_callables(vars(module))
+            return yacc.LRParser(lr_table, module.p_error)
+        except Exception:
+            pass  # Tabla corrupta o de otra versión de PLY: se reconstruye
+
+    errorlog = _GrammarLogger(sys.stderr)
+    if not _ensure_cache_dir():
+        return yacc.yacc(module=module, debug=False, write_tables=False, errorlog=errorlog)
+    tmp_path = _temp_table_path(path)
+    new_parser = yacc.yacc(module=module, debug=False, write_tables=False,
+                           picklefile=tmp_path, errorlog=errorlog)
+    _publish_table(tmp_path, path)
+    return new_parser
+
+###############################################################
+#              LEXER Y PARSERS DEL PROCESO
+###############################################################
+
+# Se construyen en el primer uso, no al importar: un solo lexer para todos los
+# front-ends y un parser por gramática (indexado por nombre de módulo)
+_lexer = None
+_parsers = {}
+_build_lock = threading.Lock()
+
+def get_lexer(lexer_errors, report_error=None, token_subset=None):
+    """Retorna un lexer para una compilación.
+
+    Por omisión cada error léxico se agrega a lexer_errors y se imprime; con
+    report_error(mensaje, línea, lexpos) el front-end decide cómo registrarlo.
+    Con token_subset (los tokens de un front-end con un lenguaje más chico) las
+    palabras reservadas fuera de él son identificadores y los demás tokens fuera
+    de él son caracteres ilegales."""
+    global _lexer
+    if _lexer is None:
+        with _build_lock:
+            if _lexer is None:
+                _lexer = build_lexer()
+    file_lexer = _lexer.clone()
+    file_lexer.lineno = 1
+    if report_error is None:
+        def report_error(error_msg, lineno, lexpos):
+            lexer_errors.append(error_msg)
+            print(f"❌ {error_msg}")
+    file_lexer.report_error = report_error
+    if token_subset is not None:
+        file_lexer.token = _subset_tokens(file_lexer, frozenset(token_subset))
+    return file_lexer
+
+def _subset_tokens(file_lexer, allowed):
+    """Función token() del lexer que solo entrega los tokens de allowed"""
+    next_token = file_lexer.token
+    keywords = frozenset(reserved.values())
+
+    def token():
+        while True:
+            tok = next_token()
+            if tok is None or tok.type in allowed:
+                return tok
+            if tok.type in keywords and 'ID' in allowed:
+                tok.type = 'ID'
+                tok.value = sys.intern(tok.value)
+                return tok
+            error_msg = f"ERROR LÉXICO en línea {tok.lineno}: Carácter ilegal '{str(tok.value)[0]}'"
+            file_lexer.report_error(error_msg, tok.lineno, tok.lexpos)
+
+    return token
+
+def get_parser(module):
+    """Retorna el parser LALR del proceso para la gramática definida en module"""
+    parser = _parsers.get(module.__name__)
+    if parser is None:
+        with _build_lock:
+            parser = _parsers.get(module.__name__)
+            if parser is None:
+                parser = _parsers[module.__name__] = build_parser(module)
+    return parser
@@ -7,139 +7,40 @@
 #   Usando la documentacion de PLY para error recovery
 
 
-import ply.lex as lex
-import ply.yacc as yacc
 import sys
 
-# Palabras reservadas
-reserved = {
-    'program': 'PROGRAM',
-    'var': 'VAR',
-    'int': 'INT',
-    'float': 'FLOAT',
-    'void': 'VOID',
-    'if': 'IF',
-    'else': 'ELSE',
-    'while': 'WHILE',
-    'do': 'DO',
-    'print': 'PRINT',
-    'main': 'MAIN',
-    'end': 'END',
-    'string': 'STRING'
-}
-
-# Tokens
-tokens = [
-    'CONST_INT',
-    'CONST_FLOAT',
-    'CONST_STRING',
-    'ID',
-    'OP_ASIGNA',
-    'OP_SUMA',
-    'OP_RESTA',
-    'OP_MULT',
-    'OP_DIV',
-    'OP_EQ',
-    'OP_NEQ',
-    'OP_LEQ',
-    'OP_GEQ',
-    'OP_LT',
-    'OP_GT',
-    'LPAREN',
-    'RPAREN',
-    'LBRACE',
-    'RBRACE',
-    'LBRACK',
-    'RBRACK',
-    'COMMA',
-    'SEMICOL',
-    'COLON',
-] + list(reserved.values())
+# Tokens, reglas del lexer y precedencia: comunes a todos los front-ends.
+# tokens y precedence se importan aquí porque yacc los busca en el módulo de la gramática.
+import gramatica
+from gramatica import tokens, precedence
 
 # Contador de errores global
 lexer_errors = []
 parser_errors = []
 
-t_ignore = ' \t\r'
-
-# Operadores
-t_OP_EQ = r'=='
-t_OP_NEQ = r'!='
-t_OP_LEQ = r'<='
-t_OP_GEQ = r'>='
-t_OP_LT = r'<'
-t_OP_GT = r'>'
-t_OP_ASIGNA = r'='
-t_OP_SUMA = r'\+'
-t_OP_RESTA = r'-'
-t_OP_MULT = r'\*'
-t_OP_DIV = r'/'
-
-# Delimitadores
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_LBRACK = r'\['
-t_RBRACK = r'\]'
-t_COMMA = r','
-t_SEMICOL = r';'
-t_COLON = r':'
-
-def t_COMMENT_BLOCK(t):
-    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
-    pass
-
-def t_COMMENT(t):
-    r'(//[^\n]*)|(\#[^\n]*)'
-    pass
-
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
+###############################################################
+#                    CONSTRUCCIÓN DEL LEXER
+###############################################################
 
-def t_CONST_FLOAT(t):
-    r'\d+\.\d+(?:[eE][\+\-]?\d+)?'
-    t.value = float(t.value)
-    return t
+def get_lexer():
+    """Retorna un lexer listo para un archivo nuevo (clon del lexer compartido)"""
+    return gramatica.get_lexer(lexer_errors)
 
-def t_CONST_INT(t):
-    r'\d+'
-    t.value = int(t.value)
-    return t
+class TokenStream:
+    """Fuente de tokens para el parser que reproduce una lista ya leída del lexer.
 
-def t_CONST_STRING(t):
-    r'"([^"\\]|\\.)*"'
-    return t
+    Permite mostrar los tokens y parsear sin tokenizar el archivo dos veces."""
 
-def t_ID(t):
-    r'[A-Za-z_][A-Za-z0-9_]*'
-    t.type = reserved.get(t.value, 'ID')
-    return t
+    def __init__(self, tokens_list):
+        self._tokens = iter(tokens_list)
 
-def t_error(t):
-    error_msg = f"ERROR LÉXICO en línea {t.lineno}: Carácter ilegal '{t.value[0]}'"
-    lexer_errors.append(error_msg)
-    print(f"❌ {error_msg}")
-    t.lexer.skip(1)
-
-###############################################################
-#                    CONSTRUCCIÓN DEL LEXER
-###############################################################
-
-lexer = lex.lex()
-print("✅ Lexer construido correctamente")
+    def token(self):
+        return next(self._tokens, None)
 
 ###############################################################
 #                    PARSER LR CON GRAMÁTICA
 ###############################################################
 
-precedence = (
-    ('left', 'OP_EQ', 'OP_NEQ', 'OP_LT', 'OP_GT', 'OP_LEQ', 'OP_GEQ'), 
-    ('left', 'OP_SUMA', 'OP_RESTA'),
-    ('left', 'OP_MULT', 'OP_DIV'),
-)
-
 start = 'program'
 
 ############### GRAMÁTICA LR ###############
@@ -162,8 +63,9 @@ def p_var_list_single(p):
     p[0] = [('var_decl', p[1], p[3])]
 
 def p_var_list_multiple(p):
-    '''var_list : id_list COLON type SEMICOL var_list'''
-    p[0] = [('var_decl', p[1], p[3])] + p[5]
+    '''var_list : var_list id_list COLON type SEMICOL'''
+    p[1].append(('var_decl', p[2], p[4]))
+    p[0] = p[1]
 
 # ID_LIST
 def p_id_list_single(p):
@@ -171,8 +73,10 @@ def p_id_list_single(p):
     p[0] = [p[1]]
 
 def p_id_list_multiple(p):
-    '''id_list : ID COMMA id_list'''
-    p[0] = [p[1]] + p[3]
+    '''id_list : id_list COMMA ID'''
+    # Recursión izquierda: la lista crece en su lugar y la pila LR no crece con ella
+    p[1].append(p[3])
+    p[0] = p[1]
 
 # TYPES
 def p_type_int(p):
@@ -198,7 +102,8 @@ def p_funcs_single(p):
 
 def p_funcs_multiple(p):
     '''funcs : funcs func'''
-    p[0] = p[1] + [p[2]]
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_func(p):
     '''func : VOID ID LPAREN params RPAREN LBRACK func_vars body RBRACK SEMICOL'''
@@ -218,8 +123,9 @@ def p_func_var_list_single(p):
     p[0] = [('var_decl', p[1], p[3])]
 
 def p_func_var_list_multiple(p):
-    '''func_var_list : id_list COLON type SEMICOL func_var_list'''
-    p[0] = [('var_decl', p[1], p[3])] + p[5]
+    '''func_var_list : func_var_list id_list COLON type SEMICOL'''
+    p[1].append(('var_decl', p[2], p[4]))
+    p[0] = p[1]
 
 # PARAMS
 def p_params_empty(p):
@@ -235,8 +141,9 @@ def p_param_list_single(p):
     p[0] = [p[1]]
 
 def p_param_list_multiple(p):
-    '''param_list : param COMMA param_list'''
-    p[0] = [p[1]] + p[3]
+    '''param_list : param_list COMMA param'''
+    p[1].append(p[3])
+    p[0] = p[1]
 
 def p_param(p):
     '''param : ID COLON type'''
@@ -257,7 +164,8 @@ def p_statements_single(p):
 
 def p_statements_multiple(p):
     '''statements : statements statement'''
-    p[0] = p[1] + [p[2]]
+    p[1].append(p[2])
+    p[0] = p[1]
 
 # STATEMENT
 def p_statement_assign(p):
@@ -463,7 +371,7 @@ def p_statement_error(p):
     msg = f"⚠️ RECUPERACIÓN: Statement inválido, sincronizando en ';'"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()  # Reset error state
+    p.parser.errok()  # Reset error state
     p[0] = ('error_stmt',)
 
 # REGLA 2: Error en bloques de código - Sincroniza en }
@@ -472,7 +380,7 @@ def p_body_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en bloque de código"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('body', [])
 
 # REGLA 3: Error en expresiones dentro de paréntesis
@@ -481,7 +389,7 @@ def p_factor_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en expresión entre paréntesis"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('error',)
 
 # REGLA 4: Error en print - Sincroniza en ;
@@ -492,7 +400,7 @@ def p_print_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en print statement"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('print', [])
 
 # REGLA 5: Error en condición if
@@ -502,7 +410,7 @@ def p_condition_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en condición if"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('if', ('error',), p[5] if len(p) == 8 else p[3], p[6] if len(p) == 8 else p[4])
 
 # REGLA 6: Error en ciclo do-while
@@ -512,7 +420,7 @@ def p_cycle_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en ciclo do-while"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     if len(p) == 8 and p[2] == 'error':
         p[0] = ('do_while', ('body', []), p[5])
     else:
@@ -524,7 +432,7 @@ def p_assign_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en expresión de asignación a '{p[1]}'"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('assign', p[1], ('error',))
 
 # REGLA 8: Error en llamada a función - Sincroniza en ;
@@ -534,7 +442,7 @@ def p_f_call_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en llamada a función '{p[1]}'"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     p[0] = ('call', p[1], [])
 
 # REGLA 9: Error en función void - Sincroniza en ;
@@ -544,7 +452,7 @@ def p_func_error(p):
     msg = f"⚠️ RECUPERACIÓN: Error en definición de función '{p[2]}'"
     parser_errors.append(msg)
     print(msg)
-    parser.errok()
+    p.parser.errok()
     if p[4] == 'error':
         p[0] = ('func_decl', p[2], [], p[7], p[8])
     else:
@@ -576,8 +484,9 @@ def p_error(p):
 #                    CONSTRUCCIÓN DEL PARSER
 ###############################################################
 
-parser = yacc.yacc(write_tables=False, debug=False)
-print("✅ Parser LR construido correctamente")
+def get_parser():
+    """Retorna el parser del proceso, construyéndolo en el primer uso"""
+    return gramatica.get_parser(sys.modules[__name__])
 
 ###############################################################
 #              FUNCIONES PARA ANÁLISIS DE ARCHIVOS
@@ -609,9 +518,8 @@ def analizar_archivo(filename):
         print(f"{i:3d} | {linea}")
     print("-"*70)
 
-    # Crear un NUEVO lexer para este análisis
-    file_lexer = lex.lex()
-    file_lexer.lineno = 1
+    # Clonar el lexer del proceso para este análisis
+    file_lexer = get_lexer()
 
     # Análisis léxico
     print("\n ANÁLISIS LÉXICO:")
@@ -625,7 +533,9 @@ def analizar_archivo(filename):
             break
         tokens_list.append(tok)
         if tok.type not in ['COMMENT', 'COMMENT_BLOCK']:
-            print(f"  Línea {tok.lineno:3d}: {tok.type:15s} = {repr(tok.value)[:40]}")
+            # El lexer compartido quita las comillas de las cadenas; el listado las muestra
+            value = f'"{tok.value}"' if tok.type == 'CONST_STRING' else tok.value
+            print(f"  Línea {tok.lineno:3d}: {tok.type:15s} = {repr(value)[:40]}")
 
     print(f"\n✅ Total de tokens reconocidos: {len(tokens_list)}")
 
@@ -636,9 +546,8 @@ def analizar_archivo(filename):
     print("\n🔍 ANÁLISIS SINTÁCTICO:")
     print("-"*70)
 
-    # Reiniciar el lexer para el parser
-    file_lexer.lineno = 1
-    resultado = parser.parse(codigo, lexer=file_lexer)
+    # El parser consume los tokens ya leídos en lugar de volver a tokenizar
+    resultado = get_parser().parse(lexer=TokenStream(tokens_list))
 
     # Reporte final
     print("\n" + "="*70)
@@ -683,10 +592,9 @@ def analizar_codigo_directo(codigo, nombre="código"):
     print(codigo)
     print("-"*70)
 
-    # Crear un NUEVO lexer para este análisis
-    test_lexer = lex.lex()
-    test_lexer.lineno = 1
-    resultado = parser.parse(codigo, lexer=test_lexer)
+    # Clonar el lexer del proceso para este análisis
+    test_lexer = get_lexer()
+    resultado = get_parser().parse(codigo, lexer=test_lexer)
 
     # Separar errores reales de mensajes de recuperación
     errores_reales = [err for err in parser_errors if not err.startswith("⚠️ RECUPERACIÓN")]
@@ -4,124 +4,19 @@
 #   COMPILADOR LITTLE DUCK - ANÁLISIS SEMÁNTICO
 #   Con generación de código intermedio (cuádruplos)
 
-import ply.lex as lex
-import ply.yacc as yacc
 import sys
 
-# Palabras reservadas
-reserved = {
-    'program': 'PROGRAM',
-    'var': 'VAR',
-    'int': 'INT',
-    'float': 'FLOAT',
-    'void': 'VOID',
-    'if': 'IF',
-    'else': 'ELSE',
-    'while': 'WHILE',
-    'do': 'DO',
-    'print': 'PRINT',
-    'main': 'MAIN',
-    'end': 'END',
-    'string': 'STRING'
-}
-
-# Tokens
-tokens = [
-    'CONST_INT',
-    'CONST_FLOAT',
-    'CONST_STRING',
-    'ID',
-    'OP_ASIGNA',
-    'OP_SUMA',
-    'OP_RESTA',
-    'OP_MULT',
-    'OP_DIV',
-    'OP_EQ',
-    'OP_NEQ',
-    'OP_LEQ',
-    'OP_GEQ',
-    'OP_LT',
-    'OP_GT',
-    'LPAREN',
-    'RPAREN',
-    'LBRACE',
-    'RBRACE',
-    'LBRACK',
-    'RBRACK',
-    'COMMA',
-    'SEMICOL',
-    'COLON',
-] + list(reserved.values())
+# Tokens, reglas del lexer, precedencia y cubo semántico: comunes a todos los front-ends.
+# tokens y precedence se importan aquí porque yacc los busca en el módulo de la gramática.
+import gramatica
+from gramatica import tokens, precedence
 
 lexer_errors = []
 parser_errors = []
 
-t_ignore = ' \t\r'
-
-# Operadores
-t_OP_EQ = r'=='
-t_OP_NEQ = r'!='
-t_OP_LEQ = r'<='
-t_OP_GEQ = r'>='
-t_OP_LT = r'<'
-t_OP_GT = r'>'
-t_OP_ASIGNA = r'='
-t_OP_SUMA = r'\+'
-t_OP_RESTA = r'-'
-t_OP_MULT = r'\*'
-t_OP_DIV = r'/'
-
-# Delimitadores
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_LBRACK = r'\['
-t_RBRACK = r'\]'
-t_COMMA = r','
-t_SEMICOL = r';'
-t_COLON = r':'
-
-def t_COMMENT_BLOCK(t):
-    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
-    pass
-
-def t_COMMENT(t):
-    r'(//[^\n]*)|(\#[^\n]*)'
-    pass
-
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-def t_CONST_FLOAT(t):
-    r'\d+\.\d+(?:[eE][\+\-]?\d+)?'
-    t.value = float(t.value)
-    return t
-
-def t_CONST_INT(t):
-    r'\d+'
-    t.value = int(t.value)
-    return t
-
-def t_CONST_STRING(t):
-    r'"([^"\\]|\\.)*"'
-    t.value = t.value[1:-1]
-    return t
-
-def t_ID(t):
-    r'[A-Za-z_][A-Za-z0-9_]*'
-    t.type = reserved.get(t.value, 'ID')
-    return t
-
-def t_error(t):
-    error_msg = f"ERROR LÉXICO en línea {t.lineno}: Carácter ilegal '{t.value[0]}'"
-    lexer_errors.append(error_msg)
-    print(f"❌ {error_msg}")
-    t.lexer.skip(1)
-
-lexer = lex.lex()
-print("✅ Lexer construido correctamente")
+def get_lexer():
+    """Retorna un lexer listo para un archivo nuevo (clon del lexer compartido)"""
+    return gramatica.get_lexer(lexer_errors)
 
 ###############################################################
 #           ESTRUCTURAS DE DATOS SEMÁNTICAS
@@ -149,62 +44,10 @@ temp_counter = 1
 current_scope = 'global'
 current_function = None
 
-# Cubo semántico expandido
-semantic_cube = {
-    '+': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'string': 'string', 'int': 'string', 'float': 'string'}
-    },
-    '-': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '*': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'int': 'string'}
-    },
-    '/': {
-        'int': {'int': 'float', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '>': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '>=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '==': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '!=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '=': {
-        'int': {'int': 'int', 'float': 'error'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'string': 'string', 'int': 'string', 'float': 'string'}
-    }
-}
+# Cubo semántico compartido; aquí a un string se le puede asignar un int o un float
+semantic_cube = gramatica.build_semantic_cube({
+    '=': {'string': {'int': 'string', 'float': 'string'}}
+})
 
 ###############################################################
 #              FUNCIONES AUXILIARES SEMÁNTICAS
@@ -273,11 +116,10 @@ def add_function(func_name, return_type, params):
 
 def check_semantic_cube(operator, type1, type2):
     """Verifica compatibilidad de tipos en el cubo semántico"""
-    if operator in semantic_cube:
-        if type1 in semantic_cube[operator]:
-            if type2 in semantic_cube[operator][type1]:
-                return semantic_cube[operator][type1][type2]
-    
+    result_type = gramatica.semantic_result(semantic_cube, operator, type1, type2)
+    if result_type is not None:
+        return result_type
+
     error_msg = f"ERROR SEMÁNTICO: Operación '{operator}' no válida entre tipos '{type1}' y '{type2}'"
     parser_errors.append(error_msg)
     print(f"❌ {error_msg}")
@@ -305,12 +147,6 @@ def fill_quadruple(quad_index, value):
 #                    PARSER CON SEMÁNTICA
 ###############################################################
 
-precedence = (
-    ('left', 'OP_EQ', 'OP_NEQ', 'OP_LT', 'OP_GT', 'OP_LEQ', 'OP_GEQ'), 
-    ('left', 'OP_SUMA', 'OP_RESTA'),
-    ('left', 'OP_MULT', 'OP_DIV'),
-)
-
 start = 'program'
 
 def p_program(p):
@@ -348,9 +184,9 @@ def p_var_list_single(p):
         add_variable(var_name, var_type)
 
 def p_var_list_multiple(p):
-    '''var_list : id_list COLON type SEMICOL var_list'''
-    var_type = p[3]
-    for var_name in p[1]:
+    '''var_list : var_list id_list COLON type SEMICOL'''
+    var_type = p[4]
+    for var_name in p[2]:
         add_variable(var_name, var_type)
 
 def p_id_list_single(p):
@@ -358,8 +194,10 @@ def p_id_list_single(p):
     p[0] = [p[1]]
 
 def p_id_list_multiple(p):
-    '''id_list : ID COMMA id_list'''
-    p[0] = [p[1]] + p[3]
+    '''id_list : id_list COMMA ID'''
+    # Recursión izquierda: la lista crece en su lugar y la pila LR no crece con ella
+    p[1].append(p[3])
+    p[0] = p[1]
 
 def p_type(p):
     '''type : INT
@@ -373,7 +211,8 @@ def p_funcs_empty(p):
     pass
 
 def p_funcs_multiple(p):
-    '''funcs : func funcs'''
+    '''funcs : funcs func'''
+    # Recursión izquierda: cada función se reduce en cuanto termina (pila acotada)
     pass
 
 def p_func(p):
@@ -409,10 +248,11 @@ def p_param_list_single(p):
     p[0] = [(p[1], param_type)]
 
 def p_param_list_multiple(p):
-    '''param_list : ID COLON type COMMA param_list'''
-    param_type = p[3]
-    add_variable(p[1], param_type)
-    p[0] = [(p[1], param_type)] + p[5]
+    '''param_list : param_list COMMA ID COLON type'''
+    param_type = p[5]
+    add_variable(p[3], param_type)
+    p[1].append((p[3], param_type))
+    p[0] = p[1]
 
 def p_func_vars(p):
     '''func_vars : vars
@@ -433,7 +273,8 @@ def p_statements_single(p):
     pass
 
 def p_statements_multiple(p):
-    '''statements : statement statements'''
+    '''statements : statements statement'''
+    # Recursión izquierda: cada estatuto se reduce en cuanto termina (pila acotada)
     pass
 
 def p_statement(p):
@@ -739,8 +580,9 @@ def p_error(p):
         parser_errors.append(error_msg)
         print(f"❌ {error_msg}")
 
-parser = yacc.yacc(write_tables=False, debug=False)
-print("✅ Parser con análisis semántico construido correctamente")
+def get_parser():
+    """Retorna el parser del proceso, construyéndolo en el primer uso"""
+    return gramatica.get_parser(sys.modules[__name__])
 
 ###############################################################
 #              FUNCIONES DE REPORTE Y SALIDA
@@ -882,13 +724,10 @@ def analizar_archivo(filename):
         print(f"{i:3d} | {linea}")
     print("-"*70)
 
-    file_lexer = lex.lex()
-    file_lexer.lineno = 1
-
     print("\n🔍 ANÁLISIS LÉXICO, SINTÁCTICO Y SEMÁNTICO:")
     print("-"*70)
     
-    resultado = parser.parse(codigo, lexer=file_lexer)
+    resultado = get_parser().parse(codigo, lexer=get_lexer())
 
     if len(parser_errors) == 0 and len(lexer_errors) == 0:
         print_function_directory()
@@ -4,152 +4,32 @@
 #   COMPILADOR LITTLE DUCK - ANÁLISIS SEMÁNTICO
 #   Con generación de código intermedio (cuádruplos)
 
-import ply.lex as lex
-import ply.yacc as yacc
+import bisect
+import copy
+import mmap
+import os
+import pickle
+import re
+import stat
 import sys
-
-# Palabras reservadas
-reserved = {
-    'program': 'PROGRAM',
-    'var': 'VAR',
-    'int': 'INT',
-    'float': 'FLOAT',
-    'void': 'VOID',
-    'if': 'IF',
-    'else': 'ELSE',
-    'while': 'WHILE',
-    'do': 'DO',
-    'print': 'PRINT',
-    'main': 'MAIN',
-    'end': 'END',
-    'string': 'STRING'
-}
-
-# Tokens
-tokens = [
-    'CONST_INT',
-    'CONST_FLOAT',
-    'CONST_STRING',
-    'ID',
-    'OP_ASIGNA',
-    'OP_SUMA',
-    'OP_RESTA',
-    'OP_MULT',
-    'OP_DIV',
-    'OP_EQ',
-    'OP_NEQ',
-    'OP_LEQ',
-    'OP_GEQ',
-    'OP_LT',
-    'OP_GT',
-    'LPAREN',
-    'RPAREN',
-    'LBRACE',
-    'RBRACE',
-    'LBRACK',
-    'RBRACK',
-    'COMMA',
-    'SEMICOL',
-    'COLON',
-] + list(reserved.values())
-
-lexer_errors = []
-parser_errors = []
-
-t_ignore = ' \t\r'
-
-# Operadores
-t_OP_EQ = r'=='
-t_OP_NEQ = r'!='
-t_OP_LEQ = r'<='
-t_OP_GEQ = r'>='
-t_OP_LT = r'<'
-t_OP_GT = r'>'
-t_OP_ASIGNA = r'='
-t_OP_SUMA = r'\+'
-t_OP_RESTA = r'-'
-t_OP_MULT = r'\*'
-t_OP_DIV = r'/'
-
-# Delimitadores
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_LBRACK = r'\['
-t_RBRACK = r'\]'
-t_COMMA = r','
-t_SEMICOL = r';'
-t_COLON = r':'
-
-def t_COMMENT_BLOCK(t):
-    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
-    pass
-
-def t_COMMENT(t):
-    r'(//[^\n]*)|(\#[^\n]*)'
-    pass
-
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-def t_CONST_FLOAT(t):
-    r'\d+\.\d+(?:[eE][\+\-]?\d+)?'
-    t.value = float(t.value)
-    return t
-
-def t_CONST_INT(t):
-    r'\d+'
-    t.value = int(t.value)
-    return t
-
-def t_CONST_STRING(t):
-    r'"([^"\\]|\\.)*"'
-    t.value = t.value[1:-1]
-    return t
-
-def t_ID(t):
-    r'[A-Za-z_][A-Za-z0-9_]*'
-    t.type = reserved.get(t.value, 'ID')
-    return t
-
-def t_error(t):
-    error_msg = f"ERROR LÉXICO en línea {t.lineno}: Carácter ilegal '{t.value[0]}'"
-    lexer_errors.append(error_msg)
-    print(f"❌ {error_msg}")
-    t.lexer.skip(1)
-
-lexer = lex.lex()
-print("✅ Lexer construido correctamente")
-
-###############################################################
-#           ESTRUCTURAS DE DATOS SEMÁNTICAS
-###############################################################
-
-# Directorio de funciones: {func_name: {type, params: [(name, type)], vars: {}, start_quad}}
-function_directory = {}
-
-# Tabla de variables por scope (sin direcciones de memoria)
-symbol_table = {}  # {scope: {var_name: tipo}}
-
-# Pila de argumentos: lista de tuplas (dirección, tipo)
-stack_args = []
-jump_stack = []
-
-# Contexto de llamada a función actual (para tracking de argumentos)
-current_call = None  # (func_name, param_count, arg_addresses)
-
-# Cuádruplos generados
-quadruples = []
-
-# Contadores
-temp_counter = 1
-
-# Scope actual
-current_scope = 'global'
-current_function = None
-program_name = None  # Nombre del programa para validar duplicados
+from array import array
+from operator import add, mul, truediv, sub, gt, lt, ge, le, eq, ne
+
+# Tokens, reglas del lexer, precedencia, cubo semántico y caché de tablas: comunes a todos
+# los front-ends. tokens y precedence se importan aquí porque yacc los busca en el módulo
+# de la gramática.
+import gramatica
+from gramatica import tokens, precedence
+from gramatica import SEMANTIC_CUBE, OPERATOR_CODES, TYPES, TYPE_CODES, INT, FLOAT, STRING, BOOL, ERROR
+
+def get_lexer(context):
+    """Retorna un lexer para una compilación (clon del lexer compartido)"""
+    file_lexer = gramatica.get_lexer(
+        context.lexer_errors,
+        lambda error_msg, lineno, lexpos: context.report_error('léxico', error_msg, lineno, lexpos))
+    file_lexer.context = context
+    context.lexer = file_lexer
+    return file_lexer
 
 ###############################################################
 #              SISTEMA DE MEMORIA VIRTUAL
@@ -348,281 +228,502 @@ class MemoryManager:
             }
         }
 
+###############################################################
+#              LECTURA DEL CÓDIGO FUENTE
+###############################################################
 
-# Instancia global del administrador de memoria
-memory_manager = MemoryManager()
-
-# Tabla de constantes: {tipo: {valor: dirección}}
-constants_table = {
-    'int': {},
-    'float': {},
-    'string': {}
-}
-
-# Cubo semántico expandido
-semantic_cube = {
-    '+': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'string': 'string', 'int': 'string', 'float': 'string'}
-    },
-    '-': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '*': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'int': 'string'}
-    },
-    '/': {
-        'int': {'int': 'float', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '>': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '>=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '==': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '!=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '=': {
-        'int': {'int': 'int', 'float': 'error'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'string': 'string'}
-    }
-}
+class SourceText:
+    """Código fuente con un índice de líneas que se construye solo si se necesita.
+
+    from_file() lee los archivos regulares con mmap y los decodifica directo
+    desde el buffer; ni la lectura ni el listado hacen copias adicionales del
+    texto. Pipes y demás archivos especiales se leen de corrido."""
+
+    def __init__(self, text):
+        self.text = text
+        self._line_starts = None  # Posición donde empieza cada línea
+
+    @classmethod
+    def from_file(cls, filename):
+        """Lee un archivo UTF-8, mapeándolo a memoria si es un archivo regular.
+
+        Los fines de línea \\r\\n y \\r se convierten en \\n, como al leer en modo texto."""
+        with open(filename, 'rb') as f:
+            text = None
+            if stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        text = str(buffer, 'utf-8')
+                except (ValueError, OSError):
+                    pass  # Archivo vacío o que no se puede mapear: se lee de corrido
+            if text is None:
+                text = f.read().decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return cls(text)
+
+    def lines(self):
+        """Genera las líneas del texto una por una, sin el fin de línea (\\n o \\r\\n)"""
+        text = self.text
+        start = 0
+        while True:
+            end = text.find('\n', start)
+            if end < 0:
+                yield text[start:]
+                return
+            yield text[start:end].rstrip('\r')
+            start = end + 1
+
+    def line_starts(self):
+        """Posición donde empieza cada línea (se calcula la primera vez)"""
+        if self._line_starts is None:
+            text = self.text
+            starts = array('q', [0])
+            newline = text.find('\n')
+            while newline >= 0:
+                starts.append(newline + 1)
+                newline = text.find('\n', newline + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def replace(self, start, end, inserted):
+        """Retorna un SourceText con [start, end) reemplazado por inserted; si el índice
+        de líneas ya existe se ajusta en lugar de recorrer todo el texto otra vez"""
+        edited = SourceText(self.text[:start] + inserted + self.text[end:])
+        starts = self._line_starts
+        if starts is not None:
+            first = bisect.bisect_right(starts, start)
+            after = bisect.bisect_right(starts, end)
+            delta = len(inserted) - (end - start)
+            new_starts = starts[:first]
+            newline = inserted.find('\n')
+            while newline >= 0:
+                new_starts.append(start + newline + 1)
+                newline = inserted.find('\n', newline + 1)
+            new_starts.extend([line_start + delta for line_start in starts[after:]])
+            edited._line_starts = new_starts
+        return edited
+
+    def position(self, lexpos):
+        """Retorna (línea, columna) de una posición del texto; ambas empiezan en 1"""
+        starts = self.line_starts()
+        line = bisect.bisect_right(starts, lexpos)
+        return line, lexpos - starts[line - 1] + 1
 
 ###############################################################
-#              FUNCIONES AUXILIARES SEMÁNTICAS
+#              CONTEXTO DE COMPILACIÓN
 ###############################################################
 
-def reset_compiler():
-    global function_directory, symbol_table, stack_args
-    global jump_stack, quadruples, temp_counter
-    global current_scope, current_function, constants_table, memory_manager
-    global current_call, program_name
-
-    function_directory = {}
-    symbol_table = {'global': {}}
-    stack_args = []
-    jump_stack = []
-    quadruples = []
-    temp_counter = 1
-    current_scope = 'global'
-    current_function = None
-    current_call = None
-    program_name = None
-
-    # Reiniciar estructuras de memoria virtual
-    constants_table = {'int': {}, 'float': {}, 'string': {}}
-    memory_manager.reset()
-
-def add_variable(var_name, var_type, scope=None):
-    """Añade una variable a la tabla de símbolos con dirección de memoria virtual"""
-    if scope is None:
-        scope = current_scope
-
-    if scope not in symbol_table:
-        symbol_table[scope] = {}
-
-    # Verificar si el nombre de la variable es igual al nombre del programa
-    if var_name == program_name:
-        error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' no puede tener el mismo nombre que el programa"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-        return None
+class Diagnostic:
+    """Error del compilador en forma estructurada (fase, mensaje, línea y columna si se conocen)"""
 
-    if var_name in symbol_table[scope]:
-        error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' ya declarada en scope '{scope}'"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-        return None
+    def __init__(self, phase, message, line=None, column=None):
+        self.phase = phase  # 'léxico', 'sintáctico' o 'semántico'
+        self.message = message
+        self.line = line
+        self.column = column
 
-    # Asignar dirección de memoria virtual según scope
-    if scope == 'global':
-        address = memory_manager.get_global_address(var_type)
-    else:
-        address = memory_manager.get_local_address(var_type)
-
-    symbol_table[scope][var_name] = {
-        'type': var_type,
-        'address': address
-    }
-    return address
-
-def lookup_variable(var_name):
-    """Busca una variable y retorna (tipo, dirección) o (None, None) si no existe"""
-    # Solo busca en el scope actual (no accede a globales desde funciones)
-    if current_scope in symbol_table and var_name in symbol_table[current_scope]:
-        var_info = symbol_table[current_scope][var_name]
-        return var_info['type'], var_info['address']
-    else:
-        error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' no declarada en scope '{current_scope}'"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-        return None, None
+    def to_dict(self):
+        return {'phase': self.phase, 'message': self.message, 'line': self.line, 'column': self.column}
 
+    def __repr__(self):
+        return f"Diagnostic({self.phase!r}, {self.message!r}, line={self.line!r}, column={self.column!r})"
 
-def register_constant(value, const_type):
-    """Registra una constante y retorna su dirección (reutiliza si ya existe)"""
-    if value in constants_table[const_type]:
-        return constants_table[const_type][value]
-    else:
-        address = memory_manager.get_constant_address(const_type)
-        constants_table[const_type][value] = address
-        return address
-
-def add_function(func_name, return_type, params):
-    """Añade una función al directorio"""
-    # Verificar si el nombre de la función es igual al nombre del programa
-    if func_name == program_name:
-        error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' no puede tener el mismo nombre que el programa"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-        return False
+    def __str__(self):
+        return self.message
 
-    if func_name in function_directory:
-        error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' ya declarada"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-        return False
 
-    function_directory[func_name] = {
-        'type': return_type,
-        'params': params,
-        'vars': {},
-        'start_quad': len(quadruples)
-    }
-    return True
-
-def check_semantic_cube(operator, type1, type2):
-    """Verifica compatibilidad de tipos en el cubo semántico"""
-    if operator in semantic_cube:
-        if type1 in semantic_cube[operator]:
-            if type2 in semantic_cube[operator][type1]:
-                return semantic_cube[operator][type1][type2]
-    
-    error_msg = f"ERROR SEMÁNTICO: Operación '{operator}' no válida entre tipos '{type1}' y '{type2}'"
-    parser_errors.append(error_msg)
-    print(f"❌ {error_msg}")
-    return 'error'
-
-def generate_temp(temp_type='int'):
-    """Genera un temporal y retorna su dirección de memoria virtual"""
-    return memory_manager.get_temp_address(temp_type)
-
-def add_quadruple(operator, operand1, operand2, result):
-    """Añade un cuádruple a la lista"""
-    quadruples.append((operator, operand1, operand2, result))
-    return len(quadruples) - 1
-
-def fill_quadruple(quad_index, value):
-    """Rellena el campo resultado de un cuádruple pendiente"""
-    if quad_index < len(quadruples):
-        op, op1, op2, _ = quadruples[quad_index]
-        quadruples[quad_index] = (op, op1, op2, value)
+class Symbol:
+    """Entrada de la tabla de símbolos: registro compacto (sin __dict__) con código de tipo y dirección.
+
+    El análisis semántico crea el símbolo sin dirección; la generación de código se la asigna."""
+    __slots__ = ('type', 'address')
+
+    def __init__(self, var_type, address):
+        self.type = var_type
+        self.address = address
+
+    def __repr__(self):
+        return f"Symbol({TYPES[self.type]!r}, {self.address!r})"
+
+
+# Id del scope global; cada función recibe el siguiente id libre al declararse
+GLOBAL_SCOPE = 0
+
+class CompilationHalted(Exception):
+    """Detiene el análisis de una compilación (límite de errores o error sintáctico)"""
+
+
+class CompilationContext:
+    """Estado completo de una compilación; cada archivo se compila en su propio contexto"""
+
+    def __init__(self, quiet=False, check_only=False, max_errors=None, jobs=1):
+        # Directorio de funciones: {func_name: {type, params: [(name, type, address)], vars: {}, start_quad}}
+        self.function_directory = {}
+
+        # Tabla de variables por scope: lista indexada por id de scope con {var_name: Symbol};
+        # los nombres de los identificadores llegan internados desde el lexer
+        self.symbol_table = [{}]
+        self.scope_names = ['global']  # id de scope -> nombre
+        self.scope_ids = {'global': GLOBAL_SCOPE}  # nombre -> id de scope
+
+        # Pila de operandos del análisis semántico: códigos de tipo
+        self.stack_args = []
+
+        # Contexto de llamada a función actual (para tracking de argumentos)
+        self.current_call = None  # (func_name, param_count)
+
+        # Cuádruplos generados
+        self.quadruples = []
+
+        # Scope actual
+        self.current_scope = GLOBAL_SCOPE
+        self.current_function = None
+        self.program_name = None  # Nombre del programa para validar duplicados
+
+        # Memoria virtual y tabla de constantes: {tipo: {valor: dirección}}
+        self.memory_manager = MemoryManager()
+        self.constants_table = {'int': {}, 'float': {}, 'string': {}}
+
+        # Errores encontrados (mensajes y su versión estructurada)
+        self.lexer_errors = []
+        self.parser_errors = []
+        self.diagnostics = []
+
+        # En modo silencioso los errores solo se registran, no se imprimen
+        self.quiet = quiet
+        self.lexer = None  # Lexer de esta compilación (línea del fin de archivo inesperado)
+        self.source = None  # SourceText que se compila (para ubicar línea y columna)
+        self.error_pos = None  # lexpos del nodo del AST que se analiza (ubica los errores semánticos)
+
+        # Program producido por el parser; solo se conserva después de compilar si
+        # keep_ast es True (si no, se libera en cuanto se generó el código)
+        self.keep_ast = False
+        self.ast = None
+
+        # True si el resultado se tomó de la caché de compilación
+        self.from_cache = False
+
+        # En modo de solo verificación se hacen los análisis pero no la generación de
+        # código: no hay cuádruplos ni direcciones de variables, constantes o temporales
+        self.check_only = check_only
+
+        # Límite de errores (None = sin límite, 1 = detenerse en el primero); al
+        # alcanzarlo se aborta el análisis y truncated indica que pudo haber más
+        self.max_errors = max_errors
+        self.truncated = False
+
+        # Funciones de bibliotecas (FunctionUnit) que se enlazan antes que las del programa,
+        # unidades enlazadas en orden y, si la compilación fue incremental, (reutilizadas, recompiladas)
+        self.libraries = []
+        self.function_units = []
+        self.reused_functions = None
+
+        # Procesos para compilar las funciones en paralelo (1 = en este proceso), cuántas
+        # funciones se compilaron así y en cuántos procesos (a lo más los CPUs disponibles)
+        self.jobs = jobs
+        self.parallel_functions = 0
+        self.parallel_jobs = 0
+
+    def add_variable(self, var_name, var_type, scope=None):
+        """Declara una variable en la tabla de símbolos y retorna su Symbol (None si hay error)"""
+        if scope is None:
+            scope = self.current_scope
+        variables = self.symbol_table[scope]
+
+        # Verificar si el nombre de la variable es igual al nombre del programa
+        if var_name == self.program_name:
+            error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' no puede tener el mismo nombre que el programa"
+            self.report_error('semántico', error_msg)
+            return None
+
+        if var_name in variables:
+            error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' ya declarada en scope '{self.scope_names[scope]}'"
+            self.report_error('semántico', error_msg)
+            return None
+
+        symbol = variables[var_name] = Symbol(TYPE_CODES[var_type], None)
+        return symbol
+
+    def open_scope(self, scope_name):
+        """Vuelve actual el scope de una función con su tabla vacía y retorna su id"""
+        scope = self.scope_ids.get(scope_name)
+        if scope is None:
+            scope = len(self.symbol_table)
+            self.scope_ids[scope_name] = scope
+            self.scope_names.append(scope_name)
+            self.symbol_table.append({})
+        else:
+            self.symbol_table[scope] = {}
+        self.current_scope = scope
+        return scope
+
+    def report_error(self, phase, error_msg, line=None, lexpos=None):
+        """Registra un error léxico, sintáctico o semántico y lo imprime salvo en modo silencioso"""
+        if phase == 'léxico':
+            self.lexer_errors.append(error_msg)
+        else:
+            self.parser_errors.append(error_msg)
+        if lexpos is None and line is None:
+            lexpos = self.error_pos
+        column = None
+        if lexpos is not None and self.source is not None:
+            line, column = self.source.position(lexpos)
+        elif line is None and self.lexer is not None:
+            line = self.lexer.lineno  # Línea del último token leído
+        self.diagnostics.append(Diagnostic(phase, error_msg, line, column))
+        if not self.quiet:
+            print(f"❌ {error_msg}")
+        if self.max_errors is not None and len(self.diagnostics) >= self.max_errors:
+            self.truncated = True
+            raise CompilationHalted(error_msg)
+
+    def lookup_variable(self, var_name):
+        """Busca una variable y retorna su Symbol o None si no existe"""
+        # Solo busca en el scope actual (no accede a globales desde funciones)
+        symbol = self.symbol_table[self.current_scope].get(var_name)
+        if symbol is None:
+            scope_name = self.scope_names[self.current_scope]
+            error_msg = f"ERROR SEMÁNTICO: Variable '{var_name}' no declarada en scope '{scope_name}'"
+            self.report_error('semántico', error_msg)
+        return symbol
+
+    def register_constant(self, value, const_type):
+        """Registra una constante y retorna su dirección (reutiliza si ya existe)"""
+        if value in self.constants_table[const_type]:
+            return self.constants_table[const_type][value]
+        else:
+            address = self.memory_manager.get_constant_address(const_type)
+            self.constants_table[const_type][value] = address
+            return address
+
+    def add_function(self, func_name, return_type, params):
+        """Añade una función al directorio"""
+        # Verificar si el nombre de la función es igual al nombre del programa
+        if func_name == self.program_name:
+            error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' no puede tener el mismo nombre que el programa"
+            self.report_error('semántico', error_msg)
+            return False
+
+        if func_name in self.function_directory:
+            error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' ya declarada"
+            self.report_error('semántico', error_msg)
+            return False
+
+        # La generación de código completa las direcciones de los parámetros y start_quad
+        self.function_directory[func_name] = {
+            'type': return_type,
+            'params': params,
+            'vars': {},
+            'start_quad': None
+        }
+        return True
+
+    def check_semantic_cube(self, operator, type1, type2):
+        """Verifica compatibilidad de tipos (códigos) en el cubo semántico y retorna el código del resultado"""
+        result = SEMANTIC_CUBE[OPERATOR_CODES[operator]][type1][type2]
+        if result is not None:
+            return result
+
+        error_msg = f"ERROR SEMÁNTICO: Operación '{operator}' no válida entre tipos '{TYPES[type1]}' y '{TYPES[type2]}'"
+        self.report_error('semántico', error_msg)
+        return ERROR
+
+    def generate_temp(self, temp_type=INT):
+        """Genera un temporal del tipo indicado (código) y retorna su dirección de memoria virtual"""
+        return self.memory_manager.get_temp_address(TYPES[temp_type])
+
+    def add_quadruple(self, operator, operand1, operand2, result):
+        """Añade un cuádruple a la lista"""
+        self.quadruples.append((operator, operand1, operand2, result))
+        return len(self.quadruples) - 1
+
+    def fill_quadruple(self, quad_index, value):
+        """Rellena el campo resultado de un cuádruple pendiente"""
+        if quad_index < len(self.quadruples):
+            op, op1, op2, _ = self.quadruples[quad_index]
+            self.quadruples[quad_index] = (op, op1, op2, value)
+
 
 ###############################################################
-#                    PARSER CON SEMÁNTICA
+#              ÁRBOL DE SINTAXIS ABSTRACTA
 ###############################################################
 
-precedence = (
-    ('left', 'OP_EQ', 'OP_NEQ', 'OP_LT', 'OP_GT', 'OP_LEQ', 'OP_GEQ'), 
-    ('left', 'OP_SUMA', 'OP_RESTA'),
-    ('left', 'OP_MULT', 'OP_DIV'),
-)
+class Node:
+    """Nodo del AST. Cada subclase lista sus campos en __slots__ (sin __dict__);
+    pos es el lexpos del token principal y ubica los errores semánticos."""
+    __slots__ = ()
+    fields = ()
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.fields)
+        return f"{type(self).__name__}({values})"
+
+# Declaraciones (symbol lo asigna el análisis semántico)
+class Program(Node):
+    __slots__ = fields = ('name', 'vars', 'funcs', 'body', 'pos')
+
+    def __init__(self, name, vars, funcs, body, pos):
+        self.name = name
+        self.vars = vars
+        self.funcs = funcs
+        self.body = body
+        self.pos = pos
+
+class VarDecl(Node):
+    __slots__ = ('name', 'var_type', 'pos', 'symbol')
+    fields = ('name', 'var_type', 'pos')
+
+    def __init__(self, name, var_type, pos):
+        self.name = name
+        self.var_type = var_type
+        self.pos = pos
+
+class Function(Node):
+    __slots__ = fields = ('name', 'params', 'vars', 'body', 'pos')
+
+    def __init__(self, name, params, vars, body, pos):
+        self.name = name
+        self.params = params
+        self.vars = vars
+        self.body = body
+        self.pos = pos
+
+# Estatutos
+class Assign(Node):
+    __slots__ = ('target', 'expr', 'pos', 'symbol')
+    fields = ('target', 'expr', 'pos')
+
+    def __init__(self, target, expr, pos):
+        self.target = target
+        self.expr = expr
+        self.pos = pos
+
+class If(Node):
+    __slots__ = fields = ('cond', 'then_body', 'else_body', 'pos')
+
+    def __init__(self, cond, then_body, else_body, pos):
+        self.cond = cond
+        self.then_body = then_body
+        self.else_body = else_body
+        self.pos = pos
+
+class While(Node):
+    __slots__ = fields = ('cond', 'body', 'pos')
+
+    def __init__(self, cond, body, pos):
+        self.cond = cond
+        self.body = body
+        self.pos = pos
+
+class DoWhile(Node):
+    __slots__ = fields = ('body', 'cond', 'pos')
+
+    def __init__(self, body, cond, pos):
+        self.body = body
+        self.cond = cond
+        self.pos = pos
+
+class Call(Node):
+    __slots__ = fields = ('name', 'args', 'pos')
+
+    def __init__(self, name, args, pos):
+        self.name = name
+        self.args = args
+        self.pos = pos
+
+class Print(Node):
+    __slots__ = fields = ('args', 'pos')
+
+    def __init__(self, args, pos):
+        self.args = args
+        self.pos = pos
+
+# Expresiones (type y symbol los asigna el análisis semántico)
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right', 'pos', 'type')
+    fields = ('op', 'left', 'right', 'pos')
+
+    def __init__(self, op, left, right, pos):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.pos = pos
+
+class UnaryMinus(Node):
+    __slots__ = fields = ('operand', 'pos')
+
+    def __init__(self, operand, pos):
+        self.operand = operand
+        self.pos = pos
+
+class Var(Node):
+    __slots__ = ('name', 'pos', 'symbol')
+    fields = ('name', 'pos')
+
+    def __init__(self, name, pos):
+        self.name = name
+        self.pos = pos
+
+class Const(Node):
+    __slots__ = fields = ('value', 'type', 'pos')
+
+    def __init__(self, value, type, pos):
+        self.value = value
+        self.type = type
+        self.pos = pos
+
+###############################################################
+#                    PARSER (CONSTRUCCIÓN DEL AST)
+###############################################################
 
 start = 'program'
 
 def p_program(p):
-    '''program : PROGRAM ID program_name_save SEMICOL program_start program_vars program_funcs MAIN main_start program_body END'''
-    if len(parser_errors) == 0 and len(lexer_errors) == 0:
-        print("✅ Programa compilado exitosamente")
-
-def p_program_name_save(p):
-    '''program_name_save : '''
-    global program_name
-    program_name = p[-1]  # Guarda el nombre del programa (ID anterior)
-
-def p_program_start(p):
-    '''program_start : '''
-    # Generar GOTOMAIN al inicio para saltar a main (se llenará después)
-    quad_index = add_quadruple('GOTOMAIN', None, None, None)
-    jump_stack.append(quad_index)
+    '''program : PROGRAM ID SEMICOL program_vars program_funcs MAIN program_body END'''
+    p[0] = Program(p[2], p[4], p[5], p[7], p.lexpos(2))
 
 def p_program_vars(p):
     '''program_vars : vars
                     | empty'''
-    pass
+    p[0] = p[1] or []
 
 def p_program_funcs(p):
     '''program_funcs : funcs
                      | empty'''
-    pass
-
-def p_main_start(p):
-    '''main_start : '''
-    # Llenar el GOTO inicial para saltar aquí (inicio de main)
-    if len(jump_stack) > 0:
-        goto_main = jump_stack.pop()
-        fill_quadruple(goto_main, len(quadruples))
+    p[0] = p[1] or []
 
 def p_program_body(p):
     '''program_body : body'''
-    pass
+    p[0] = p[1]
 
 # VARS
 def p_vars_empty(p):
     '''vars : empty'''
-    pass
+    p[0] = []
 
 def p_vars_first(p):
     '''vars : VAR var_list'''
-    pass
+    p[0] = p[2]
 
 def p_var_list_single(p):
     '''var_list : id_list COLON type SEMICOL'''
-    var_type = p[3]
-    for var_name in p[1]:
-        add_variable(var_name, var_type)
+    p[0] = [VarDecl(var_name, p[3], pos) for var_name, pos in p[1]]
 
 def p_var_list_multiple(p):
-    '''var_list : id_list COLON type SEMICOL var_list'''
-    var_type = p[3]
-    for var_name in p[1]:
-        add_variable(var_name, var_type)
+    '''var_list : var_list id_list COLON type SEMICOL'''
+    p[1].extend(VarDecl(var_name, p[4], pos) for var_name, pos in p[2])
+    p[0] = p[1]
 
 def p_id_list_single(p):
     '''id_list : ID'''
-    p[0] = [p[1]]
+    p[0] = [(p[1], p.lexpos(1))]
 
 def p_id_list_multiple(p):
-    '''id_list : ID COMMA id_list'''
-    p[0] = [p[1]] + p[3]
+    '''id_list : id_list COMMA ID'''
+    # Recursión izquierda: la lista crece en su lugar y la pila LR no crece con ella
+    p[1].append((p[3], p.lexpos(3)))
+    p[0] = p[1]
 
 def p_type(p):
     '''type : INT
@@ -633,77 +734,55 @@ def p_type(p):
 # FUNCS
 def p_funcs_empty(p):
     '''funcs : empty'''
-    pass
+    p[0] = []
 
 def p_funcs_multiple(p):
-    '''funcs : func funcs'''
-    pass
+    '''funcs : funcs func'''
+    # Recursión izquierda: cada función se reduce en cuanto termina (pila acotada)
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_func(p):
-    '''func : VOID ID func_start LPAREN func_params RPAREN LBRACK func_vars func_body RBRACK SEMICOL func_end'''
-    pass
-
-def p_func_start(p):
-    '''func_start : '''
-    global current_scope, current_function
-    func_name = p[-1]
-    current_function = func_name
-    current_scope = func_name
-    symbol_table[current_scope] = {}
-    # Reiniciar contadores de memoria local para nueva función
-    memory_manager.reset_local_counters()
-
-def p_func_end(p):
-    '''func_end : '''
-    global current_scope, current_function
-    add_quadruple('ENDFUNC', None, None, None)
-    current_scope = 'global'
-    current_function = None
+    '''func : VOID ID LPAREN func_params RPAREN LBRACK func_vars func_body RBRACK SEMICOL'''
+    p[0] = Function(p[2], p[4], p[7], p[8], p.lexpos(2))
 
 def p_func_params(p):
     '''func_params : param_list
                    | empty'''
-    params = p[1] if p[1] else []
-    func_name = current_function
-    add_function(func_name, 'void', params)
+    p[0] = p[1] or []
 
 def p_param_list_single(p):
     '''param_list : ID COLON type'''
-    param_type = p[3]
-    param_address = add_variable(p[1], param_type)
-    p[0] = [(p[1], param_type, param_address)]
+    p[0] = [VarDecl(p[1], p[3], p.lexpos(1))]
 
 def p_param_list_multiple(p):
-    '''param_list : ID COLON type COMMA param_list'''
-    param_type = p[3]
-    param_address = add_variable(p[1], param_type)
-    p[0] = [(p[1], param_type, param_address)] + p[5]
+    '''param_list : param_list COMMA ID COLON type'''
+    p[1].append(VarDecl(p[3], p[5], p.lexpos(3)))
+    p[0] = p[1]
 
 def p_func_vars(p):
     '''func_vars : vars
                  | empty'''
-    pass
+    p[0] = p[1] or []
 
 def p_func_body(p):
     '''func_body : body'''
-    pass
+    p[0] = p[1]
 
 # BODY
 def p_body(p):
     '''body : LBRACE statements RBRACE'''
-    pass
+    p[0] = p[2]
 
 def p_statements_empty(p):
     '''statements : empty'''
-    pass
-
-def p_statements_single(p):
-    '''statements : statement'''
-    pass
+    p[0] = []
 
 def p_statements_multiple(p):
-    '''statements : statement statements'''
-    pass
+    '''statements : statements statement'''
+    # Recursión izquierda: cada estatuto se reduce en cuanto termina (pila acotada)
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_statement(p):
     '''statement : assign
@@ -711,187 +790,59 @@ def p_statement(p):
                  | cycle
                  | f_call
                  | print_stmt'''
-    pass
+    p[0] = p[1]
 
 # ASSIGN
 def p_assign(p):
     '''assign : ID OP_ASIGNA expression SEMICOL'''
-    var_type, var_address = lookup_variable(p[1])
-    if var_type and var_address is not None and len(stack_args) > 0:
-        expr_address, expr_type = stack_args.pop()
-        result_type = check_semantic_cube('=', var_type, expr_type)
-        if result_type != 'error':
-            add_quadruple('=', expr_address, None, var_address)
+    p[0] = Assign(p[1], p[3], p.lexpos(1))
 
 # CONDITION
 def p_condition(p):
-    '''condition : IF LPAREN expression RPAREN condition_check LBRACE statements RBRACE SEMICOL condition_end
-                 | IF LPAREN expression RPAREN condition_check LBRACE statements RBRACE ELSE condition_else LBRACE statements RBRACE SEMICOL condition_end'''
-    pass
-
-def p_condition_check(p):
-    '''condition_check : '''
-    if len(stack_args) > 0:
-        result, exp_type = stack_args.pop()
-        if exp_type != 'bool':
-            error_msg = f"ERROR SEMÁNTICO: La condición debe ser una expresión booleana, se recibió '{exp_type}'"
-            parser_errors.append(error_msg)
-            print(f"❌ {error_msg}")
-            return
-        quad_index = add_quadruple('GOTOF', result, None, None)
-        jump_stack.append(quad_index)
-
-def p_condition_else(p):
-    '''condition_else : '''
-    quad_index = add_quadruple('GOTO', None, None, None)
-    false_jump = jump_stack.pop()
-    fill_quadruple(false_jump, len(quadruples))
-    jump_stack.append(quad_index)
-
-def p_condition_end(p):
-    '''condition_end : '''
-    if len(jump_stack) > 0:
-        end_jump = jump_stack.pop()
-        fill_quadruple(end_jump, len(quadruples))
+    '''condition : IF LPAREN expression RPAREN LBRACE statements RBRACE SEMICOL
+                 | IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE SEMICOL'''
+    else_body = p[10] if len(p) == 13 else None
+    p[0] = If(p[3], p[6], else_body, p.lexpos(1))
 
 # CYCLE (WHILE)
 def p_cycle_while(p):
-    '''cycle : WHILE cycle_start LPAREN expression RPAREN cycle_check LBRACE statements RBRACE cycle_end SEMICOL'''
-    pass
-
-def p_cycle_start(p):
-    '''cycle_start : '''
-    jump_stack.append(len(quadruples))
-
-def p_cycle_check(p):
-    '''cycle_check : '''
-    if len(stack_args) > 0:
-        result, exp_type = stack_args.pop()
-        if exp_type != 'bool':
-            error_msg = f"ERROR SEMÁNTICO: La condición del ciclo debe ser booleana, se recibió '{exp_type}'"
-            parser_errors.append(error_msg)
-            print(f"❌ {error_msg}")
-            return
-        quad_index = add_quadruple('GOTOF', result, None, None)
-        jump_stack.append(quad_index)
-
-def p_cycle_end(p):
-    '''cycle_end : '''
-    if len(jump_stack) >= 2:
-        end_jump = jump_stack.pop()
-        return_addr = jump_stack.pop()
-        add_quadruple('GOTO', None, None, return_addr)
-        fill_quadruple(end_jump, len(quadruples))
+    '''cycle : WHILE LPAREN expression RPAREN LBRACE statements RBRACE SEMICOL'''
+    p[0] = While(p[3], p[6], p.lexpos(1))
 
 # CYCLE (DO-WHILE)
 def p_cycle_do(p):
-    '''cycle : DO cycle_do_start LBRACE statements RBRACE WHILE LPAREN expression RPAREN cycle_do_end SEMICOL'''
-    pass
-
-def p_cycle_do_start(p):
-    '''cycle_do_start : '''
-    jump_stack.append(len(quadruples))
-
-def p_cycle_do_end(p):
-    '''cycle_do_end : '''
-    if len(stack_args) > 0:
-        result, exp_type = stack_args.pop()
-        if exp_type != 'bool':
-            error_msg = f"ERROR SEMÁNTICO: La condición del ciclo debe ser booleana, se recibió '{exp_type}'"
-            parser_errors.append(error_msg)
-            print(f"❌ {error_msg}")
-            return
-        return_addr = jump_stack.pop()
-        add_quadruple('GOTOT', result, None, return_addr)
+    '''cycle : DO LBRACE statements RBRACE WHILE LPAREN expression RPAREN SEMICOL'''
+    p[0] = DoWhile(p[3], p[7], p.lexpos(1))
 
 # FUNCTION CALL
 def p_f_call(p):
-    '''f_call : ID LPAREN f_call_start expression_list RPAREN SEMICOL f_call_end
-              | ID LPAREN f_call_start RPAREN SEMICOL f_call_end'''
-    pass
-
-def p_f_call_start(p):
-    '''f_call_start : '''
-    global current_call
-    func_name = p[-2]
-    if func_name not in function_directory:
-        error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' no declarada"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
-    else:
-        add_quadruple('SUB', func_name, None, None)
-        current_call = (func_name, 0, [])
-
-def p_f_call_end(p):
-    '''f_call_end : '''
-    global current_call
-    if current_call:
-        func_name, param_count, arg_addresses = current_call
-        if func_name in function_directory:
-            expected_params = len(function_directory[func_name]['params'])
-            if param_count != expected_params:
-                error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' espera {expected_params} parámetros, se pasaron {param_count}"
-                parser_errors.append(error_msg)
-                print(f"❌ {error_msg}")
-            else:
-                params = function_directory[func_name]['params']
-                for i, arg_addr in enumerate(arg_addresses):
-                    param_addr = params[i][2]
-                    add_quadruple('PARAM', arg_addr, None, param_addr)
-                add_quadruple('GOSUB', func_name, None, function_directory[func_name]['start_quad'])
-        current_call = None
+    '''f_call : ID LPAREN expression_list RPAREN SEMICOL
+              | ID LPAREN RPAREN SEMICOL'''
+    args = p[3] if len(p) == 6 else []
+    p[0] = Call(p[1], args, p.lexpos(1))
 
 # PRINT
 def p_print_stmt(p):
     '''print_stmt : PRINT LPAREN expression_list RPAREN SEMICOL'''
-    # Agregar salto de línea al final del print
-    newline_addr = register_constant('"\\n"', 'string')
-    add_quadruple('PRINT', None, None, newline_addr)
+    p[0] = Print(p[3], p.lexpos(1))
 
 def p_expression_list_single(p):
-    '''expression_list : expression print_action'''
-    p[0] = 1
+    '''expression_list : expression'''
+    p[0] = [p[1]]
 
 def p_expression_list_multiple(p):
-    '''expression_list : expression print_action COMMA expression_list'''
-    p[0] = 1 + p[4]
-
-def p_print_action(p):
-    '''print_action : '''
-    global current_call
-    if len(stack_args) > 0:
-        operand_address, operand_type = stack_args.pop()
-        if current_call:
-            # Estamos en llamada a función - guardar argumento
-            func_name, count, arg_addresses = current_call
-            if func_name in function_directory:
-                params = function_directory[func_name]['params']
-                if count < len(params):
-                    expected_type = params[count][1]
-                    if operand_type and expected_type != operand_type and not (expected_type == 'float' and operand_type == 'int'):
-                        error_msg = f"ERROR SEMÁNTICO: Parámetro {count+1} de '{func_name}' debe ser '{expected_type}', se pasó '{operand_type}'"
-                        parser_errors.append(error_msg)
-                        print(f"❌ {error_msg}")
-            arg_addresses.append(operand_address)
-            current_call = (func_name, count + 1, arg_addresses)
-        else:
-            # Estamos en print - generar cuádruplo PRINT
-            add_quadruple('PRINT', None, None, operand_address)
+    '''expression_list : expression_list COMMA expression'''
+    p[1].append(p[3])
+    p[0] = p[1]
 
 # EXPRESSION
 def p_expression(p):
     '''expression : exp
                   | exp relop exp'''
     if len(p) == 4:
-        if len(stack_args) >= 2:
-            right_address, right_type = stack_args.pop()
-            left_address, left_type = stack_args.pop()
-            operator = p[2]
-            result_type = check_semantic_cube(operator, left_type, right_type)
-            if result_type != 'error':
-                temp_address = generate_temp(result_type)
-                add_quadruple(operator, left_address, right_address, temp_address)
-                stack_args.append((temp_address, result_type))
+        p[0] = BinOp(p[2], p[1], p[3], p.lexpos(2))
+    else:
+        p[0] = p[1]
 
 def p_relop(p):
     '''relop : OP_GT
@@ -901,438 +852,1048 @@ def p_relop(p):
              | OP_GEQ
              | OP_LEQ'''
     p[0] = p[1]
+    p.set_lexpos(0, p.lexpos(1))  # Posición del operador para el nodo BinOp
 
 def p_exp_single(p):
     '''exp : termino'''
-    pass
+    p[0] = p[1]
 
 def p_exp_add(p):
     '''exp : exp OP_SUMA termino
            | exp OP_RESTA termino'''
-    if len(stack_args) >= 2:
-        right_address, right_type = stack_args.pop()
-        left_address, left_type = stack_args.pop()
-        operator = p[2]
-        result_type = check_semantic_cube(operator, left_type, right_type)
-        if result_type != 'error':
-            temp_address = generate_temp(result_type)
-            add_quadruple(operator, left_address, right_address, temp_address)
-            stack_args.append((temp_address, result_type))
+    p[0] = BinOp(p[2], p[1], p[3], p.lexpos(2))
 
 def p_termino_single(p):
     '''termino : factor'''
-    pass
+    p[0] = p[1]
 
 def p_termino_mult(p):
     '''termino : termino OP_MULT factor
                | termino OP_DIV factor'''
-    if len(stack_args) >= 2:
-        right_address, right_type = stack_args.pop()
-        left_address, left_type = stack_args.pop()
-        operator = p[2]
-        result_type = check_semantic_cube(operator, left_type, right_type)
-        if result_type != 'error':
-            temp_address = generate_temp(result_type)
-            add_quadruple(operator, left_address, right_address, temp_address)
-            stack_args.append((temp_address, result_type))
+    p[0] = BinOp(p[2], p[1], p[3], p.lexpos(2))
 
 def p_factor_paren(p):
     '''factor : LPAREN expression RPAREN'''
-    pass
+    p[0] = p[2]
 
 def p_factor_unary_plus(p):
     '''factor : OP_SUMA var_cte'''
-    pass
+    p[0] = p[2]
 
 def p_factor_unary_minus(p):
     '''factor : OP_RESTA var_cte'''
-    if len(stack_args) > 0:
-        operand_address, operand_type = stack_args.pop()
-        temp_address = generate_temp(operand_type)
-        add_quadruple('UMINUS', operand_address, None, temp_address)
-        stack_args.append((temp_address, operand_type))
+    p[0] = UnaryMinus(p[2], p.lexpos(1))
 
 def p_factor_var_cte(p):
     '''factor : var_cte'''
-    pass
+    p[0] = p[1]
 
 def p_var_cte_id(p):
     '''var_cte : ID'''
-    var_type, var_address = lookup_variable(p[1])
-    if var_type and var_address is not None:
-        stack_args.append((var_address, var_type))
+    p[0] = Var(p[1], p.lexpos(1))
 
 def p_var_cte_int(p):
     '''var_cte : CONST_INT'''
-    address = register_constant(p[1], 'int')
-    stack_args.append((address, 'int'))
+    p[0] = Const(p[1], INT, p.lexpos(1))
 
 def p_var_cte_float(p):
     '''var_cte : CONST_FLOAT'''
-    address = register_constant(p[1], 'float')
-    stack_args.append((address, 'float'))
+    p[0] = Const(p[1], FLOAT, p.lexpos(1))
 
 def p_var_cte_string(p):
     '''var_cte : CONST_STRING'''
-    address = register_constant(f'"{p[1]}"', 'string')
-    stack_args.append((address, 'string'))
+    p[0] = Const(p[1], STRING, p.lexpos(1))
 
 def p_empty(p):
     '''empty :'''
     pass
 
-def p_error(p):
+def p_error(p, *, context=None, symbols=None):
+    # PLY llama a p_error sin el parser; get_parser() enlaza el contexto de cada compilación
+    # y su pila de símbolos. Lo ya reconocido se analiza antes de reportar el error.
+    if symbols is not None:
+        check_partial_program(context, [(symbol.type, symbol.value, getattr(symbol, 'lexpos', None))
+                                        for symbol in symbols[1:]])
+        context.error_pos = None
     if p:
         error_msg = f"ERROR SINTÁCTICO en línea {p.lineno}: Token inesperado '{p.value}' (tipo: {p.type})"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
+        context.report_error('sintáctico', error_msg, p.lineno, p.lexpos)
     else:
         error_msg = "ERROR SINTÁCTICO: Fin inesperado del archivo"
-        parser_errors.append(error_msg)
-        print(f"❌ {error_msg}")
+        context.report_error('sintáctico', error_msg)
+    # La gramática no tiene producciones error, así que la recuperación de PLY no
+    # puede resincronizar (y en los estados con reducción por defecto no termina)
+    raise CompilationHalted(error_msg)
+
+def get_parser(context):
+    """Retorna un parser para una compilación (copia que comparte las tablas LALR del proceso)"""
+    file_parser = copy.copy(gramatica.get_parser(sys.modules[__name__]))
+    file_parser.context = context
+    file_parser.errorfunc = lambda token: p_error(token, context=context, symbols=file_parser.symstack)
+    return file_parser
+
+###############################################################
+#                    ANÁLISIS SEMÁNTICO
+###############################################################
+
+# El análisis recorre el AST en el orden en que el parser reducía las producciones
+# y conserva la pila de tipos de operandos (ctx.stack_args): una expresión con un
+# error no apila su tipo, igual que antes, y los mensajes no cambian.
+
+def check_program(ctx, program):
+    """Declara variables y funciones y valida tipos; anota símbolos y tipos en el AST"""
+    ctx.program_name = program.name
+    declare_variables(ctx, program.vars)
+    for unit in ctx.libraries:
+        try:
+            install_function_unit(ctx, unit)
+        except StaleFunctionUnit:
+            ctx.error_pos = program.pos
+            error_msg = f"ERROR SEMÁNTICO: No se puede enlazar la función de biblioteca '{unit.name}'"
+            ctx.report_error('semántico', error_msg)
+    for func in program.funcs:
+        if type(func) is FunctionUnit:
+            install_function_unit(ctx, func)  # Función sin cambios de una compilación anterior
+        else:
+            check_function(ctx, func)
+    check_statements(ctx, program.body)
+
+def declare_variables(ctx, declarations):
+    for decl in declarations:
+        ctx.error_pos = decl.pos
+        decl.symbol = ctx.add_variable(decl.name, decl.var_type)
+
+def check_function(ctx, func):
+    ctx.current_function = func.name
+    ctx.open_scope(func.name)
+    declare_variables(ctx, func.params)
+    ctx.error_pos = func.pos
+    ctx.add_function(func.name, 'void', [(param.name, param.var_type, None) for param in func.params])
+    declare_variables(ctx, func.vars)
+    check_statements(ctx, func.body)
+    ctx.current_scope = GLOBAL_SCOPE
+    ctx.current_function = None
+
+def check_statements(ctx, statements):
+    for statement in statements:
+        STATEMENT_CHECKS[type(statement)](ctx, statement)
+
+def check_assign(ctx, node):
+    check_expression(ctx, node.expr)
+    ctx.error_pos = node.pos
+    node.symbol = ctx.lookup_variable(node.target)
+    if node.symbol is not None and len(ctx.stack_args) > 0:
+        ctx.check_semantic_cube('=', node.symbol.type, ctx.stack_args.pop())
+
+def check_condition_type(ctx, node, error_msg):
+    """Saca el tipo de la condición y reporta error_msg si no es booleana"""
+    if len(ctx.stack_args) > 0:
+        exp_type = ctx.stack_args.pop()
+        if exp_type != BOOL:
+            ctx.error_pos = node.pos
+            ctx.report_error('semántico', f"{error_msg}, se recibió '{TYPES[exp_type]}'")
+
+def check_if(ctx, node):
+    check_expression(ctx, node.cond)
+    check_condition_type(ctx, node, "ERROR SEMÁNTICO: La condición debe ser una expresión booleana")
+    check_statements(ctx, node.then_body)
+    if node.else_body is not None:
+        check_statements(ctx, node.else_body)
+
+def check_while(ctx, node):
+    check_expression(ctx, node.cond)
+    check_condition_type(ctx, node, "ERROR SEMÁNTICO: La condición del ciclo debe ser booleana")
+    check_statements(ctx, node.body)
+
+def check_do_while(ctx, node):
+    check_statements(ctx, node.body)
+    check_expression(ctx, node.cond)
+    check_condition_type(ctx, node, "ERROR SEMÁNTICO: La condición del ciclo debe ser booleana")
+
+def check_call(ctx, node):
+    ctx.error_pos = node.pos
+    if node.name not in ctx.function_directory:
+        error_msg = f"ERROR SEMÁNTICO: Función '{node.name}' no declarada"
+        ctx.report_error('semántico', error_msg)
+    else:
+        ctx.current_call = (node.name, 0)
+    check_arguments(ctx, node.args)
+    if ctx.current_call:
+        func_name, param_count = ctx.current_call
+        expected_params = len(ctx.function_directory[func_name]['params'])
+        if param_count != expected_params:
+            ctx.error_pos = node.pos
+            error_msg = f"ERROR SEMÁNTICO: Función '{func_name}' espera {expected_params} parámetros, se pasaron {param_count}"
+            ctx.report_error('semántico', error_msg)
+        ctx.current_call = None
+
+def check_print(ctx, node):
+    check_arguments(ctx, node.args)
+
+def check_arguments(ctx, args):
+    """Valida los argumentos de una llamada (o de print) contra los parámetros esperados"""
+    for arg in args:
+        check_expression(ctx, arg)
+        if len(ctx.stack_args) == 0:
+            continue
+        operand_type = ctx.stack_args.pop()
+        if ctx.current_call:
+            func_name, count = ctx.current_call
+            params = ctx.function_directory[func_name]['params']
+            if count < len(params):
+                expected_type = TYPE_CODES[params[count][1]]
+                if expected_type != operand_type and not (expected_type == FLOAT and operand_type == INT):
+                    ctx.error_pos = arg.pos
+                    error_msg = f"ERROR SEMÁNTICO: Parámetro {count+1} de '{func_name}' debe ser '{TYPES[expected_type]}', se pasó '{TYPES[operand_type]}'"
+                    ctx.report_error('semántico', error_msg)
+            ctx.current_call = (func_name, count + 1)
+
+STATEMENT_CHECKS = {
+    Assign: check_assign,
+    If: check_if,
+    While: check_while,
+    DoWhile: check_do_while,
+    Call: check_call,
+    Print: check_print,
+}
 
-parser = yacc.yacc(write_tables=False, debug=False)
-print("✅ Parser con análisis semántico construido correctamente")
+def check_expression(ctx, node):
+    """Apila el código de tipo de la expresión (nada si tiene un error)"""
+    node_type = type(node)
+    if node_type is BinOp:
+        check_expression(ctx, node.left)
+        check_expression(ctx, node.right)
+        if len(ctx.stack_args) >= 2:
+            right_type = ctx.stack_args.pop()
+            left_type = ctx.stack_args.pop()
+            ctx.error_pos = node.pos
+            node.type = ctx.check_semantic_cube(node.op, left_type, right_type)
+            if node.type != ERROR:
+                ctx.stack_args.append(node.type)
+    elif node_type is Var:
+        ctx.error_pos = node.pos
+        node.symbol = ctx.lookup_variable(node.name)
+        if node.symbol is not None:
+            ctx.stack_args.append(node.symbol.type)
+    elif node_type is Const:
+        ctx.stack_args.append(node.type)
+    else:
+        # UnaryMinus conserva el tipo de su operando
+        check_expression(ctx, node.operand)
+
+# Símbolos de la pila del parser que son (parte de) una expresión ya reducida
+_EXPRESSION_SYMBOLS = ('expression', 'exp', 'termino', 'factor', 'var_cte')
+
+def check_partial_program(ctx, symbols):
+    """Analiza lo que el parser reconoció antes de un error sintáctico.
+
+    symbols es la pila del parser como tuplas (tipo, valor, lexpos): se revisan en orden
+    las declaraciones, funciones, estatutos y expresiones ya reducidos. Las revisiones
+    que dependen del token siguiente (inicio de llamada, argumento, condición) no se
+    hacen sobre el último símbolo, porque ese token es el del error."""
+    types = [symbol[0] for symbol in symbols]
+    for i, (symbol_type, value, _) in enumerate(symbols):
+        before = tuple(types[max(i - 2, 0):i])
+        followed = i + 1 < len(symbols)
+        if symbol_type == 'program':
+            check_program(ctx, value)  # Programa completo seguido de más tokens
+        elif symbol_type == 'ID' and before[-1:] == ('PROGRAM',):
+            ctx.program_name = value
+        elif symbol_type == 'ID' and before[-1:] == ('VOID',):
+            ctx.current_function = value
+            ctx.open_scope(value)
+        elif symbol_type == 'LPAREN' and before[-1:] == ('ID',) and before != ('VOID', 'ID') and followed:
+            # Inicio de una llamada: se reporta la función no declarada
+            _, func_name, ctx.error_pos = symbols[i - 1]
+            if func_name not in ctx.function_directory:
+                ctx.report_error('semántico', f"ERROR SEMÁNTICO: Función '{func_name}' no declarada")
+            else:
+                ctx.current_call = (func_name, 0)
+        elif symbol_type in ('program_vars', 'vars', 'var_list', 'func_vars', 'param_list'):
+            declare_variables(ctx, value)
+        elif symbol_type == 'func_params':
+            declare_variables(ctx, value)
+            ctx.add_function(ctx.current_function, 'void', [(param.name, param.var_type, None) for param in value])
+        elif symbol_type in ('program_funcs', 'funcs'):
+            for func in value:
+                check_function(ctx, func)
+        elif symbol_type == 'func':
+            check_function(ctx, value)
+        elif symbol_type in ('statements', 'body', 'program_body', 'func_body'):
+            check_statements(ctx, value)
+        elif symbol_type in ('statement', 'assign', 'condition', 'cycle', 'f_call', 'print_stmt'):
+            check_statements(ctx, [value])
+        elif symbol_type == 'expression_list':
+            check_arguments(ctx, value)
+        elif symbol_type in _EXPRESSION_SYMBOLS:
+            if followed and before in (('ID', 'LPAREN'), ('PRINT', 'LPAREN'), ('expression_list', 'COMMA')):
+                check_arguments(ctx, [value])
+                continue
+            check_expression(ctx, value)
+            if before in (('IF', 'LPAREN'), ('WHILE', 'LPAREN')) and types[i + 1:i + 2] == ['RPAREN']:
+                error_msg = ("ERROR SEMÁNTICO: La condición debe ser una expresión booleana" if before[0] == 'IF'
+                             else "ERROR SEMÁNTICO: La condición del ciclo debe ser booleana")
+                check_condition_type(ctx, value, error_msg)
+
+###############################################################
+#              GENERACIÓN DE CÓDIGO INTERMEDIO
+###############################################################
+
+# Solo se ejecuta sobre un AST sin errores: asigna direcciones de memoria virtual
+# en el orden de declaración y emite los cuádruplos en el orden del código fuente.
+
+def generate_program(ctx, program):
+    """Asigna direcciones y genera los cuádruplos de un programa ya analizado"""
+    # GOTOMAIN al inicio para saltar a main (se llena al terminar las funciones)
+    goto_main = ctx.add_quadruple('GOTOMAIN', None, None, None)
+    for decl in program.vars:
+        decl.symbol.address = ctx.memory_manager.get_global_address(decl.var_type)
+    # Las funciones se compilan por separado y se enlazan en orden (bibliotecas primero)
+    for unit in ctx.libraries:
+        link_function_unit(ctx, unit)
+    for i, func in enumerate(program.funcs):
+        if type(func) is not FunctionUnit:
+            func = generate_function_unit(ctx, func)
+            if not ctx.keep_ast:
+                program.funcs[i] = func  # El AST de la función se libera en cuanto se compila
+        link_function_unit(ctx, func)
+    ctx.fill_quadruple(goto_main, len(ctx.quadruples))
+    generate_statements(ctx, program.body)
+
+def generate_function(ctx, func):
+    # Reiniciar contadores de memoria local para nueva función
+    memory_manager = ctx.memory_manager
+    memory_manager.reset_local_counters()
+    params = []
+    for param in func.params:
+        param.symbol.address = memory_manager.get_local_address(param.var_type)
+        params.append((param.name, param.var_type, param.symbol.address))
+    function_info = ctx.function_directory[func.name]
+    function_info['params'] = params
+    function_info['start_quad'] = len(ctx.quadruples)
+    for decl in func.vars:
+        decl.symbol.address = memory_manager.get_local_address(decl.var_type)
+    generate_statements(ctx, func.body)
+    ctx.add_quadruple('ENDFUNC', None, None, None)
+
+def generate_statements(ctx, statements):
+    for statement in statements:
+        STATEMENT_GENERATORS[type(statement)](ctx, statement)
+
+def generate_assign(ctx, node):
+    expr_address, expr_type = generate_expression(ctx, node.expr)
+    # El cubo marca como 'error' (sin mensaje) asignar un float a un int: no se emite
+    if SEMANTIC_CUBE[OPERATOR_CODES['=']][node.symbol.type][expr_type] != ERROR:
+        ctx.add_quadruple('=', expr_address, None, node.symbol.address)
+
+def generate_if(ctx, node):
+    result, _ = generate_expression(ctx, node.cond)
+    false_jump = ctx.add_quadruple('GOTOF', result, None, None)
+    generate_statements(ctx, node.then_body)
+    if node.else_body is not None:
+        end_jump = ctx.add_quadruple('GOTO', None, None, None)
+        ctx.fill_quadruple(false_jump, len(ctx.quadruples))
+        generate_statements(ctx, node.else_body)
+        ctx.fill_quadruple(end_jump, len(ctx.quadruples))
+    else:
+        ctx.fill_quadruple(false_jump, len(ctx.quadruples))
+
+def generate_while(ctx, node):
+    return_addr = len(ctx.quadruples)
+    result, _ = generate_expression(ctx, node.cond)
+    end_jump = ctx.add_quadruple('GOTOF', result, None, None)
+    generate_statements(ctx, node.body)
+    ctx.add_quadruple('GOTO', None, None, return_addr)
+    ctx.fill_quadruple(end_jump, len(ctx.quadruples))
+
+def generate_do_while(ctx, node):
+    return_addr = len(ctx.quadruples)
+    generate_statements(ctx, node.body)
+    result, _ = generate_expression(ctx, node.cond)
+    ctx.add_quadruple('GOTOT', result, None, return_addr)
+
+def generate_call(ctx, node):
+    function_info = ctx.function_directory[node.name]
+    ctx.add_quadruple('SUB', node.name, None, None)
+    arg_addresses = [generate_expression(ctx, arg)[0] for arg in node.args]
+    for arg_addr, param in zip(arg_addresses, function_info['params']):
+        ctx.add_quadruple('PARAM', arg_addr, None, param[2])
+    ctx.add_quadruple('GOSUB', node.name, None, function_info['start_quad'])
+
+def generate_print(ctx, node):
+    for arg in node.args:
+        operand_address, _ = generate_expression(ctx, arg)
+        ctx.add_quadruple('PRINT', None, None, operand_address)
+    # Agregar salto de línea al final del print
+    newline_addr = ctx.register_constant('"\\n"', 'string')
+    ctx.add_quadruple('PRINT', None, None, newline_addr)
+
+STATEMENT_GENERATORS = {
+    Assign: generate_assign,
+    If: generate_if,
+    While: generate_while,
+    DoWhile: generate_do_while,
+    Call: generate_call,
+    Print: generate_print,
+}
+
+def generate_expression(ctx, node):
+    """Genera los cuádruplos de una expresión y retorna (dirección, código de tipo)"""
+    node_type = type(node)
+    if node_type is BinOp:
+        left_address, _ = generate_expression(ctx, node.left)
+        right_address, _ = generate_expression(ctx, node.right)
+        temp_address = ctx.generate_temp(node.type)
+        ctx.add_quadruple(node.op, left_address, right_address, temp_address)
+        return temp_address, node.type
+    if node_type is Var:
+        return node.symbol.address, node.symbol.type
+    if node_type is Const:
+        value = f'"{node.value}"' if node.type == STRING else node.value
+        return ctx.register_constant(value, TYPES[node.type]), node.type
+    operand_address, operand_type = generate_expression(ctx, node.operand)
+    temp_address = ctx.generate_temp(operand_type)
+    ctx.add_quadruple('UMINUS', operand_address, None, temp_address)
+    return temp_address, operand_type
+
+###############################################################
+#              COMPILACIÓN SEPARADA Y ENLAZADO
+###############################################################
+
+# Cada función se genera aparte como una unidad reubicable (FunctionUnit) y el
+# enlazador la agrega al programa asignándole sus direcciones definitivas. Las
+# unidades no dependen de su posición, así que se pueden reutilizar en otra
+# compilación del mismo programa o enlazar en otros programas (bibliotecas).
+
+class FunctionUnit:
+    """Función compilada sin errores como unidad reubicable.
+
+    Sus cuádruplos usan direcciones locales a la unidad: los saltos son relativos
+    a su primer cuádruplo, GOSUB lleva solo el nombre de la función llamada, las
+    constantes son de su propia tabla (constants) y los temporales empiezan en la
+    base de su segmento. calls guarda la firma de las funciones que llama: si una
+    cambia, la unidad ya no se puede enlazar."""
+    __slots__ = ('name', 'params', 'symbols', 'quads', 'constants', 'temps', 'locals_end', 'calls')
+
+    def __repr__(self):
+        return f"FunctionUnit({self.name!r}, quads={len(self.quads)})"
+
+
+class StaleFunctionUnit(Exception):
+    """Una FunctionUnit no se puede enlazar porque cambió algo de lo que depende"""
+
+    def __init__(self, unit):
+        super().__init__(unit.name)
+        self.unit = unit
+
+
+# Tipo, base y límite de los temporales int, float y bool (orden de FunctionUnit.temps)
+_TEMP_SEGMENTS = (('int', MemorySegments.TEMP_INT_BASE, MemorySegments.TEMP_INT_LIMIT),
+                  ('float', MemorySegments.TEMP_FLOAT_BASE, MemorySegments.TEMP_FLOAT_LIMIT),
+                  ('bool', MemorySegments.TEMP_BOOL_BASE, MemorySegments.TEMP_BOOL_LIMIT))
+_JUMPS = ('GOTO', 'GOTOF', 'GOTOT')
+
+def generate_function_unit(ctx, func):
+    """Genera una función ya analizada como FunctionUnit, con cuádruplos, constantes y memoria propios"""
+    program_state = (ctx.quadruples, ctx.constants_table, ctx.memory_manager)
+    ctx.quadruples = []
+    ctx.constants_table = {'int': {}, 'float': {}, 'string': {}}
+    ctx.memory_manager = memory_manager = MemoryManager()
+    try:
+        generate_function(ctx, func)
+        unit = FunctionUnit()
+        unit.name = func.name
+        unit.params = ctx.function_directory[func.name]['params']
+        unit.symbols = ctx.symbol_table[ctx.scope_ids[func.name]]
+        unit.quads = [(operator, operand1, operand2, None if operator == 'GOSUB' else result)
+                      for operator, operand1, operand2, result in ctx.quadruples]
+        unit.constants = ctx.constants_table
+        unit.temps = tuple(counter - base for counter, (_, base, _) in zip(
+            (memory_manager.temp_int, memory_manager.temp_float, memory_manager.temp_bool), _TEMP_SEGMENTS))
+        unit.locals_end = (memory_manager.local_int, memory_manager.local_float, memory_manager.local_string)
+        unit.calls = {quad[1]: tuple(param[1] for param in ctx.function_directory[quad[1]]['params'])
+                      for quad in unit.quads if quad[0] == 'GOSUB'}
+    finally:
+        ctx.quadruples, ctx.constants_table, ctx.memory_manager = program_state
+    return unit
+
+def install_function_unit(ctx, unit):
+    """Declara la función de una FunctionUnit (lo que haría check_function sin errores)"""
+    directory = ctx.function_directory
+    if unit.name == ctx.program_name or ctx.program_name in unit.symbols or unit.name in directory:
+        raise StaleFunctionUnit(unit)
+    for callee, param_types in unit.calls.items():
+        if callee != unit.name and (callee not in directory or
+                                    tuple(param[1] for param in directory[callee]['params']) != param_types):
+            raise StaleFunctionUnit(unit)
+    scope = ctx.open_scope(unit.name)
+    ctx.symbol_table[scope] = dict(unit.symbols)
+    directory[unit.name] = {'type': 'void', 'params': list(unit.params), 'vars': {}, 'start_quad': None}
+    ctx.current_scope = GLOBAL_SCOPE
+
+def link_function_unit(ctx, unit):
+    """Enlaza una FunctionUnit al final del programa.
+
+    Fija su cuádruplo inicial, registra sus constantes en la tabla del programa
+    (sin repetir las que ya existen), recorre sus temporales hasta los libres y
+    resuelve los saltos y las llamadas."""
+    memory_manager = ctx.memory_manager
+    start = len(ctx.quadruples)
+    ctx.function_directory[unit.name]['start_quad'] = start
+
+    address_map = {}
+    for const_type, values in unit.constants.items():
+        for value, address in values.items():
+            program_address = ctx.register_constant(value, const_type)
+            if program_address != address:
+                address_map[address] = program_address
+
+    counters = [memory_manager.temp_int, memory_manager.temp_float, memory_manager.temp_bool]
+    for i, ((temp_type, base, limit), count) in enumerate(zip(_TEMP_SEGMENTS, unit.temps)):
+        if counters[i] + count > limit + 1:
+            raise MemoryError(f"Desbordamiento de memoria temporal {temp_type}")
+        if counters[i] != base:
+            address_map.update((address, address + counters[i] - base) for address in range(base, base + count))
+        counters[i] += count
+    memory_manager.temp_int, memory_manager.temp_float, memory_manager.temp_bool = counters
+    memory_manager.local_int, memory_manager.local_float, memory_manager.local_string = unit.locals_end
+
+    relocate = address_map.get
+    directory = ctx.function_directory
+    append = ctx.quadruples.append
+    for operator, operand1, operand2, result in unit.quads:
+        if operator in _JUMPS:
+            result += start
+        elif operator == 'GOSUB':
+            result = directory[operand1]['start_quad']
+        else:
+            result = relocate(result, result)
+        append((operator, relocate(operand1, operand1), relocate(operand2, operand2), result))
+    ctx.function_units.append(unit)
 
 ###############################################################
 #                    MÁQUINA VIRTUAL
 ###############################################################
 
+# Operadores de los cuádruplos. load_program traduce cada cuádruplo una sola vez a una
+# instrucción decodificada: una función sin argumentos que ya tiene resueltos sus
+# operandos, el tipo de operación (numérica o de strings) y el cuádruplo siguiente o el
+# destino del salto, y que al ejecutarse retorna el índice del siguiente cuádruplo.
+OPCODES = ('+', '-', '*', '/', 'UMINUS', '=', '>', '<', '>=', '<=', '==', '!=',
+           'GOTOMAIN', 'GOTO', 'GOTOF', 'GOTOT', 'SUB', 'PARAM', 'GOSUB', 'ENDFUNC', 'PRINT', 'END')
+OPCODE_IDS = {operator: code for code, operator in enumerate(OPCODES)}
+UNKNOWN_OPCODE = len(OPCODES)  # Operador desconocido: es error solo si se llega a ejecutar
+
+# Operaciones binarias que no dependen del tipo de sus operandos
+_BINARY_OPERATIONS = {
+    '-': sub, '>': gt, '<': lt, '>=': ge, '<=': le, '==': eq, '!=': ne,
+}
+
+def is_string_address(address):
+    """True si la dirección es de una variable o constante string (los temporales
+    string usan el rango int)"""
+    return type(address) is int and (
+        MemorySegments.GLOBAL_STRING_BASE <= address <= MemorySegments.GLOBAL_STRING_LIMIT or
+        MemorySegments.LOCAL_STRING_BASE <= address <= MemorySegments.LOCAL_STRING_LIMIT or
+        MemorySegments.CONST_STRING_BASE <= address <= MemorySegments.CONST_STRING_LIMIT)
+
+def string_addresses(quads):
+    """Direcciones que pueden guardar un string: las de los segmentos string y los
+    temporales que reciben el resultado de una operación con strings"""
+    strings = {address for quad in quads for address in quad[1:] if is_string_address(address)}
+    changed = True
+    while changed:  # Un temporal puede usarse en una operación antes de la que lo calcula
+        changed = False
+        for operator, op1, op2, result in quads:
+            if result not in strings and (
+                    (operator in ('+', '=') and (op1 in strings or op2 in strings)) or
+                    (operator == '*' and op1 in strings)):
+                strings.add(result)
+                changed = True
+    return strings
+
+# Dirección base y valor por defecto de cada tipo (en orden de dirección) en los
+# segmentos de la VM, y tamaño del rango de cada tipo
+_SEGMENT_TYPES = {
+    'global': (MemorySegments.GLOBAL_INT_BASE, (0, 0.0, "", None)),  # int, float, string, void
+    'local': (MemorySegments.LOCAL_INT_BASE, (0, 0.0, "")),
+    'temp': (MemorySegments.TEMP_INT_BASE, (0, 0.0, False)),  # int (y string), float, bool
+    'constant': (MemorySegments.CONST_INT_BASE, (None, None, None)),  # Sin valor: constante no encontrada
+}
+_TYPE_SPAN = MemorySegments.GLOBAL_FLOAT_BASE - MemorySegments.GLOBAL_INT_BASE
+_USAGE_KEYS = {'global': 'global', 'local': 'local', 'temp': 'temp', 'constant': 'const'}
+_JUMP_OPERATORS = ('GOTOMAIN', 'GOTO', 'GOTOF', 'GOTOT', 'GOSUB')
+
+def memory_segment(address):
+    """Segmento de memoria de una dirección (None si no es de ninguno)"""
+    if MemorySegments.GLOBAL_INT_BASE <= address <= MemorySegments.GLOBAL_VOID_LIMIT:
+        return 'global'
+    elif MemorySegments.LOCAL_INT_BASE <= address <= MemorySegments.LOCAL_STRING_LIMIT:
+        return 'local'
+    elif MemorySegments.TEMP_INT_BASE <= address <= MemorySegments.TEMP_BOOL_LIMIT:
+        return 'temp'
+    elif MemorySegments.CONST_INT_BASE <= address <= MemorySegments.CONST_STRING_LIMIT:
+        return 'constant'
+    return None
+
+def segment_sizes(quads, const_table, memory_usage=None):
+    """Casillas de cada tipo en cada segmento: las de los contadores del compilador o,
+    si son más, hasta la última dirección que usa el programa. Los contadores locales
+    solo son de la última función generada, así que los locales salen del recorrido."""
+    sizes = {segment: [0] * len(defaults) for segment, (_, defaults) in _SEGMENT_TYPES.items()}
+    if memory_usage:
+        for segment, key in _USAGE_KEYS.items():
+            for i, count in enumerate(memory_usage[key].values()):
+                sizes[segment][i] = count
+    addresses = {address for values in const_table.values() for address in values.values()}
+    for operator, op1, op2, result in quads:
+        addresses.update((op1, op2) if operator in _JUMP_OPERATORS else (op1, op2, result))
+    for address in addresses:
+        if type(address) is int:
+            segment = memory_segment(address)
+            if segment is not None:
+                block, offset = divmod(address - _SEGMENT_TYPES[segment][0], _TYPE_SPAN)
+                sizes[segment][block] = max(sizes[segment][block], offset + 1)
+    return sizes
+
+class SegmentLayout:
+    """Un segmento de memoria de la VM como lista: un bloque por tipo, del tamaño que
+    usa el programa y con el valor por defecto del tipo ya puesto"""
+
+    def __init__(self, segment, sizes):
+        self.base, defaults = _SEGMENT_TYPES[segment]
+        self.offsets = []  # Posición en la lista de la primera casilla de cada tipo
+        self.defaults = []
+        for default, size in zip(defaults, sizes):
+            self.offsets.append(len(self.defaults))
+            self.defaults.extend([default] * size)
+
+    def index(self, address):
+        """Posición en la lista de una dirección del segmento"""
+        block, offset = divmod(address - self.base, _TYPE_SPAN)
+        return self.offsets[block] + offset
+
+    def new(self):
+        """Memoria nueva del segmento, con los valores por defecto"""
+        return list(self.defaults)
+
+def concatenate(val1, val2):
+    """Suma con strings: concatena sin las comillas de cada lado"""
+    v1 = val1[1:-1] if isinstance(val1, str) and val1.startswith('"') else str(val1)
+    v2 = val2[1:-1] if isinstance(val2, str) and val2.startswith('"') else str(val2)
+    return f'"{v1}{v2}"'
+
+def repeat(val1, val2):
+    """Multiplicación de un string por un entero: lo repite"""
+    if isinstance(val1, str) and isinstance(val2, int):
+        inner = val1[1:-1] if val1.startswith('"') else val1
+        return f'"{inner * val2}"'
+    return val1 * val2
+
 class VirtualMachine:
     """Máquina virtual para ejecutar cuádruplos de Little Duck"""
 
     def __init__(self):
+        self._decoders = tuple(getattr(self, name) for name in self.DECODERS)
+        self.quadruples = []
+        self.function_directory = {}
+        self.call_stack = []
+        self.frame_stack = []  # Marcos locales guardados de las funciones que llamaron
+        self._allocate(segment_sizes([], {}))
+        self.code = []  # Instrucción decodificada de cada cuádruplo
         self.reset()
 
     def reset(self):
-        """Reinicia el estado de la VM"""
-        self.global_memory = {}
-        self.local_memory_stack = [{}]  # Pila de marcos locales
-        self.temp_memory = {}
-        self.constant_memory = {}
+        """Reinicia el estado de ejecución; el programa cargado se conserva.
+
+        La memoria se reinicia en su lugar: las instrucciones decodificadas guardan
+        las listas de cada segmento."""
+        layouts = self._layouts
+        self.global_memory[:] = layouts['global'].defaults
+        self.local_memory[:] = layouts['local'].defaults
+        self.temp_memory[:] = layouts['temp'].defaults
+        self._pending_params[:] = layouts['local'].defaults
+        self.frame_stack.clear()
+        self.call_stack.clear()
         self.instruction_pointer = 0
-        self.call_stack = []
         self.running = True
         self.output = []
 
-    def load_program(self, quads, const_table, func_dir):
-        """Carga el programa compilado en la VM"""
+    def load_program(self, quads, const_table, func_dir, memory_usage=None):
+        """Carga el programa compilado en la VM y lo decodifica (una vez por programa).
+
+        memory_usage son los contadores de MemoryManager.get_memory_usage(); con ellos y
+        las direcciones de los cuádruplos se dimensiona la memoria de cada segmento."""
         self.quadruples = quads
         self.function_directory = func_dir
+        self._allocate(segment_sizes(quads, const_table, memory_usage))
         self._load_constants(const_table)
+        self.reset()
+        self._strings = string_addresses(quads)
+        self.code = [self._decode(index, quad) for index, quad in enumerate(quads)]
+        self._strings = None
+
+    def _allocate(self, sizes):
+        """Crea la memoria de cada segmento con los tamaños por tipo del programa"""
+        self._layouts = {segment: SegmentLayout(segment, segment_sizes) for segment, segment_sizes in sizes.items()}
+        self._memories = {segment: layout.new() for segment, layout in self._layouts.items()}
+        self.global_memory = self._memories['global']
+        self.local_memory = self._memories['local']  # Marco de la función en ejecución
+        self.temp_memory = self._memories['temp']
+        self.constant_memory = self._memories['constant']
+        self._pending_params = self._layouts['local'].new()  # Marco de la llamada en preparación
 
     def _load_constants(self, const_table):
         """Carga las constantes en memoria"""
+        layout = self._layouts['constant']
         for const_type, values in const_table.items():
             for value, address in values.items():
-                self.constant_memory[address] = value
-
-    def _get_memory_segment(self, address):
-        """Determina a qué segmento de memoria pertenece una dirección"""
-        if MemorySegments.GLOBAL_INT_BASE <= address <= MemorySegments.GLOBAL_VOID_LIMIT:
-            return 'global'
-        elif MemorySegments.LOCAL_INT_BASE <= address <= MemorySegments.LOCAL_STRING_LIMIT:
-            return 'local'
-        elif MemorySegments.TEMP_INT_BASE <= address <= MemorySegments.TEMP_BOOL_LIMIT:
-            return 'temp'
-        elif MemorySegments.CONST_INT_BASE <= address <= MemorySegments.CONST_STRING_LIMIT:
-            return 'constant'
-        else:
+                self.constant_memory[layout.index(address)] = value
+
+    def _decode(self, index, quad):
+        """Instrucción decodificada de un cuádruplo; si tiene un operando inválido, la
+        instrucción reporta el error solo si se llega a ejecutar"""
+        try:
+            return self._decoders[OPCODE_IDS.get(quad[0], UNKNOWN_OPCODE)](index, *quad)
+        except RuntimeError as e:
+            message = str(e)
+            def invalid():
+                raise RuntimeError(message)
+            return invalid
+
+    def _operand(self, address):
+        """Lista y posición de la dirección de un operando (los locales son los del marco en ejecución)"""
+        segment = memory_segment(address) if type(address) is int else None
+        if segment is None:
             raise RuntimeError(f"Dirección de memoria inválida: {address}")
-
-    def _get_value(self, address):
-        """Obtiene el valor de una dirección de memoria"""
-        if address is None:
-            return None
-
-        # Si es un número menor a 1000, es un valor literal (para saltos)
-        if isinstance(address, int) and address < 1000:
-            return address
-
-        # Si es un string (nombre de función), retornarlo directamente
-        if isinstance(address, str):
-            return address
-
-        segment = self._get_memory_segment(address)
-
-        if segment == 'global':
-            if address not in self.global_memory:
-                return self._get_default_value(address, 'global')
-            return self.global_memory[address]
-
-        elif segment == 'local':
-            if not self.local_memory_stack:
-                raise RuntimeError("No hay marco de memoria local activo")
-            current_frame = self.local_memory_stack[-1]
-            if address not in current_frame:
-                return self._get_default_value(address, 'local')
-            return current_frame[address]
-
-        elif segment == 'temp':
-            if address not in self.temp_memory:
-                return self._get_default_value(address, 'temp')
-            return self.temp_memory[address]
-
-        elif segment == 'constant':
-            if address not in self.constant_memory:
-                raise RuntimeError(f"Constante no encontrada en dirección {address}")
-            return self.constant_memory[address]
-
-    def _get_default_value(self, address, segment_type):
-        """Retorna valor por defecto según el rango de dirección"""
-        if segment_type == 'global':
-            if address < MemorySegments.GLOBAL_FLOAT_BASE:
-                return 0
-            elif address < MemorySegments.GLOBAL_STRING_BASE:
-                return 0.0
-            elif address < MemorySegments.GLOBAL_VOID_BASE:
-                return ""
-            else:
-                return None  # void
-        elif segment_type == 'local':
-            if address < MemorySegments.LOCAL_FLOAT_BASE:
-                return 0
-            elif address < MemorySegments.LOCAL_STRING_BASE:
-                return 0.0
-            else:
-                return ""
-        elif segment_type == 'temp':
-            if address < MemorySegments.TEMP_FLOAT_BASE:
-                return 0
-            elif address < MemorySegments.TEMP_BOOL_BASE:
-                return 0.0
-            else:
-                return False
-
-    def _set_value(self, address, value):
-        """Almacena un valor en una dirección de memoria"""
-        segment = self._get_memory_segment(address)
-
-        if segment == 'global':
-            self.global_memory[address] = value
-        elif segment == 'local':
-            if not self.local_memory_stack:
-                self.local_memory_stack.append({})
-            self.local_memory_stack[-1][address] = value
-        elif segment == 'temp':
-            self.temp_memory[address] = value
-        elif segment == 'constant':
+        memory = self._memories[segment]
+        position = self._layouts[segment].index(address)
+        if segment == 'constant' and memory[position] is None:
+            raise RuntimeError(f"Constante no encontrada en dirección {address}")
+        return memory, position
+
+    def _target(self, address):
+        """Lista y posición de la dirección donde una instrucción guarda su resultado"""
+        if type(address) is int and memory_segment(address) == 'constant':
             raise RuntimeError("No se puede escribir en memoria de constantes")
-
-    def run(self):
-        """Ejecuta el programa cargado"""
-        print("\n" + "="*70)
-        print("EJECUCIÓN DEL PROGRAMA")
-        print("="*70 + "\n")
-
-        while self.running and self.instruction_pointer < len(self.quadruples):
-            try:
-                self._execute_instruction()
-            except RuntimeError as e:
-                print(f"\n❌ ERROR EN TIEMPO DE EJECUCIÓN en cuádruplo {self.instruction_pointer}:")
-                print(f"   {e}")
-                print(f"   Instrucción: {self.quadruples[self.instruction_pointer]}")
-                self.running = False
-                return False
-
-        print("\n" + "="*70)
-        print("FIN DE LA EJECUCIÓN")
-        print("="*70)
+        return self._operand(address)
+
+    def _source(self, address):
+        """Lista y posición de un operando en memoria, o (None, valor) si es una constante:
+        las constantes van en la instrucción como valores inmediatos"""
+        memory, position = self._operand(address)
+        if memory is self.constant_memory:
+            return None, memory[position]
+        return memory, position
+
+    def run(self, quiet=False):
+        """Ejecuta el programa cargado; con quiet=True sin los encabezados de inicio y fin"""
+        if not quiet:
+            print("\n" + "="*70)
+            print("EJECUCIÓN DEL PROGRAMA")
+            print("="*70 + "\n")
+
+        # Cada instrucción decodificada se ejecuta y retorna el índice de la siguiente;
+        # un solo try para todo el programa
+        code = self.code
+        end = len(code)
+        ip = self.instruction_pointer
+        try:
+            if self.running:
+                while ip < end:
+                    ip = code[ip]()
+        except RuntimeError as e:
+            print(f"\n❌ ERROR EN TIEMPO DE EJECUCIÓN en cuádruplo {ip}:")
+            print(f"   {e}")
+            print(f"   Instrucción: {self.quadruples[ip]}")
+            self.running = False
+            return False
+        finally:
+            self.instruction_pointer = ip
+
+        if not quiet:
+            print("\n" + "="*70)
+            print("FIN DE LA EJECUCIÓN")
+            print("="*70)
         return True
 
-    def _execute_instruction(self):
-        """Ejecuta una instrucción (cuádruplo)"""
-        quad = self.quadruples[self.instruction_pointer]
-        operator, op1, op2, result = quad
-
-        # ================== OPERACIONES ARITMÉTICAS ==================
-        if operator == '+':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            # Manejo de concatenación de strings
-            if isinstance(val1, str) or isinstance(val2, str):
-                v1 = val1[1:-1] if isinstance(val1, str) and val1.startswith('"') else str(val1)
-                v2 = val2[1:-1] if isinstance(val2, str) and val2.startswith('"') else str(val2)
-                self._set_value(result, f'"{v1}{v2}"')
-            else:
-                self._set_value(result, val1 + val2)
-
-        elif operator == '-':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 - val2)
-
-        elif operator == '*':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            # Manejo de repetición de strings
-            if isinstance(val1, str) and isinstance(val2, int):
-                inner = val1[1:-1] if val1.startswith('"') else val1
-                self._set_value(result, f'"{inner * val2}"')
-            else:
-                self._set_value(result, val1 * val2)
-
-        elif operator == '/':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
+    # ================== DECODIFICACIÓN ==================
+    # Cada método recibe el índice del cuádruplo y sus campos, y retorna la instrucción
+    # decodificada. Se eligen al cargar el programa: la lista y la posición de cada
+    # operando (o su valor, si es una constante), qué variante de la operación aplica
+    # según si sus operandos pueden ser strings, a qué cuádruplo se sigue o se salta.
+    # En los pares (memoria, posición) de los operandos, memoria None indica que la
+    # posición es un valor inmediato.
+
+    def _store(self, value, mr, ir, following):
+        """Instrucción que guarda un valor ya conocido al cargar el programa"""
+        def store():
+            mr[ir] = value
+            return following
+        return store
+
+    def _operation(self, operation, m1, i1, m2, i2, mr, ir, following):
+        """Instrucción que guarda operation(op1, op2). Con los dos operandos inmediatos
+        el resultado se calcula al cargar, salvo que la operación falle: entonces el
+        error queda para cuando se ejecute, como antes."""
+        if m1 is None and m2 is None:
+            try:
+                return self._store(operation(i1, i2), mr, ir, following)
+            except (TypeError, ValueError, ArithmeticError):
+                def failing_operation():
+                    mr[ir] = operation(i1, i2)
+                    return following
+                return failing_operation
+        if m2 is None:
+            def operation_immediate():
+                mr[ir] = operation(m1[i1], i2)
+                return following
+            return operation_immediate
+        if m1 is None:
+            def immediate_operation():
+                mr[ir] = operation(i1, m2[i2])
+                return following
+            return immediate_operation
+        def operation_memory():
+            mr[ir] = operation(m1[i1], m2[i2])
+            return following
+        return operation_memory
+
+    def _decode_add(self, index, operator, op1, op2, result):
+        (m1, i1), (m2, i2), (mr, ir) = self._source(op1), self._source(op2), self._target(result)
+        following = index + 1
+        if op1 in self._strings or op2 in self._strings:
+            return self._operation(concatenate, m1, i1, m2, i2, mr, ir, following)
+        if m1 is None and m2 is None:
+            return self._operation(add, m1, i1, m2, i2, mr, ir, following)
+        if m1 is None:  # La suma de números conmuta: el inmediato queda a la derecha
+            (m1, i1), (m2, i2) = (m2, i2), (m1, i1)
+        if m2 is None:
+            def add_immediate():
+                mr[ir] = m1[i1] + i2
+                return following
+            return add_immediate
+        def add_numbers():
+            mr[ir] = m1[i1] + m2[i2]
+            return following
+        return add_numbers
+
+    def _decode_mult(self, index, operator, op1, op2, result):
+        (m1, i1), (m2, i2), (mr, ir) = self._source(op1), self._source(op2), self._target(result)
+        following = index + 1
+        if op1 in self._strings:
+            return self._operation(repeat, m1, i1, m2, i2, mr, ir, following)
+        if m1 is None and m2 is None:
+            return self._operation(mul, m1, i1, m2, i2, mr, ir, following)
+        if m1 is None:  # El producto de números conmuta: el inmediato queda a la derecha
+            (m1, i1), (m2, i2) = (m2, i2), (m1, i1)
+        if m2 is None:
+            def multiply_immediate():
+                mr[ir] = m1[i1] * i2
+                return following
+            return multiply_immediate
+        def multiply():
+            mr[ir] = m1[i1] * m2[i2]
+            return following
+        return multiply
+
+    def _decode_div(self, index, operator, op1, op2, result):
+        (m1, i1), (m2, i2), (mr, ir) = self._source(op1), self._source(op2), self._target(result)
+        following = index + 1
+        if m2 is None and i2 != 0:
+            # Divisor constante distinto de cero: no hace falta revisarlo al ejecutar
+            return self._operation(truediv, m1, i1, m2, i2, mr, ir, following)
+        # En los demás casos el divisor se revisa al ejecutar; un inmediato se lee de una
+        # lista de un elemento
+        if m1 is None:
+            m1, i1 = [i1], 0
+        if m2 is None:
+            m2, i2 = [i2], 0
+        def divide():
+            val2 = m2[i2]
             if val2 == 0:
                 raise RuntimeError("División entre cero")
-            self._set_value(result, val1 / val2)
-
-        elif operator == 'UMINUS':
-            val = self._get_value(op1)
-            self._set_value(result, -val)
-
-        # ================== ASIGNACIÓN ==================
-        elif operator == '=':
-            val = self._get_value(op1)
-            self._set_value(result, val)
-
-        # ================== OPERACIONES RELACIONALES ==================
-        elif operator == '>':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 > val2)
-
-        elif operator == '<':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 < val2)
-
-        elif operator == '>=':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 >= val2)
-
-        elif operator == '<=':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 <= val2)
-
-        elif operator == '==':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 == val2)
-
-        elif operator == '!=':
-            val1 = self._get_value(op1)
-            val2 = self._get_value(op2)
-            self._set_value(result, val1 != val2)
-
-        # ================== CONTROL DE FLUJO ==================
-        elif operator == 'GOTOMAIN':
-            self.instruction_pointer = result
-            return  # No incrementar IP
-
-        elif operator == 'GOTO':
-            self.instruction_pointer = result
-            return  # No incrementar IP
-
-        elif operator == 'GOTOF':
-            condition = self._get_value(op1)
-            if not condition:
-                self.instruction_pointer = result
-                return
-
-        elif operator == 'GOTOT':
-            condition = self._get_value(op1)
-            if condition:
-                self.instruction_pointer = result
-                return
-
-        # ================== LLAMADAS A FUNCIONES ==================
-        elif operator == 'SUB':
-            # Preparar registro de activación (crear nuevo marco local)
-            pass  # El marco se crea con GOSUB
-
-        elif operator == 'PARAM':
-            # Pasar parámetro: copiar valor de op1 a dirección result
-            val = self._get_value(op1)
-            # Los parámetros se guardan temporalmente hasta GOSUB
-            if not hasattr(self, '_pending_params'):
-                self._pending_params = {}
-            self._pending_params[result] = val
-
-        elif operator == 'GOSUB':
+            mr[ir] = m1[i1] / val2
+            return following
+        return divide
+
+    def _decode_binary(self, index, operator, op1, op2, result):
+        """Resta y operadores relacionales"""
+        (m1, i1), (m2, i2), (mr, ir) = self._source(op1), self._source(op2), self._target(result)
+        return self._operation(_BINARY_OPERATIONS[operator], m1, i1, m2, i2, mr, ir, index + 1)
+
+    def _decode_uminus(self, index, operator, op1, op2, result):
+        (m1, i1), (mr, ir) = self._source(op1), self._target(result)
+        following = index + 1
+        if m1 is None:
+            try:
+                return self._store(-i1, mr, ir, following)
+            except TypeError:  # El error queda para cuando se ejecute
+                m1, i1 = [i1], 0
+        def negate():
+            mr[ir] = -m1[i1]
+            return following
+        return negate
+
+    def _decode_assign(self, index, operator, op1, op2, result):
+        (m1, i1), (mr, ir) = self._source(op1), self._target(result)
+        following = index + 1
+        if m1 is None:
+            return self._store(i1, mr, ir, following)
+        def assign():
+            mr[ir] = m1[i1]
+            return following
+        return assign
+
+    # ================== CONTROL DE FLUJO ==================
+
+    def _decode_goto(self, index, operator, op1, op2, result):
+        def goto():
+            return result
+        return goto
+
+    def _decode_gotof(self, index, operator, op1, op2, result):
+        m1, i1 = self._source(op1)
+        following = index + 1
+        if m1 is None:  # Condición constante: el salto ya se sabe
+            return self._decode_goto(index, 'GOTO', None, None, following if i1 else result)
+        def goto_if_false():
+            return following if m1[i1] else result
+        return goto_if_false
+
+    def _decode_gotot(self, index, operator, op1, op2, result):
+        m1, i1 = self._source(op1)
+        following = index + 1
+        if m1 is None:
+            return self._decode_goto(index, 'GOTO', None, None, result if i1 else following)
+        def goto_if_true():
+            return result if m1[i1] else following
+        return goto_if_true
+
+    # ================== LLAMADAS A FUNCIONES ==================
+
+    def _decode_sub(self, index, operator, op1, op2, result):
+        # Preparar registro de activación: el marco se crea con GOSUB
+        following = index + 1
+        def sub_call():
+            return following
+        return sub_call
+
+    def _decode_param(self, index, operator, op1, op2, result):
+        # Pasar parámetro: el valor de op1 se guarda en el marco que GOSUB activa
+        m1, i1 = self._source(op1)
+        if type(result) is not int or memory_segment(result) != 'local':
+            raise RuntimeError(f"Dirección de memoria inválida: {result}")
+        pending, slot, following = self._pending_params, self._layouts['local'].index(result), index + 1
+        if m1 is None:
+            def param_immediate():
+                pending[slot] = i1
+                return following
+            return param_immediate
+        def param():
+            pending[slot] = m1[i1]
+            return following
+        return param
+
+    def _decode_gosub(self, index, operator, op1, op2, result):
+        call_stack, frame_stack, return_address = self.call_stack, self.frame_stack, index + 1
+        frame, pending, defaults = self.local_memory, self._pending_params, self._layouts['local'].defaults
+        def gosub():
             # Verificar límite de recursión (máximo 1000 llamadas)
-            if len(self.call_stack) >= 1000:
+            if len(call_stack) >= 1000:
                 raise RuntimeError("Stack overflow: se excedió el límite de 1000 llamadas recursivas")
-            # Guardar dirección de retorno
-            self.call_stack.append(self.instruction_pointer + 1)
-            # Crear nuevo marco local
-            new_frame = {}
-            # Copiar parámetros pendientes al nuevo marco
-            if hasattr(self, '_pending_params'):
-                for addr, val in self._pending_params.items():
-                    new_frame[addr] = val
-                self._pending_params = {}
-            self.local_memory_stack.append(new_frame)
-            # Limpiar temporales
-            self.temp_memory = {}
-            # Saltar a la función
-            self.instruction_pointer = result
-            return
-
-        elif operator == 'ENDFUNC':
+            # Guardar dirección de retorno y el marco del llamador; el marco en ejecución
+            # pasa a ser el de los parámetros
+            call_stack.append(return_address)
+            frame_stack.append(frame[:])
+            frame[:] = pending
+            pending[:] = defaults
+            # Saltar a la función. Los temporales no se limpian: cada uno es de una sola
+            # expresión del programa y se escribe antes de leerse
+            return result
+        return gosub
+
+    def _decode_endfunc(self, index, operator, op1, op2, result):
+        call_stack, frame_stack, frame, following = self.call_stack, self.frame_stack, self.local_memory, index + 1
+        def endfunc():
             # Restaurar marco local anterior
-            if len(self.local_memory_stack) > 1:
-                self.local_memory_stack.pop()
+            if frame_stack:
+                frame[:] = frame_stack.pop()
             # Retornar al llamador
-            if self.call_stack:
-                self.instruction_pointer = self.call_stack.pop()
-                return
-
-        # ================== ENTRADA/SALIDA ==================
-        elif operator == 'PRINT':
-            val = self._get_value(result)
-            # Remover comillas de strings
-            if isinstance(val, str) and val.startswith('"') and val.endswith('"'):
-                val = val[1:-1]
-            # Manejar salto de línea
-            if val == '\\n':
-                print()  # Solo imprime newline
-            else:
-                print(val, end='')  # Sin newline automático
+            if call_stack:
+                return call_stack.pop()
+            return following
+        return endfunc
+
+    # ================== ENTRADA/SALIDA ==================
+
+    def _decode_print(self, index, operator, op1, op2, result):
+        m1, i1 = self._operand(result)
+        following = index + 1
+        if result in self._strings:
+            def print_string():
+                val = m1[i1]
+                # Remover comillas de strings
+                if isinstance(val, str) and val.startswith('"') and val.endswith('"'):
+                    val = val[1:-1]
+                # Manejar salto de línea
+                if val == '\\n':
+                    print()  # Solo imprime newline
+                else:
+                    print(val, end='')  # Sin newline automático
+                self.output.append(str(val))
+                return following
+            return print_string
+        def print_value():
+            val = m1[i1]
+            print(val, end='')
             self.output.append(str(val))
+            return following
+        return print_value
 
-        # ================== TERMINACIÓN ==================
-        elif operator == 'END':
+    # ================== TERMINACIÓN ==================
+
+    def _decode_end(self, index, operator, op1, op2, result):
+        def end():
             self.running = False
-            return
+            return len(self.code)
+        return end
 
-        else:
+    def _decode_unknown(self, index, operator, op1, op2, result):
+        def unknown():
             raise RuntimeError(f"Operador desconocido: {operator}")
+        return unknown
 
-        # Avanzar al siguiente cuádruplo
-        self.instruction_pointer += 1
-
-
-# Instancia global de la máquina virtual
-virtual_machine = VirtualMachine()
+    # Método que decodifica cada código de operación, en el orden de OPCODES (el último es el desconocido)
+    DECODERS = ('_decode_add', '_decode_binary', '_decode_mult', '_decode_div', '_decode_uminus', '_decode_assign',
+                '_decode_binary', '_decode_binary', '_decode_binary', '_decode_binary', '_decode_binary',
+                '_decode_binary', '_decode_goto', '_decode_goto', '_decode_gotof', '_decode_gotot',
+                '_decode_sub', '_decode_param', '_decode_gosub', '_decode_endfunc', '_decode_print', '_decode_end',
+                '_decode_unknown')
 
 
 ###############################################################
 #              FUNCIONES DE REPORTE Y SALIDA
 ###############################################################
 
-def print_symbol_table():
+def print_symbol_table(ctx):
     print("\n" + "="*70)
     print("TABLA DE SÍMBOLOS")
     print("="*70)
-    for scope, variables in symbol_table.items():
+    for scope, variables in zip(ctx.scope_names, ctx.symbol_table):
         print(f"\nScope: {scope}")
         print(f"{'Variable':<15} {'Tipo':<10} {'Dirección':<10}")
         print("-"*70)
-        for var_name, var_info in variables.items():
-            var_type = var_info['type']
-            var_addr = var_info['address']
+        for var_name, symbol in variables.items():
+            var_type = TYPES[symbol.type]
+            var_addr = symbol.address
             print(f"{var_name:<15} {var_type:<10} {var_addr:<10}")
 
-def print_function_directory():
+def print_function_directory(ctx):
     print("\n" + "="*70)
     print("DIRECTORIO DE FUNCIONES")
     print("="*70)
-    for func_name, func_info in function_directory.items():
+    for func_name, func_info in ctx.function_directory.items():
         print(f"\nFunción: {func_name}")
         print(f"  Tipo retorno: {func_info['type']}")
         print(f"  Parámetros:")
@@ -1345,12 +1906,13 @@ def print_function_directory():
         else:
             print(f"    (ninguno)")
         print(f"  Variables internas:")
-        if func_name in symbol_table and symbol_table[func_name]:
+        scope = ctx.scope_ids.get(func_name)
+        if scope is not None and ctx.symbol_table[scope]:
             param_names = [p[0] for p in func_info['params']]
             has_internal_vars = False
-            for var_name, var_info in symbol_table[func_name].items():
+            for var_name, symbol in ctx.symbol_table[scope].items():
                 if var_name not in param_names:
-                    print(f"    - {var_name}: {var_info['type']} (dir: {var_info['address']})")
+                    print(f"    - {var_name}: {TYPES[symbol.type]} (dir: {symbol.address})")
                     has_internal_vars = True
             if not has_internal_vars:
                 print(f"    (ninguna)")
@@ -1358,34 +1920,45 @@ def print_function_directory():
             print(f"    (ninguna)")
         print(f"  Cuádruplo inicial: {func_info['start_quad']}")
 
-def print_quadruples():
+def print_diagnostics(filename, ctx, file=None):
+    """Lista los errores como archivo:línea:columna: mensaje, uno por línea (por omisión en stderr)"""
+    file = file or sys.stderr
+    for diagnostic in ctx.diagnostics:
+        line = f"{diagnostic.line}:" if diagnostic.line is not None else ""
+        if diagnostic.column is not None:
+            line += f"{diagnostic.column}:"
+        print(f"{filename}:{line} {diagnostic.message}", file=file)
+    if ctx.truncated:
+        print(f"{filename}: análisis detenido al alcanzar el límite de {ctx.max_errors} errores", file=file)
+
+def print_quadruples(ctx):
     print("\n" + "="*70)
     print("CÓDIGO INTERMEDIO (CUÁDRUPLOS)")
     print("="*70)
     print(f"{'#':<5} {'Operador':<10} {'Operando1':<15} {'Operando2':<15} {'Resultado':<15}")
     print("-"*70)
-    for i, (op, op1, op2, res) in enumerate(quadruples):
+    for i, (op, op1, op2, res) in enumerate(ctx.quadruples):
         op1_str = str(op1) if op1 is not None else '-'
         op2_str = str(op2) if op2 is not None else '-'
         # Para resultado, mostrar +1 si es un salto (para display)
         res_str = str(res + 1) if res is not None and op in ('GOTOMAIN', 'GOTO', 'GOTOF', 'GOTOT', 'GOSUB') else (str(res) if res is not None else '-')
         print(f"{i+1:<5} {op:<10} {op1_str:<15} {op2_str:<15} {res_str:<15}")
 
-def save_intermediate_code(filename):
+def save_intermediate_code(filename, ctx):
     """Guarda el código intermedio en formato estructurado para la VM"""
     output_file = filename.replace('.txt', '_intermediate.txt')
     with open(output_file, 'w', encoding='utf-8') as f:
         # Sección de constantes
         f.write("%%CONSTANTS\n")
         for const_type in ['int', 'float', 'string']:
-            if constants_table[const_type]:
-                items = [f"{val}={addr}" for val, addr in constants_table[const_type].items()]
+            if ctx.constants_table[const_type]:
+                items = [f"{val}={addr}" for val, addr in ctx.constants_table[const_type].items()]
                 f.write(f"{const_type}:{','.join(items)}\n")
         f.write("\n")
 
         # Sección de funciones
         f.write("%%FUNCTIONS\n")
-        for func_name, func_info in function_directory.items():
+        for func_name, func_info in ctx.function_directory.items():
             params_str = ""
             if func_info['params']:
                 params_str = ";".join([f"{p[0]}:{p[1]}:{p[2]}" for p in func_info['params']])
@@ -1394,7 +1967,7 @@ def save_intermediate_code(filename):
 
         # Sección de cuádruplos
         f.write("%%QUADRUPLES\n")
-        for i, (op, op1, op2, res) in enumerate(quadruples):
+        for i, (op, op1, op2, res) in enumerate(ctx.quadruples):
             op1_str = str(op1) if op1 is not None else '-'
             op2_str = str(op2) if op2 is not None else '-'
             res_str = str(res) if res is not None else '-'
@@ -1403,7 +1976,7 @@ def save_intermediate_code(filename):
 
         # Sección de contadores de memoria
         f.write("%%MEMORY_COUNTERS\n")
-        usage = memory_manager.get_memory_usage()
+        usage = ctx.memory_manager.get_memory_usage()
         f.write(f"global:int={usage['global']['int']},float={usage['global']['float']},string={usage['global']['string']}\n")
         f.write(f"local:int={usage['local']['int']},float={usage['local']['float']},string={usage['local']['string']}\n")
         f.write(f"temp:int={usage['temp']['int']},float={usage['temp']['float']},bool={usage['temp']['bool']}\n")
@@ -1412,15 +1985,16 @@ def save_intermediate_code(filename):
 
         f.write("%%END\n")
 
-    print(f"\n✅ Código intermedio guardado en: {output_file}")
+    if not ctx.quiet:
+        print(f"\n✅ Código intermedio guardado en: {output_file}")
 
 
-def print_constants_table():
+def print_constants_table(ctx):
     """Imprime la tabla de constantes"""
     print("\n" + "="*70)
     print("TABLA DE CONSTANTES")
     print("="*70)
-    for const_type, values in constants_table.items():
+    for const_type, values in ctx.constants_table.items():
         if values:
             print(f"\nTipo: {const_type}")
             print(f"{'Valor':<20} {'Dirección':<10}")
@@ -1429,95 +2003,693 @@ def print_constants_table():
                 print(f"{str(value):<20} {address:<10}")
 
 ###############################################################
-#              FUNCIÓN PRINCIPAL DE ANÁLISIS
+#              CACHÉ DE COMPILACIÓN
 ###############################################################
 
-def analizar_archivo(filename):
-    global lexer_errors, parser_errors
-    
-    reset_compiler()
-    lexer_errors = []
-    parser_errors = []
+# Versión del compilador; forma parte de la llave de la caché de compilación
+COMPILER_VERSION = '1.0'
+
+_compiler_fingerprint = None
+
+def compiler_version():
+    """Versión del compilador más un hash de sus fuentes (invalida la caché al editarlas)"""
+    global _compiler_fingerprint
+    if _compiler_fingerprint is None:
+        import hashlib  # Diferido: solo se necesita con la caché activa
+        h = hashlib.sha256()
+        for path in (__file__, gramatica.__file__):
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        _compiler_fingerprint = f"{COMPILER_VERSION}+{h.hexdigest()[:16]}"
+    return _compiler_fingerprint
+
+class CompileCache:
+    """Caché en disco de compilaciones exitosas, direccionada por el contenido del código.
+
+    La llave es el SHA-256 del código fuente y de la versión del compilador.
+    Cada entrada guarda los cuádruplos, la tabla de constantes, el directorio
+    de funciones, la tabla de símbolos y los contadores de memoria. En el
+    subdirectorio funciones/ se guarda la FunctionCache de cada archivo fuente
+    (compilación incremental cuando el código sí cambió). Si entre los dos
+    superan max_bytes se borran los archivos usados hace más tiempo.
+    """
+
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or os.path.join(gramatica.TABLES_CACHE_DIR, 'compilados')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, codigo):
+        """Llave de la entrada para este código fuente"""
+        import hashlib  # Diferido: solo se necesita con la caché activa
+        h = hashlib.sha256()
+        h.update(f"{compiler_version()}\0".encode())
+        h.update(codigo.encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def load(self, codigo, ctx):
+        """Llena ctx con la compilación guardada; retorna False si no hay entrada"""
+        path = self._path(self.key(codigo))
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            os.utime(path)  # Marca la entrada como usada recientemente
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except Exception:
+            # Entrada corrupta o escrita por otra versión de Python: se descarta
+            self.misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return False
+
+        ctx.quadruples = entry['quadruples']
+        ctx.constants_table = entry['constants_table']
+        ctx.function_directory = entry['function_directory']
+        ctx.symbol_table = entry['symbol_table']
+        ctx.scope_names = entry['scope_names']
+        ctx.scope_ids = {name: scope for scope, name in enumerate(ctx.scope_names)}
+        ctx.program_name = entry['program_name']
+        vars(ctx.memory_manager).update(entry['memory_counters'])
+        ctx.from_cache = True
+        self.hits += 1
+        return True
 
-    print("="*70)
-    print(f" ANALIZANDO ARCHIVO: {filename}")
-    print("="*70)
+    def store(self, codigo, ctx):
+        """Guarda una compilación exitosa; las que tienen errores no se guardan"""
+        if ctx.lexer_errors or ctx.parser_errors:
+            return
+        entry = {
+            'version': compiler_version(),
+            'quadruples': ctx.quadruples,
+            'constants_table': ctx.constants_table,
+            'function_directory': ctx.function_directory,
+            'symbol_table': ctx.symbol_table,
+            'scope_names': ctx.scope_names,
+            'program_name': ctx.program_name,
+            'memory_counters': dict(vars(ctx.memory_manager)),
+        }
+        path = self._path(self.key(codigo))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # Sin permisos o sin espacio: la caché es opcional
+        self._evict()
+
+    def _evict(self):
+        """Borra las entradas menos usadas hasta quedar dentro de max_bytes (LRU).
+
+        Cuentan juntas las compilaciones y las FunctionCache de funciones/."""
+        entries = []
+        for directory in (self.directory, os.path.join(self.directory, 'funciones')):
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith('.pickle'):
+                            try:
+                                entry_stat = entry.stat()
+                            except OSError:
+                                continue
+                            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+
+    def functions(self, filename):
+        """FunctionCache en disco de un archivo fuente (para la compilación incremental)"""
+        import hashlib  # Diferido: solo se necesita con la caché activa
+        name = hashlib.sha256(os.path.abspath(filename).encode('utf-8')).hexdigest()
+        return FunctionCache(os.path.join(self.directory, 'funciones', f"{name}.pickle"))
+
+    def clear(self):
+        """Borra todas las entradas"""
+        for directory in (self.directory, os.path.join(self.directory, 'funciones')):
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if name.endswith('.pickle'):
+                        os.remove(os.path.join(directory, name))
+
+    def stats(self):
+        """Contadores de aciertos, fallos y desalojos de este proceso"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+###############################################################
+#              COMPILACIÓN INCREMENTAL
+###############################################################
+
+# Al recompilar solo se parsean el encabezado (programa y variables globales), main y las
+# funciones cuyo texto cambió. Cada función sin cambios se toma de la compilación anterior
+# como FunctionUnit y se vuelve a enlazar.
+
+# Cadenas y comentarios (con las expresiones del lexer) o las palabras void y main fuera
+# de ellos; un void o main pegado a un número no se detecta, pero ahí es un error sintáctico
+SPAN_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*|\#[^\n]*'
+                          r'|(?<![A-Za-z0-9_])(void|main)(?![A-Za-z0-9_])')
+
+def split_functions(codigo):
+    """Divide el código en encabezado, funciones y main.
+
+    Retorna (fin del encabezado, [(inicio, fin) de cada función], inicio de main);
+    cada función va desde su void hasta el siguiente void o main. Retorna None si
+    el código no tiene esa forma (se compila completo)."""
+    starts = []
+    main_start = None
+    for match in SPAN_TOKENS.finditer(codigo):
+        word = match.group(1)
+        if word is not None:
+            if main_start is not None:
+                return None
+            if word == 'void':
+                starts.append(match.start())
+            else:
+                main_start = match.start()
+    if main_start is None:
+        return None
+    header_end = starts[0] if starts else main_start
+    return header_end, list(zip(starts, starts[1:] + [main_start])), main_start
+
+def function_key(text):
+    """Huella del texto de una función"""
+    import hashlib  # Diferido: solo se necesita en la compilación incremental
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+def function_layout(codigo):
+    """split_functions() con la huella de cada función: (fin del encabezado, [(inicio, fin, huella)], inicio de main)"""
+    layout = split_functions(codigo)
+    if layout is None:
+        return None
+    header_end, spans, main_start = layout
+    return header_end, [(start, end, function_key(codigo[start:end])) for start, end in spans], main_start
+
+def range_tokens(lexer, source, ranges):
+    """Función de tokens para el parser que lee solo los rangos [inicio, fin) del código"""
+    pending = ranges[::-1]
+
+    def token():
+        while True:
+            tok = lexer.token()
+            if tok is not None or not pending:
+                return tok
+            start, lexer.lexlen = pending.pop()
+            lexer.lexpos = start
+            lexer.lineno = source.position(start)[0]
+
+    lexer.input(source.text)
+    lexer.lexlen = 0  # La primera llamada a token() pasa al primer rango
+    return token
+
+class FunctionCache:
+    """FunctionUnit de la última compilación sin errores, por huella del texto de cada función.
+
+    compilar_codigo() la usa para recompilar solo las funciones que cambiaron.
+    Con path se conserva en disco entre ejecuciones (así la usa --cache)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.units = {}  # huella -> FunctionUnit
+        self.reused = 0
+        self.compiled = 0
+        if path is not None:
+            try:
+                with open(path, 'rb') as f:
+                    entry = pickle.load(f)
+                if entry['version'] == compiler_version():
+                    self.units = entry['units']
+            except Exception:
+                pass  # Sin archivo, corrupto o de otra versión: se empieza vacía
+
+    def keys(self, codigo):
+        """(fin del encabezado, [(inicio, fin, huella)] de las funciones, inicio de main) o None"""
+        return function_layout(codigo)
+
+    def update(self, codigo, ctx, layout=None):
+        """Reemplaza las unidades por las de una compilación sin errores (ctx.function_units)"""
+        if layout is None:
+            layout = self.keys(codigo)
+        units = ctx.function_units[len(ctx.libraries):]
+        if layout is None or len(layout[1]) != len(units):
+            self.units = {}
+        else:
+            self.units = {key: unit for (_, _, key), unit in zip(layout[1], units)}
+        if self.path is not None:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump({'version': compiler_version(), 'units': self.units}, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass  # La caché es opcional
+
+    def stats(self):
+        """Funciones reutilizadas y recompiladas en las compilaciones incrementales de este proceso"""
+        return {'reused': self.reused, 'compiled': self.compiled}
+
+def compile_incremental(codigo, ctx, units, layout):
+    """Compila reutilizando las funciones sin cambios; retorna None si hay que compilar todo.
+
+    units son FunctionUnit por huella (las de FunctionCache.units). La compilación se
+    intenta en un contexto aparte, silencioso, que se detiene en el primer error: si hay
+    errores (o nada que reutilizar) la compilación completa los reporta como siempre. Si
+    una función reutilizada depende de una firma que cambió, se vuelve a intentar
+    parseándola también. layout es el de function_layout(). Retorna {índice: FunctionUnit}
+    con las funciones que se reutilizaron."""
+    if layout is None or not units:
+        return None
+    header_end, spans, main_start = layout
+    reused = {}
+    for i, (_, _, key) in enumerate(spans):
+        unit = units.get(key)
+        if unit is not None:
+            reused[i] = unit
+
+    while reused:
+        trial = CompilationContext(quiet=True, max_errors=1)
+        trial.source = ctx.source
+        trial.libraries = ctx.libraries
+        trial.keep_ast = ctx.keep_ast
+        ranges = [(0, header_end)]
+        for i, (start, end, _) in enumerate(spans + [(main_start, len(codigo), None)]):
+            if i in reused:
+                continue
+            if ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)  # Rangos contiguos se leen de corrido
+            else:
+                ranges.append((start, end))
+        try:
+            lexer = get_lexer(trial)
+            program = get_parser(trial).parse(lexer=lexer, tokenfunc=range_tokens(lexer, trial.source, ranges))
+            if len(program.funcs) + len(reused) != len(spans):
+                return None
+            parsed = iter(program.funcs)
+            program.funcs = [reused[i] if i in reused else next(parsed) for i in range(len(spans))]
+            check_program(trial, program)
+            generate_program(trial, program)
+        except StaleFunctionUnit as stale:
+            reused = {i: unit for i, unit in reused.items() if unit is not stale.unit}
+            continue
+        except (CompilationHalted, MemoryError):
+            return None
+        if trial.lexer_errors or trial.parser_errors:
+            return None
+
+        if ctx.keep_ast:
+            ctx.ast = program
+        ctx.quadruples = trial.quadruples
+        ctx.constants_table = trial.constants_table
+        ctx.function_directory = trial.function_directory
+        ctx.symbol_table = trial.symbol_table
+        ctx.scope_names = trial.scope_names
+        ctx.scope_ids = trial.scope_ids
+        ctx.program_name = trial.program_name
+        ctx.memory_manager = trial.memory_manager
+        ctx.function_units = trial.function_units
+        return reused
+    return None
+
+###############################################################
+#              COMPILACIÓN PARALELA
+###############################################################
+
+# Una función solo ve sus parámetros y sus variables locales: conocidas las firmas de
+# todas, cada cuerpo se compila por separado. Con ctx.jobs > 1 la compilación tiene dos
+# fases. Primero una pasada rápida lee con el lexer solo el encabezado de cada función
+# (void nombre(parámetros)). Después un grupo de procesos compila los cuerpos por bloques,
+# cada bloque como un programa aparte con las demás firmas ya declaradas, y las
+# FunctionUnit resultantes se enlazan igual que en la compilación incremental (que vuelve
+# a validar cada llamada contra las funciones declaradas antes). Si un bloque tiene
+# errores se compila todo en este proceso para reportarlos como siempre.
+
+# Mínimo de funciones por proceso para que repartir la compilación valga la pena
+PARALLEL_MIN_FUNCTIONS = 8
+# Bloques por proceso: bloques más chicos reparten mejor la carga
+PARALLEL_BLOCKS_PER_JOB = 4
+
+def available_cpus():
+    """CPUs que este proceso puede usar (los de su afinidad si el sistema la reporta)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+def function_signature(lexer, start):
+    """Lee 'void nombre(p1 : tipo, ...)' desde start; retorna (nombre, [(parámetro, tipo)]) o None"""
+    lexer.lexpos = start
+    header_tokens = []
+    while True:
+        tok = lexer.token()
+        if tok is None:
+            return None
+        if tok.type == 'RPAREN':
+            break
+        header_tokens.append(tok)
+    if [tok.type for tok in header_tokens[:3]] != ['VOID', 'ID', 'LPAREN']:
+        return None
+    rest = header_tokens[3:]
+    if rest and len(rest) % 4 != 3:
+        return None
+    params = []
+    for i in range(0, len(rest), 4):
+        name, colon, param_type = rest[i:i + 3]
+        if (name.type != 'ID' or colon.type != 'COLON' or param_type.type not in ('INT', 'FLOAT', 'STRING')
+                or (i + 3 < len(rest) and rest[i + 3].type != 'COMMA')):
+            return None
+        params.append((name.value, param_type.value.lower()))
+    return header_tokens[1].value, params
+
+def signature_params(params):
+    """Parámetros con las direcciones locales que les asigna generate_function()"""
+    memory_manager = MemoryManager()
+    memory_manager.reset_local_counters()
+    return [(name, param_type, memory_manager.get_local_address(param_type)) for name, param_type in params]
+
+def compile_function_block(task):
+    """Compila un bloque de funciones en un proceso del grupo; retorna sus FunctionUnit (None si hay errores).
+
+    task es (encabezado del programa, [texto de cada función], [(nombre, parámetros)] de
+    las funciones declaradas fuera del bloque)."""
+    header, texts, declared = task
+    ctx = CompilationContext(quiet=True, max_errors=1)
+    ctx.function_directory = {name: {'type': 'void', 'params': params, 'vars': {}, 'start_quad': None}
+                              for name, params in declared}
+    codigo = header + ''.join(texts) + '\nmain { }\nend\n'
+    ctx.source = SourceText(codigo)
+    try:
+        program = get_parser(ctx).parse(codigo, lexer=get_lexer(ctx))
+        check_program(ctx, program)
+        if ctx.lexer_errors or ctx.parser_errors or len(program.funcs) != len(texts):
+            return None
+        return [generate_function_unit(ctx, func) for func in program.funcs]
+    except (CompilationHalted, MemoryError):
+        return None
+
+def compile_parallel(codigo, ctx, layout, units):
+    """Compila en ctx.jobs procesos las funciones que no están en units.
+
+    layout es el de function_layout(). Nunca usa más procesos que CPUs disponibles: con
+    uno solo, repartir el trabajo solo agrega el costo de los procesos. Retorna
+    {huella: FunctionUnit} con las funciones compiladas, o None si no se pudo (un CPU,
+    pocas funciones, un encabezado que no se entiende, errores en algún bloque o sin
+    procesos disponibles); entonces todo se compila en este proceso."""
+    header_end, spans, _ = layout
+    pending = [i for i, (_, _, key) in enumerate(spans) if key not in units]
+    jobs = min(ctx.jobs, available_cpus())
+    if jobs < 2 or len(pending) < PARALLEL_MIN_FUNCTIONS * jobs:
+        return None
+
+    # Fase 1: firmas de todas las funciones, leyendo solo sus encabezados
+    lexer = get_lexer(CompilationContext(quiet=True, max_errors=1))
+    lexer.input(codigo)
+    signatures = []
+    try:
+        for start, _, _ in spans:
+            signature = function_signature(lexer, start)
+            if signature is None:
+                return None
+            signatures.append((signature[0], signature_params(signature[1])))
+    except CompilationHalted:
+        return None
+    declared = [(unit.name, unit.params) for unit in ctx.libraries] + signatures
+
+    # Fase 2: bloques contiguos de tamaño parecido, uno por tarea
+    target = sum(spans[i][1] - spans[i][0] for i in pending) / (jobs * PARALLEL_BLOCKS_PER_JOB)
+    blocks = [[]]
+    size = 0
+    for i in pending:
+        if size >= target:
+            blocks.append([])
+            size = 0
+        blocks[-1].append(i)
+        size += spans[i][1] - spans[i][0]
+    header = codigo[:header_end]
+    tasks = []
+    for block in blocks:
+        names = {signatures[i][0] for i in block}
+        tasks.append((header, [codigo[spans[i][0]:spans[i][1]] for i in block],
+                      [entry for entry in declared if entry[0] not in names]))
+
+    from concurrent.futures import ProcessPoolExecutor  # Diferido: solo se usa con jobs > 1
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(compile_function_block, tasks))
+    except (OSError, RuntimeError, pickle.PicklingError):
+        return None  # Sin procesos disponibles: se compila en este
+
+    compiled = {}
+    for block, block_units in zip(blocks, results):
+        if block_units is None:
+            return None
+        for i, unit in zip(block, block_units):
+            compiled[spans[i][2]] = unit
+    ctx.parallel_jobs = min(jobs, len(tasks))
+    return compiled
+
+###############################################################
+#              FUNCIÓN PRINCIPAL DE ANÁLISIS
+###############################################################
+
+def compilar_codigo(codigo, ctx=None, cache=None, functions=None):
+    """Compila código fuente en un contexto propio y lo retorna (reentrante).
+
+    Con cache (CompileCache) se reutiliza una compilación previa del mismo código sin parsear.
+    Con functions (FunctionCache) solo se recompilan las funciones cuyo texto cambió.
+    Con ctx.jobs > 1 las funciones a compilar se reparten entre ctx.jobs procesos (a lo más
+    uno por CPU disponible; con un solo CPU se compilan en este proceso)."""
+    if ctx is None:
+        ctx = CompilationContext()
+    if ctx.check_only:
+        cache = None  # La caché guarda código generado; en modo verificación no hay
+        functions = None
+    elif ctx.libraries:
+        cache = None  # La llave de la caché no incluye las bibliotecas enlazadas
+    if cache is not None and cache.load(codigo, ctx):
+        return ctx
+    if ctx.source is None:
+        ctx.source = SourceText(codigo)
+    layout = functions.keys(codigo) if functions is not None else None
+    units = functions.units if functions is not None else {}
+    compiled = None
+    if ctx.jobs > 1 and not ctx.check_only and available_cpus() > 1:
+        if layout is None:
+            layout = function_layout(codigo)
+        if layout is not None:
+            compiled = compile_parallel(codigo, ctx, layout, units)
+            if compiled:
+                units = {**units, **compiled}
+    reused = compile_incremental(codigo, ctx, units, layout)
+    if reused is not None:
+        spans = layout[1]
+        if compiled:
+            ctx.parallel_functions = sum(1 for i in reused if spans[i][2] in compiled)
+        if functions is not None:
+            cached = len(reused) - ctx.parallel_functions
+            ctx.reused_functions = (cached, len(spans) - cached)
+            functions.reused += cached
+            functions.compiled += len(spans) - cached
+            functions.update(codigo, ctx, layout)
+        if not ctx.quiet:
+            print("✅ Programa compilado exitosamente")
+        if cache is not None:
+            cache.store(codigo, ctx)
+        return ctx
+    try:
+        # Parser -> AST -> análisis semántico -> generación de código (solo sin errores)
+        program = get_parser(ctx).parse(codigo, lexer=get_lexer(ctx))
+        if ctx.keep_ast:
+            ctx.ast = program
+        check_program(ctx, program)
+        sin_errores = not ctx.lexer_errors and not ctx.parser_errors
+        if sin_errores and not ctx.check_only:
+            generate_program(ctx, program)
+    except CompilationHalted:
+        pass  # El error ya quedó registrado en ctx.diagnostics
+    else:
+        if sin_errores and not ctx.quiet:
+            print("✅ Programa verificado sin errores" if ctx.check_only else "✅ Programa compilado exitosamente")
+        if sin_errores and functions is not None:
+            functions.compiled += len(ctx.function_units) - len(ctx.libraries)
+            functions.update(codigo, ctx, layout)
+    if cache is not None:
+        cache.store(codigo, ctx)
+    return ctx
+
+def compilar_biblioteca(codigo, ctx=None, functions=None):
+    """Compila un programa como biblioteca y retorna sus funciones como FunctionUnit (None si hay errores).
+
+    El main se compila pero no se usa. Las unidades se enlazan en otros programas
+    poniéndolas en ctx.libraries; con functions (FunctionCache) una biblioteca sin
+    cambios no se vuelve a compilar."""
+    if functions is not None:
+        layout = functions.keys(codigo)
+        if layout is not None and len(layout[1]) == len(functions.units) and \
+                all(key in functions.units for _, _, key in layout[1]):
+            return [functions.units[key] for _, _, key in layout[1]]
+    if ctx is None:
+        ctx = CompilationContext(quiet=True)
+    compilar_codigo(codigo, ctx, functions=functions)
+    if ctx.lexer_errors or ctx.parser_errors or ctx.truncated:
+        return None
+    return ctx.function_units[len(ctx.libraries):]
+
+def verificar_codigo(codigo):
+    """Solo análisis léxico, sintáctico y semántico, sin imprimir; los errores quedan en ctx.diagnostics"""
+    return compilar_codigo(codigo, CompilationContext(quiet=True, check_only=True))
+
+# Reportes que puede imprimir analizar_archivo (en modo silencioso ninguno, salvo los pedidos)
+REPORTS = ('source', 'functions', 'symbols', 'constants', 'quadruples', 'summary')
+
+def analizar_archivo(filename, ctx=None, cache=None, quiet=False, reports=None, check_only=False, functions=None):
+    """Compila un archivo, guarda su código intermedio e imprime los reportes.
+
+    Con quiet=True no imprime nada más que los reportes listados en reports;
+    los errores quedan en ctx.diagnostics como objetos Diagnostic. Con
+    check_only=True solo se buscan errores: no hay cuádruplos, direcciones
+    ni archivo _intermediate.txt (solo aplican los reportes source y summary).
+    Con cache y sin functions, las funciones del archivo se guardan en la caché
+    para recompilar solo las que cambien."""
+    if ctx is None:
+        ctx = CompilationContext()
+    ctx.quiet = ctx.quiet or quiet
+    ctx.check_only = ctx.check_only or check_only
+    if reports is None:
+        reports = () if ctx.quiet else REPORTS
+
+    if not ctx.quiet:
+        print("="*70)
+        print(f" ANALIZANDO ARCHIVO: {filename}")
+        print("="*70)
 
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            codigo = f.read()
+        source = SourceText.from_file(filename)
     except FileNotFoundError:
-        print(f"❌ ERROR: No se encontró el archivo '{filename}'")
+        error_msg = f"ERROR: No se encontró el archivo '{filename}'"
+        ctx.diagnostics.append(Diagnostic('archivo', error_msg))
+        if not ctx.quiet:
+            print(f"❌ {error_msg}")
         return False
     except Exception as e:
-        print(f"❌ ERROR al leer archivo: {e}")
+        error_msg = f"ERROR al leer archivo: {e}"
+        ctx.diagnostics.append(Diagnostic('archivo', error_msg))
+        if not ctx.quiet:
+            print(f"❌ {error_msg}")
         return False
 
-    print("\n CÓDIGO FUENTE:")
-    print("-"*70)
-    for i, linea in enumerate(codigo.split('\n'), 1):
-        print(f"{i:3d} | {linea}")
-    print("-"*70)
+    ctx.source = source
+    codigo = source.text
 
-    file_lexer = lex.lex()
-    file_lexer.lineno = 1
+    if 'source' in reports:
+        print("\n CÓDIGO FUENTE:")
+        print("-"*70)
+        for i, linea in enumerate(source.lines(), 1):
+            print(f"{i:3d} | {linea}")
+        print("-"*70)
 
-    print("\n🔍 ANÁLISIS LÉXICO, SINTÁCTICO Y SEMÁNTICO:")
-    print("-"*70)
+    if not ctx.quiet:
+        print("\n🔍 ANÁLISIS LÉXICO, SINTÁCTICO Y SEMÁNTICO:")
+        print("-"*70)
     
-    resultado = parser.parse(codigo, lexer=file_lexer)
-
-    if len(parser_errors) == 0 and len(lexer_errors) == 0:
-        print_function_directory()
-        print_symbol_table()
-        print_constants_table()
-        print_quadruples()
-        save_intermediate_code(filename)
-
-    print("\n" + "="*70)
-    print("REPORTE FINAL")
-    print("="*70)
+    if functions is None and cache is not None:
+        functions = cache.functions(filename)
+    compilar_codigo(codigo, ctx, cache, functions)
+    if ctx.from_cache and not ctx.quiet:
+        print("♻️  Código sin cambios: resultado tomado de la caché de compilación")
+    elif not ctx.quiet:
+        if ctx.reused_functions:
+            reused, compiled = ctx.reused_functions
+            print(f"♻️  Compilación incremental: {reused} funciones reutilizadas, {compiled} recompiladas")
+        if ctx.parallel_functions:
+            print(f"⚙️  Compilación paralela: {ctx.parallel_functions} funciones compiladas en {ctx.parallel_jobs} procesos")
+
+    if len(ctx.parser_errors) == 0 and len(ctx.lexer_errors) == 0 and not ctx.check_only:
+        if 'functions' in reports:
+            print_function_directory(ctx)
+        if 'symbols' in reports:
+            print_symbol_table(ctx)
+        if 'constants' in reports:
+            print_constants_table(ctx)
+        if 'quadruples' in reports:
+            print_quadruples(ctx)
+        save_intermediate_code(filename, ctx)
+
+    total_errores = len(ctx.lexer_errors) + len(ctx.parser_errors)
+
+    if 'summary' in reports:
+        print("\n" + "="*70)
+        print("REPORTE FINAL")
+        print("="*70)
 
-    total_errores = len(lexer_errors) + len(parser_errors)
+        if total_errores == 0 and ctx.check_only:
+            print("✅ ¡PROGRAMA VÁLIDO! Verificación exitosa")
+            print(f"✅ Variables declaradas: {sum(len(v) for v in ctx.symbol_table)}")
+            print(f"✅ Funciones declaradas: {len(ctx.function_directory)}")
+        elif total_errores == 0:
+            print("✅ ¡PROGRAMA VÁLIDO! Compilación exitosa")
+            print(f"✅ Total de cuádruplos generados: {len(ctx.quadruples)}")
+            print(f"✅ Variables declaradas: {sum(len(v) for v in ctx.symbol_table)}")
+            print(f"✅ Funciones declaradas: {len(ctx.function_directory)}")
+        else:
+            print(f"❌ Se encontraron {total_errores} errores en total:")
+            print(f"   - Errores léxicos: {len(ctx.lexer_errors)}")
+            print(f"   - Errores semánticos: {len(ctx.parser_errors)}")
+            if ctx.truncated:
+                print(f"⚠️  Análisis detenido al alcanzar el límite de {ctx.max_errors} errores")
 
-    if total_errores == 0:
-        print("✅ ¡PROGRAMA VÁLIDO! Compilación exitosa")
-        print(f"✅ Total de cuádruplos generados: {len(quadruples)}")
-        print(f"✅ Variables declaradas: {sum(len(v) for v in symbol_table.values())}")
-        print(f"✅ Funciones declaradas: {len(function_directory)}")
-        return True
-    else:
-        print(f"❌ Se encontraron {total_errores} errores en total:")
-        print(f"   - Errores léxicos: {len(lexer_errors)}")
-        print(f"   - Errores semánticos: {len(parser_errors)}")
-        return False
+    return total_errores == 0
 
 ###############################################################
 #                  COMPILAR Y EJECUTAR
 ###############################################################
 
-def compile_and_run(filename):
+def compile_and_run(filename, cache=None, ctx=None, quiet=False, reports=None):
     """Compila el archivo fuente y lo ejecuta con la máquina virtual"""
-    print("\n" + "="*70)
-    print("FASE 1: COMPILACIÓN")
-    print("="*70)
+    if ctx is None:
+        ctx = CompilationContext(quiet)
+    if not ctx.quiet:
+        print("\n" + "="*70)
+        print("FASE 1: COMPILACIÓN")
+        print("="*70)
 
-    success = analizar_archivo(filename)
+    success = analizar_archivo(filename, ctx, cache, reports=reports)
 
     if not success:
-        print("\n❌ La compilación falló. No se puede ejecutar.")
+        if not ctx.quiet:
+            print("\n❌ La compilación falló. No se puede ejecutar.")
         return False
 
-    print("\n" + "="*70)
-    print("FASE 2: EJECUCIÓN")
-    print("="*70)
+    if not ctx.quiet:
+        print("\n" + "="*70)
+        print("FASE 2: EJECUCIÓN")
+        print("="*70)
 
     # Preparar y ejecutar la máquina virtual
-    virtual_machine.reset()
-    virtual_machine.load_program(quadruples, constants_table, function_directory)
+    virtual_machine = VirtualMachine()
+    virtual_machine.load_program(ctx.quadruples, ctx.constants_table, ctx.function_directory,
+                                 ctx.memory_manager.get_memory_usage())
 
     try:
-        result = virtual_machine.run()
+        result = virtual_machine.run(quiet=ctx.quiet)
         return result
     except Exception as e:
         print(f"\n❌ Error durante la ejecución: {e}")
@@ -1529,19 +2701,99 @@ def compile_and_run(filename):
 ###############################################################
 
 if __name__ == "__main__":
-    print("\n" + "="*70)
-    print("COMPILADOR LITTLE DUCK - CON MÁQUINA VIRTUAL")
-    print("="*70 + "\n")
+    opciones = []
+    argumentos = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg == '--max-errors':
+            arg += '=' + next(args, '')  # También se acepta "--max-errors N"
+        (opciones if arg.startswith('--') else argumentos).append(arg)
+
+    # --quiet: sin reportes ni mensajes; los errores se listan al final, uno por línea.
+    # --report=symbols,quadruples,...: reportes a imprimir aun en modo silencioso.
+    quiet = '--quiet' in opciones
+    reports = None
+    # --max-errors=N: detiene el análisis al llegar a N errores; --fail-fast equivale a N=1
+    max_errors = 1 if '--fail-fast' in opciones else None
+    # --lib=a.txt,b.txt: bibliotecas cuyas funciones se enlazan antes que las del programa
+    bibliotecas = []
+    # --jobs=N: compila las funciones del programa en N procesos
+    jobs = 1
+    for opcion in opciones:
+        if opcion.startswith('--report='):
+            reports = tuple(r for r in opcion[len('--report='):].split(',') if r)
+        elif opcion.startswith('--lib='):
+            bibliotecas.extend(b for b in opcion[len('--lib='):].split(',') if b)
+        elif opcion.startswith('--jobs='):
+            try:
+                jobs = int(opcion[len('--jobs='):])
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                print("ERROR: --jobs requiere un entero positivo", file=sys.stderr)
+                sys.exit(2)
+        elif opcion.startswith('--max-errors='):
+            try:
+                max_errors = int(opcion[len('--max-errors='):])
+            except ValueError:
+                max_errors = 0
+            if max_errors < 1:
+                print("ERROR: --max-errors requiere un entero positivo", file=sys.stderr)
+                sys.exit(2)
+
+    if not quiet:
+        print("\n" + "="*70)
+        print("COMPILADOR LITTLE DUCK - CON MÁQUINA VIRTUAL")
+        print("="*70 + "\n")
 
-    if len(sys.argv) > 1:
-        archivo = sys.argv[1]
+    if argumentos:
+        archivo = argumentos[0]
+        # --check: solo busca errores (sin cuádruplos, direcciones ni _intermediate.txt)
+        ctx = CompilationContext(quiet, check_only='--check' in opciones, max_errors=max_errors, jobs=jobs)
+
+        # --cache reutiliza compilaciones previas del mismo código fuente y, si cambió,
+        # las funciones que quedaron igual (solo se recompilan las editadas)
+        cache = CompileCache() if '--cache' in opciones else None
+
+        # Cada biblioteca se compila aparte (puede usar las anteriores) y se enlaza
+        for biblioteca in bibliotecas:
+            lib_ctx = CompilationContext(quiet=True)
+            lib_ctx.libraries = list(ctx.libraries)
+            try:
+                codigo_biblioteca = SourceText.from_file(biblioteca).text
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"ERROR: No se pudo leer la biblioteca '{biblioteca}': {e}", file=sys.stderr)
+                sys.exit(1)
+            units = compilar_biblioteca(codigo_biblioteca, lib_ctx,
+                                        cache.functions(biblioteca) if cache is not None else None)
+            if units is None:
+                print_diagnostics(biblioteca, lib_ctx)
+                sys.exit(1)
+            ctx.libraries.extend(units)
 
         # Verificar si se pasó la opción --compile-only
-        if len(sys.argv) > 2 and sys.argv[2] == '--compile-only':
-            analizar_archivo(archivo)
+        if '--compile-only' in opciones or ctx.check_only:
+            success = analizar_archivo(archivo, ctx, cache, reports=reports)
         else:
-            compile_and_run(archivo)
+            success = compile_and_run(archivo, cache, ctx, reports=reports)
+
+        if quiet:
+            print_diagnostics(archivo, ctx)
+
+        if cache is not None and not quiet:
+            stats = cache.stats()
+            print(f"\nCaché de compilación: {stats['hits']} aciertos, {stats['misses']} fallos, "
+                  f"{stats['evictions']} desalojos")
+        if quiet and not success:
+            sys.exit(1)
     else:
-        print("Uso: python main_virtual.py <archivo.txt> [--compile-only]")
+        print("Uso: python main_virtual.py <archivo.txt> [--compile-only | --check] [--cache] [--quiet] [--report=...]"
+              " [--max-errors=N | --fail-fast] [--lib=biblioteca.txt,...] [--jobs=N]")
         print("Ejemplo: python main_virtual.py factorial.txt")
         print("         python main_virtual.py factorial.txt --compile-only")
+        print("         python main_virtual.py factorial.txt --cache")
+        print("         python main_virtual.py factorial.txt --compile-only --quiet --report=quadruples")
+        print("         python main_virtual.py factorial.txt --check --quiet")
+        print("         python main_virtual.py factorial.txt --check --max-errors=20")
+        print("         python main_virtual.py programa.txt --lib=funciones.txt")
+        print("         python main_virtual.py programa.txt --compile-only --jobs=4")
@@ -0,0 +1,103 @@
+#   COMPILADOR LITTLE DUCK - MEDICIÓN DEL SERVIDOR DE LENGUAJE
+#   Repite una sesión de edición guardada en un programa generado de N funciones:
+#   escribe un estatuto carácter por carácter dentro de una función, dentro de main y
+#   en la lista de parámetros de una función, y mide la latencia de los diagnósticos
+#   después de cada tecla contra un análisis completo (compilar_codigo con check_only).
+#
+#   Uso: python medir_lsp.py [--funciones=N] [--verificar]
+
+import statistics
+import sys
+import time
+
+from main_virtual import CompilationContext, compilar_codigo
+from generador_programas import generar_programa
+from servidor_lsp import Document
+
+###############################################################
+#              SESIÓN DE EDICIÓN
+###############################################################
+
+def programa(funciones):
+    return generar_programa(functions=funciones, statements=10, depth=1, expression_length=2,
+                            recursion_depth=0)
+
+def sesion(codigo, funciones):
+    """{nombre: (posición, texto)}: cada texto se escribe una tecla a la vez en su posición"""
+    middle = codigo.index(f'void f{funciones // 2}(')
+    body = codigo.index('{', middle) + 1
+    sin_parametros = funciones // 2 + (-(funciones // 2)) % 3  # f0, f3, f6... no tienen parámetros
+    params = codigo.index('(', codigo.index(f'void f{sin_parametros}(')) + 1
+    main = codigo.index('{', codigo.index('main {')) + 1
+    return {
+        'cuerpo de una función': (body, '\n    v0 = v1 * 2 + 7;'),
+        'main': (main, '\n  print("nuevo", g0 + 1);'),
+        'parámetros de una función': (params, 'extra : float'),
+    }
+
+def diagnosticos_completos(text):
+    return compilar_codigo(text, CompilationContext(quiet=True, check_only=True)).diagnostics
+
+def replay(document, position, texto, verificar=False):
+    """Escribe texto en position tecla por tecla; retorna los segundos de cada análisis.
+
+    Con verificar compara cada resultado con el análisis completo."""
+    latencies = []
+    for offset, char in enumerate(texto):
+        start = time.perf_counter()
+        document.edit(position + offset, position + offset, char)
+        diagnostics = document.diagnostics()
+        latencies.append(time.perf_counter() - start)
+        if verificar:
+            esperados = diagnosticos_completos(document.text)
+            if [d.to_dict() for d in diagnostics] != [d.to_dict() for d in esperados]:
+                raise AssertionError(f"Diagnósticos distintos al análisis completo después de {texto[:offset + 1]!r}")
+    return latencies
+
+def medir(funciones, verificar=False):
+    """Retorna (segundos del análisis completo, {edición: [segundos por tecla]})"""
+    codigo = programa(funciones)
+    start = time.perf_counter()
+    diagnosticos_completos(codigo)
+    full = time.perf_counter() - start
+    results = {}
+    for name, (position, texto) in sesion(codigo, funciones).items():
+        document = Document(codigo)
+        document.diagnostics()  # Al abrir se analiza todo
+        results[name] = replay(document, position, texto, verificar)
+    return full, results
+
+###############################################################
+#              REPORTE
+###############################################################
+
+if __name__ == "__main__":
+    funciones = 2000
+    verificar = False
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        try:
+            if opcion == '--funciones':
+                funciones = int(valor)
+                if funciones < 8:
+                    raise ValueError("--funciones requiere un entero mayor o igual a 8")
+            elif opcion == '--verificar':
+                verificar = True
+            else:
+                raise ValueError(f"opción desconocida '{arg}'")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python medir_lsp.py [--funciones=N] [--verificar]", file=sys.stderr)
+            sys.exit(2)
+
+    full, results = medir(funciones, verificar)
+    print("="*70)
+    print(f"SERVIDOR DE LENGUAJE: programa de {funciones} funciones")
+    print("="*70)
+    print(f"Análisis completo: {full * 1000:.1f} ms")
+    print(f"{'edición':<28} {'teclas':>7} {'mediana':>10} {'máximo':>10}")
+    for name, latencies in results.items():
+        print(f"{name:<28} {len(latencies):>7} {statistics.median(latencies) * 1000:>7.1f} ms "
+              f"{max(latencies) * 1000:>7.1f} ms")
+    if verificar:
+        print("\n✅ Los diagnósticos coinciden con el análisis completo en cada tecla")
@@ -0,0 +1,81 @@
+#   COMPILADOR LITTLE DUCK - MEDICIÓN DE LA COMPILACIÓN PARALELA
+#   Compila un programa generado de N funciones en un proceso y con --jobs=J para cada J
+#   pedido, y compara los tiempos. La compilación nunca usa más procesos que CPUs
+#   disponibles: con un solo CPU todas las corridas son secuenciales, así que la
+#   ganancia solo se puede medir en una máquina con varios núcleos.
+#
+#   Uso: python medir_paralelo.py [--funciones=N] [--jobs=J,J,...] [--repeticiones=N]
+
+import statistics
+import sys
+import time
+
+from main_virtual import CompilationContext, available_cpus, compilar_codigo
+from generador_programas import generar_programa
+
+###############################################################
+#              MEDICIÓN
+###############################################################
+
+def programa(funciones):
+    """Programa de funciones funciones de 20 estatutos (sin temporales que agoten su segmento)"""
+    return generar_programa(functions=funciones, statements=20, depth=0, expression_length=1,
+                            recursion_depth=0)
+
+def compilar(codigo, jobs):
+    """Retorna (segundos, funciones compiladas en paralelo, procesos usados)"""
+    start = time.perf_counter()
+    ctx = compilar_codigo(codigo, CompilationContext(quiet=True, jobs=jobs))
+    seconds = time.perf_counter() - start
+    if ctx.diagnostics:
+        raise RuntimeError("El programa generado tiene errores")
+    return seconds, ctx.parallel_functions, ctx.parallel_jobs
+
+def medir(funciones, jobs_list, repeticiones):
+    """{jobs: (mediana de segundos, funciones en paralelo, procesos)}; las corridas se alternan"""
+    codigo = programa(funciones)
+    compilar(codigo, 1)  # Calienta el lexer y el parser
+    runs = {jobs: [] for jobs in [1] + jobs_list}
+    for _ in range(repeticiones):
+        for jobs in runs:
+            runs[jobs].append(compilar(codigo, jobs))
+    return {jobs: (statistics.median(r[0] for r in results), results[-1][1], results[-1][2])
+            for jobs, results in runs.items()}
+
+###############################################################
+#              REPORTE
+###############################################################
+
+if __name__ == "__main__":
+    funciones = 400
+    jobs_list = [2, 4]
+    repeticiones = 5
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        try:
+            if opcion == '--funciones':
+                funciones = int(valor)
+            elif opcion == '--jobs':
+                jobs_list = [int(j) for j in valor.split(',') if j]
+            elif opcion == '--repeticiones':
+                repeticiones = int(valor)
+            else:
+                raise ValueError(f"opción desconocida '{arg}'")
+            if funciones < 1 or repeticiones < 1 or not jobs_list or any(j < 2 for j in jobs_list):
+                raise ValueError(f"{opcion} requiere enteros positivos (--jobs mayores que 1)")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python medir_paralelo.py [--funciones=N] [--jobs=J,J,...] [--repeticiones=N]", file=sys.stderr)
+            sys.exit(2)
+
+    cpus = available_cpus()
+    print("="*70)
+    print(f"COMPILACIÓN PARALELA: {funciones} funciones, mediana de {repeticiones} corridas, {cpus} CPUs")
+    print("="*70)
+    results = medir(funciones, jobs_list, repeticiones)
+    secuencial = results[1][0]
+    print(f"{'--jobs':>6} {'procesos':>9} {'en paralelo':>12} {'tiempo':>9} {'aceleración':>12}")
+    for jobs, (seconds, paralelas, procesos) in results.items():
+        print(f"{jobs:>6} {procesos or 1:>9} {paralelas:>12} {seconds:>7.2f} s {secuencial / seconds:>11.2f}x")
+    if cpus == 1:
+        print("\n⚠️  Un solo CPU disponible: la compilación fue secuencial en todas las corridas")
@@ -0,0 +1,106 @@
+#   COMPILADOR LITTLE DUCK - MEDICIÓN DE LA PILA DEL PARSER
+#   Parsea programas generados con N estatutos en main y con N funciones, y mide la
+#   profundidad máxima de la pila del parser LALR, la memoria pico del parseo y su
+#   tiempo. Con las secuencias de estatutos y de funciones recursivas por la izquierda
+#   la pila no depende de N; la memoria crece solo con el AST. Los tiempos incluyen el
+#   costo de tracemalloc.
+#
+#   Uso: python medir_pila.py [--estatutos=N,N,...] [--funciones=N,N,...]
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from main_virtual import CompilationContext, SourceText, get_lexer, get_parser
+from generador_programas import generar_programa
+
+###############################################################
+#              MEDICIÓN
+###############################################################
+
+# Programas de cada eje: N estatutos en main o N funciones de 10 estatutos
+SHAPES = {
+    'estatutos': lambda n: dict(functions=0, statements=n, depth=0, expression_length=1, recursion_depth=0),
+    'funciones': lambda n: dict(functions=n, statements=10, depth=0, expression_length=1, recursion_depth=0),
+}
+DEFAULT_SIZES = {
+    'estatutos': (50000, 100000, 200000),
+    'funciones': (500, 1000, 2000),
+}
+
+def stack_tracker(parser, lexer):
+    """Función de tokens para el parser que anota la profundidad máxima de su pila.
+
+    PLY deja la pila de símbolos del parseo en curso en parser.symstack."""
+    deepest = [0]
+
+    def token():
+        depth = len(parser.symstack)
+        if depth > deepest[0]:
+            deepest[0] = depth
+        return lexer.token()
+
+    return token, deepest
+
+def medir(codigo):
+    """Parsea codigo una vez; retorna (pila máxima, bytes pico de memoria, segundos)"""
+    ctx = CompilationContext(quiet=True)
+    ctx.source = SourceText(codigo)
+    lexer = get_lexer(ctx)
+    parser = get_parser(ctx)
+    lexer.input(codigo)
+    tokenfunc, deepest = stack_tracker(parser, lexer)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        program = parser.parse(lexer=lexer, tokenfunc=tokenfunc)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if program is None or ctx.diagnostics:
+        raise RuntimeError("El programa generado tiene errores")
+    return deepest[0], peak, seconds
+
+###############################################################
+#              REPORTE
+###############################################################
+
+def medir_eje(name, sizes):
+    """Mide un eje e imprime su tabla; retorna True si la pila no creció con N"""
+    print(f"\nEje: {name}")
+    print(f"{'N':>8} {'pila máxima':>12} {'memoria pico':>13} {'tiempo':>9}")
+    depths = []
+    for n in sorted(sizes):
+        depth, peak, seconds = medir(generar_programa(**SHAPES[name](n)))
+        depths.append(depth)
+        print(f"{n:>8} {depth:>12} {peak / 1e6:>10.1f} MB {seconds:>7.2f} s")
+    return max(depths) == min(depths)
+
+if __name__ == "__main__":
+    sizes = dict(DEFAULT_SIZES)
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        eje = opcion[2:] if opcion.startswith('--') else None
+        try:
+            if eje not in SHAPES:
+                raise ValueError(f"opción desconocida '{arg}'")
+            sizes[eje] = [int(n) for n in valor.split(',') if n]
+            if not sizes[eje] or any(n < 1 for n in sizes[eje]):
+                raise ValueError(f"{opcion} requiere enteros positivos")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python medir_pila.py [--estatutos=N,N,...] [--funciones=N,N,...]", file=sys.stderr)
+            sys.exit(2)
+
+    print("="*70)
+    print("PILA DEL PARSER LALR (memoria medida con tracemalloc durante el parseo)")
+    print("="*70)
+    acotadas = [medir_eje(name, sizes[name]) for name in SHAPES]
+    print()
+    if not all(acotadas):
+        print("⚠️  La pila del parser crece con el tamaño del programa")
+        sys.exit(1)
+    print("✅ La profundidad de la pila del parser no depende de N")
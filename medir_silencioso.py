@@ -0,0 +1,90 @@
+#   COMPILADOR LITTLE DUCK - MEDICIÓN DEL MODO SILENCIOSO
+#   Compila un programa generado de N líneas con todos los reportes (listado del código,
+#   directorio de funciones, tablas y cuádruplos) y en modo silencioso, y compara los
+#   tiempos. Los reportes se escriben a un archivo, como al redirigir la salida; con
+#   --terminal se escriben a la salida estándar para medir con una terminal de verdad.
+#
+#   Uso: python medir_silencioso.py [--lineas=N] [--repeticiones=N] [--terminal]
+
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from main_virtual import CompilationContext, analizar_archivo
+from generador_programas import generar_programa
+
+###############################################################
+#              MEDICIÓN
+###############################################################
+
+def programa(lineas):
+    """Programa de unas lineas líneas: main con asignaciones y prints sin temporales"""
+    return generar_programa(functions=0, variables=8, statements=lineas, depth=0,
+                            expression_length=1, recursion_depth=0)
+
+def compilar(filename, quiet, salida):
+    """Segundos de analizar_archivo (--compile-only) con la salida dirigida a salida"""
+    with contextlib.redirect_stdout(salida):
+        start = time.perf_counter()
+        ok = analizar_archivo(filename, CompilationContext(quiet=quiet))
+        seconds = time.perf_counter() - start
+    if not ok:
+        raise RuntimeError("El programa generado tiene errores")
+    return seconds
+
+def medir(lineas, repeticiones, terminal=False):
+    """Retorna ({modo: [segundos]}, bytes de reportes) compilando en los dos modos alternados"""
+    times = {'reportes': [], 'silencioso': []}
+    with tempfile.TemporaryDirectory() as workdir:
+        filename = os.path.join(workdir, 'programa.txt')
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(programa(lineas))
+        reportes = os.path.join(workdir, 'reportes.txt')
+        with open(os.devnull, 'w') as devnull:
+            compilar(filename, True, devnull)  # Calienta el lexer y el parser
+            for _ in range(repeticiones):
+                with open(reportes, 'w', encoding='utf-8') as salida:
+                    times['reportes'].append(compilar(filename, False, sys.stdout if terminal else salida))
+                times['silencioso'].append(compilar(filename, True, devnull))
+        size = os.path.getsize(reportes)
+    return times, size
+
+###############################################################
+#              REPORTE
+###############################################################
+
+if __name__ == "__main__":
+    lineas = 50000
+    repeticiones = 5
+    terminal = False
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        try:
+            if opcion == '--lineas':
+                lineas = int(valor)
+            elif opcion == '--repeticiones':
+                repeticiones = int(valor)
+            elif opcion == '--terminal':
+                terminal = True
+            else:
+                raise ValueError(f"opción desconocida '{arg}'")
+            if lineas < 1 or repeticiones < 1:
+                raise ValueError("--lineas y --repeticiones requieren enteros positivos")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python medir_silencioso.py [--lineas=N] [--repeticiones=N] [--terminal]", file=sys.stderr)
+            sys.exit(2)
+
+    times, size = medir(lineas, repeticiones, terminal)
+    reportes = statistics.median(times['reportes'])
+    silencioso = statistics.median(times['silencioso'])
+    destino = 'la terminal' if terminal else f'un archivo ({size / 1e6:.1f} MB)'
+    print("="*70)
+    print(f"MODO SILENCIOSO: programa de {lineas} estatutos, mediana de {repeticiones} corridas")
+    print("="*70)
+    print(f"Con todos los reportes a {destino}: {reportes:.2f} s")
+    print(f"Modo silencioso: {silencioso:.2f} s")
+    print(f"Ahorro: {reportes - silencioso:.2f} s ({(1 - silencioso / reportes) * 100:.0f}%)")
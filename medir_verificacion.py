@@ -0,0 +1,110 @@
+#   COMPILADOR LITTLE DUCK - MEDICIÓN DEL MODO DE VERIFICACIÓN
+#   Compara la compilación completa con el modo de solo verificación (--check), que
+#   hace los análisis léxico, sintáctico y semántico sin generar código: archivos por
+#   segundo al validar en lote los programas de test_cases/ y tiempo de un programa
+#   generado grande. Todo en un proceso y en modo silencioso, sin escribir archivos.
+#
+#   Uso: python medir_verificacion.py [--rondas=N] [--pasadas=N] [--estatutos=N]
+
+import glob
+import os
+import statistics
+import sys
+import time
+
+from main_virtual import CompilationContext, compilar_codigo, verificar_codigo
+from generador_programas import generar_programa
+
+###############################################################
+#              MEDICIÓN
+###############################################################
+
+CASOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_cases')
+
+def programas(carpeta):
+    """Código de los programas de una carpeta de test_cases/ (sin los _intermediate.txt)"""
+    codigos = []
+    for path in sorted(glob.glob(os.path.join(CASOS, carpeta, '*.txt'))):
+        if not path.endswith('_intermediate.txt'):
+            with open(path, encoding='utf-8') as f:
+                codigos.append(f.read())
+    return codigos
+
+def compilar(codigo):
+    """Compilación completa en silencio; un programa que desborda la memoria cuenta igual"""
+    try:
+        return compilar_codigo(codigo, CompilationContext(quiet=True))
+    except MemoryError:
+        return None
+
+# Modo -> función que procesa un programa
+MODES = {'completa': compilar, 'verificación': verificar_codigo}
+
+def throughput(codigos, rondas, pasadas):
+    """{modo: mediana de archivos por segundo}; cada ronda hace pasadas sobre todos los programas"""
+    rates = {mode: [] for mode in MODES}
+    for _ in range(rondas):
+        for mode, procesar in MODES.items():
+            start = time.perf_counter()
+            for _ in range(pasadas):
+                for codigo in codigos:
+                    procesar(codigo)
+            rates[mode].append(pasadas * len(codigos) / (time.perf_counter() - start))
+    return {mode: statistics.median(values) for mode, values in rates.items()}
+
+def programa_grande(estatutos, repeticiones=3):
+    """{modo: segundos (el mejor de repeticiones)} de un programa generado con estatutos
+    asignaciones y prints en main"""
+    codigo = generar_programa(functions=0, variables=8, statements=estatutos, depth=0,
+                              expression_length=1, recursion_depth=0)
+    seconds = {mode: [] for mode in MODES}
+    for _ in range(repeticiones):
+        for mode, procesar in MODES.items():
+            start = time.perf_counter()
+            procesar(codigo)
+            seconds[mode].append(time.perf_counter() - start)
+    return {mode: min(values) for mode, values in seconds.items()}
+
+###############################################################
+#              REPORTE
+###############################################################
+
+def ganancia(antes, despues):
+    return f"{(despues / antes - 1) * 100:+.0f}%"
+
+if __name__ == "__main__":
+    rondas = 9
+    pasadas = 20
+    estatutos = 50000
+    for arg in sys.argv[1:]:
+        opcion, _, valor = arg.partition('=')
+        try:
+            if opcion == '--rondas':
+                rondas = int(valor)
+            elif opcion == '--pasadas':
+                pasadas = int(valor)
+            elif opcion == '--estatutos':
+                estatutos = int(valor)
+            else:
+                raise ValueError(f"opción desconocida '{arg}'")
+            if rondas < 1 or pasadas < 1 or estatutos < 1:
+                raise ValueError(f"{opcion} requiere un entero positivo")
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            print("Uso: python medir_verificacion.py [--rondas=N] [--pasadas=N] [--estatutos=N]", file=sys.stderr)
+            sys.exit(2)
+
+    print("="*70)
+    print(f"MODO DE VERIFICACIÓN (mediana de {rondas} rondas de {pasadas} pasadas)")
+    print("="*70)
+    compilar(programas('valid')[0])  # Calienta el lexer y el parser
+    print(f"{'lote':<28} {'archivos':>8} {'completa':>14} {'verificación':>14} {'ganancia':>9}")
+    for nombre, carpetas in (('test_cases/ completo', ('valid', 'errors', 'runtime')), ('test_cases/errors', ('errors',))):
+        codigos = [codigo for carpeta in carpetas for codigo in programas(carpeta)]
+        rates = throughput(codigos, rondas, pasadas)
+        print(f"{nombre:<28} {len(codigos):>8} {rates['completa']:>8.0f} arch/s {rates['verificación']:>8.0f} arch/s "
+              f"{ganancia(rates['completa'], rates['verificación']):>9}")
+    seconds = programa_grande(estatutos)
+    print(f"\nPrograma generado de {estatutos} estatutos: completa {seconds['completa']:.2f} s, "
+          f"verificación {seconds['verificación']:.2f} s "
+          f"({ganancia(1 / seconds['completa'], 1 / seconds['verificación'])} de rendimiento)")
@@ -4,24 +4,21 @@
 #   Con generación de cuádruplos
 ##############################################
 
-import ply.lex as lex
-import ply.yacc as yacc
 import sys
 
-# Palabras reservadas
-reserved = {
-    'program': 'PROGRAM',
-    'var': 'VAR',
-    'int': 'INT',
-    'float': 'FLOAT',
-    'string': 'STRING',
-    'if': 'IF',
-    'else': 'ELSE',
-    'main': 'MAIN',
-    'end': 'END',
-}
-
-# Tokens
+# Reglas del lexer, precedencia y cubo semántico: comunes a todos los front-ends.
+# precedence se importa aquí porque yacc la busca en el módulo de la gramática.
+import gramatica
+from gramatica import precedence
+
+# Contador de errores global
+lexer_errors = []
+parser_errors = []
+
+#LEXER
+
+# Tokens de este subconjunto del lenguaje: sin funciones, ciclos ni print, así que
+# void, while, do y print son identificadores y los corchetes son caracteres ilegales
 tokens = [
     'CONST_INT',
     'CONST_FLOAT',
@@ -45,78 +42,28 @@ tokens = [
     'COMMA',
     'SEMICOL',
     'COLON',
-] + list(reserved.values())
-
-# Contador de errores global
-lexer_errors = []
-parser_errors = []
-
-t_ignore = ' \t\r'
-
-# Operadores
-t_OP_EQ = r'=='
-t_OP_NEQ = r'!='
-t_OP_LEQ = r'<='
-t_OP_GEQ = r'>='
-t_OP_LT = r'<'
-t_OP_GT = r'>'
-t_OP_ASIGNA = r'='
-t_OP_SUMA = r'\+'
-t_OP_RESTA = r'-'
-t_OP_MULT = r'\*'
-t_OP_DIV = r'/'
-
-# Delimitadores
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_COMMA = r','
-t_SEMICOL = r';'
-t_COLON = r':'
-
-def t_COMMENT_BLOCK(t):
-    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
-    pass
-
-def t_COMMENT(t):
-    r'(//[^\n]*)|(\#[^\n]*)'
-    pass
-
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-def t_CONST_STRING(t):
-    r'"([^"\\]|\\.)*"'
-    t.value = t.value[1:-1]
-    return t
-
-def t_CONST_FLOAT(t):
-    r'\d+\.\d+(?:[eE][\+\-]?\d+)?'
-    t.value = float(t.value)
-    return t
-
-def t_CONST_INT(t):
-    r'\d+'
-    t.value = int(t.value)
-    return t
-
-def t_ID(t):
-    r'[A-Za-z_][A-Za-z0-9_]*'
-    t.type = reserved.get(t.value, 'ID')
-    return t
-
-def t_error(t):
-    error_msg = f"ERROR LEXICO en linea {t.lineno}: Caracter ilegal '{t.value[0]}'"
-    lexer_errors.append(error_msg)
-    print(error_msg)
-    t.lexer.skip(1)
-
-#LEXER
+    'PROGRAM',
+    'VAR',
+    'INT',
+    'FLOAT',
+    'STRING',
+    'IF',
+    'ELSE',
+    'MAIN',
+    'END',
+]
+
+def get_lexer():
+    """Retorna un lexer listo para un archivo nuevo (clon del lexer compartido)"""
+    errors = lexer_errors
+
+    def report_error(error_msg, lineno, lexpos):
+        error_msg = f"ERROR LEXICO en linea {lineno}: Caracter ilegal '{file_lexer.lexdata[lexpos]}'"
+        errors.append(error_msg)
+        print(error_msg)
 
-lexer = lex.lex()
-print("Lexer construido correctamente")
+    file_lexer = gramatica.get_lexer(lexer_errors, report_error, token_subset=tokens)
+    return file_lexer
 
 
 # ESTRUCTURAS DE DATOS DEL COMPILADOR
@@ -131,61 +78,14 @@ jump_stack = []
 temp_counter = 1
 memory_counter = 1000
 
-semantic_cube = {
-    '+': {
-        'int': {'int': 'int', 'float': 'float', 'string': 'string'},
-        'float': {'int': 'float', 'float': 'float', 'string': 'string'},
-        'string': {'int': 'string', 'float': 'string', 'string': 'string'}
-    },
-    '-': {
-        'int': {'int': 'int', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '*': {
-        'int': {'int': 'int', 'float': 'float', 'string': 'string'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'int': 'string'}
-    },
-    '/': {
-        'int': {'int': 'float', 'float': 'float'},
-        'float': {'int': 'float', 'float': 'float'}
-    },
-    '>': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '>=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '<=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '==': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '!=': {
-        'int': {'int': 'bool', 'float': 'bool'},
-        'float': {'int': 'bool', 'float': 'bool'},
-        'string': {'string': 'bool'}
-    },
-    '=': {
-        'int': {'int': 'int'},
-        'float': {'int': 'float', 'float': 'float'},
-        'string': {'string': 'string', 'int': 'string', 'float': 'string'}
-    }
-}
+# Cubo semántico compartido; aquí se puede concatenar un número con un string,
+# repetir un string con int * string, asignar un número a un string y no se
+# permite asignar un float a un int
+semantic_cube = gramatica.build_semantic_cube({
+    '+': {'int': {'string': 'string'}, 'float': {'string': 'string'}},
+    '*': {'int': {'string': 'string'}},
+    '=': {'int': {'float': None}, 'string': {'int': 'string', 'float': 'string'}}
+})
 
 def reset_compiler_structures():
     global symbol_table, operand_stack, type_stack, operator_stack
@@ -215,11 +115,7 @@ def get_type_from_value(value):
         return 'string'
 
 def check_semantic_cube(operator, type1, type2):
-    if operator in semantic_cube:
-        if type1 in semantic_cube[operator]:
-            if type2 in semantic_cube[operator][type1]:
-                return semantic_cube[operator][type1][type2]
-    return None
+    return gramatica.semantic_result(semantic_cube, operator, type1, type2)
 
 def add_quadruple(operator, operand1, operand2, result):
     quadruples.append((operator, operand1, operand2, result))
@@ -268,12 +164,6 @@ def generate_binary_operation_quad(operator):
 
 # PARSER LR CON GRAMATICA
 
-precedence = (
-    ('left', 'OP_EQ', 'OP_NEQ', 'OP_LT', 'OP_GT', 'OP_LEQ', 'OP_GEQ'), 
-    ('left', 'OP_SUMA', 'OP_RESTA'),
-    ('left', 'OP_MULT', 'OP_DIV'),
-)
-
 start = 'program'
 
 def p_program(p):
@@ -303,10 +193,10 @@ def p_var_list_single(p):
     p[0] = [('var_decl', p[1], p[3])]
 
 def p_var_list_multiple(p):
-    '''var_list : id_list COLON type SEMICOL var_list'''
+    '''var_list : var_list id_list COLON type SEMICOL'''
     global memory_counter
-    var_type = p[3]
-    for var_name in p[1]:
+    var_type = p[4]
+    for var_name in p[2]:
         if var_name in symbol_table:
             error_msg = f"ERROR SEMANTICO: Variable '{var_name}' ya declarada"
             parser_errors.append(error_msg)
@@ -317,15 +207,18 @@ def p_var_list_multiple(p):
                 'direccion': memory_counter
             }
             memory_counter += 1
-    p[0] = [('var_decl', p[1], p[3])] + p[5]
+    p[1].append(('var_decl', p[2], p[4]))
+    p[0] = p[1]
 
 def p_id_list_single(p):
     '''id_list : ID'''
     p[0] = [p[1]]
 
 def p_id_list_multiple(p):
-    '''id_list : ID COMMA id_list'''
-    p[0] = [p[1]] + p[3]
+    '''id_list : id_list COMMA ID'''
+    # Recursión izquierda: la lista crece en su lugar y la pila LR no crece con ella
+    p[1].append(p[3])
+    p[0] = p[1]
 
 def p_type_int(p):
     '''type : INT'''
@@ -353,7 +246,8 @@ def p_statements_single(p):
 
 def p_statements_multiple(p):
     '''statements : statements statement'''
-    p[0] = p[1] + [p[2]]
+    p[1].append(p[2])
+    p[0] = p[1]
 
 def p_statement_assign(p):
     '''statement : assign'''
@@ -582,8 +476,9 @@ def p_error(p):
     parser_errors.append(error_msg)
     print(error_msg)
 
-parser = yacc.yacc(write_tables=False, debug=False)
-print("Parser LR construido correctamente")
+def get_parser():
+    """Retorna el parser del proceso, construyéndolo en el primer uso"""
+    return gramatica.get_parser(sys.modules[__name__])
 
 # FUNCIONES PARA IMPRIMIR RESULTADOS
 
@@ -683,10 +578,9 @@ def get_result_type(quad_index):
     type1 = get_operand_type(op1)
     type2 = get_operand_type(op2)
     
-    if operator in semantic_cube and type1 and type2:
-        if type1 in semantic_cube[operator] and type2 in semantic_cube[operator][type1]:
-            return semantic_cube[operator][type1][type2]
-    
+    if type1 and type2:
+        return gramatica.semantic_result(semantic_cube, operator, type1, type2) or ''
+
     return ''
 
 def get_operand_type(operand):
@@ -866,13 +760,12 @@ def analizar_archivo(filename):
         print(f"{i:3d} | {linea}")
     print("-"*70)
 
-    file_lexer = lex.lex()
-    file_lexer.lineno = 1
+    file_lexer = get_lexer()
 
     print("\nANALISIS SINTACTICO Y SEMANTICO:")
     print("-"*70)
     
-    resultado = parser.parse(codigo, lexer=file_lexer)
+    resultado = get_parser().parse(codigo, lexer=file_lexer)
 
     print_symbol_table()
     print_quadruples()
@@ -0,0 +1,604 @@
+#   COMPILADOR LITTLE DUCK - SERVIDOR DE LENGUAJE (LSP)
+#   Publica en el editor, mientras se escribe, los errores léxicos, sintácticos y
+#   semánticos que reporta main_virtual en modo --check. El parser se construye una
+#   sola vez al iniciar; en cada cambio solo se vuelven a parsear y analizar la
+#   función, el main o el bloque de variables globales editados.
+#
+#   Uso: python servidor_lsp.py   (JSON-RPC del Language Server Protocol por stdin/stdout)
+
+import bisect
+import copy
+import json
+import queue
+import re
+import sys
+import threading
+
+from main_virtual import (CompilationContext, CompilationHalted, Diagnostic, Function, SourceText,
+                          Call, If, While, DoWhile, GLOBAL_SCOPE, SPAN_TOKENS,
+                          get_lexer, get_parser, p_error, declare_variables, check_function,
+                          check_statements, compilar_codigo, function_key)
+
+###############################################################
+#              REGIONES DEL DOCUMENTO
+###############################################################
+
+# El documento se divide como en la compilación incremental: encabezado (programa y
+# variables globales), una región por función (de su void al siguiente void o main) y
+# main. Cada región guarda (inicio, fin, huella, saltos de línea ocultos): los que están
+# dentro de comentarios de bloque o cadenas, que el lexer no cuenta en lineno.
+
+# Caracteres que pueden abrir o cerrar una cadena o un comentario: una edición que
+# los toca puede cambiar todas las regiones que siguen
+_LAYOUT_CHARS = re.compile(r'["/*#\\]')
+
+def scan_layout(text):
+    """Retorna (encabezado, [región de cada función], región de main) o None si no tiene esa forma.
+
+    encabezado es (fin, saltos ocultos); las regiones son (inicio, fin, huella, saltos ocultos)."""
+    starts = []
+    hidden = [0]
+    main_start = None
+    for match in SPAN_TOKENS.finditer(text):
+        word = match.group(1)
+        if word is None:
+            hidden[-1] += match.group().count('\n')
+        elif main_start is not None:
+            return None
+        else:
+            if word == 'void':
+                starts.append(match.start())
+            else:
+                main_start = match.start()
+            hidden.append(0)
+    if main_start is None:
+        return None
+    ends = starts[1:] + [main_start]
+    spans = [(start, end, function_key(text[start:end]), count)
+             for start, end, count in zip(starts, ends, hidden[1:])]
+    main = (main_start, len(text), function_key(text[main_start:]), hidden[-1])
+    return (starts[0] if starts else main_start, hidden[0]), spans, main
+
+def update_layout(layout, old_text, start, end, inserted, text):
+    """Regiones de text, que es old_text con [start, end) reemplazado por inserted.
+
+    Si la edición cae dentro de una sola función (o de main) y no toca cadenas ni
+    comentarios, solo se vuelve a leer esa región y las siguientes se recorren."""
+    if (layout is None or _LAYOUT_CHARS.search(inserted) or _LAYOUT_CHARS.search(old_text, start, end)):
+        return scan_layout(text)
+    header, spans, main = layout
+    regions = spans + [main]
+    i = bisect.bisect_right(regions, (start,)) - 1
+    if i < 0:
+        return scan_layout(text)  # Edición en el encabezado
+    region_start, region_end, _, _ = regions[i]
+    last = i == len(spans)
+    # Sin tocar la palabra inicial ni el carácter antes del void siguiente
+    if start <= region_start + 4 or end > region_end or (end == region_end and not last):
+        return scan_layout(text)
+    delta = len(inserted) - (end - start)
+    new_end = region_end + delta
+    hidden = 0
+    for match in SPAN_TOKENS.finditer(text, region_start):
+        if match.start() >= new_end:
+            # La región sigue terminando justo en el void o main siguiente
+            if match.start() != new_end or match.group(1) is None:
+                return scan_layout(text)
+            break
+        if match.group(1) is None:
+            if match.end() > new_end:
+                return scan_layout(text)  # Un comentario ahora pasa a la región siguiente
+            hidden += match.group().count('\n')
+        elif match.start() != region_start:
+            return scan_layout(text)  # Apareció o desapareció un void o un main
+    region = (region_start, new_end, function_key(text[region_start:new_end]), hidden)
+    shifted = [(s + delta, e + delta, key, count) for s, e, key, count in regions[i + 1:]]
+    regions = regions[:i] + [region] + shifted
+    return header, regions[:-1], regions[-1]
+
+###############################################################
+#              ANÁLISIS INCREMENTAL
+###############################################################
+
+# El análisis de una función solo lee del contexto el nombre del programa, la pila de
+# tipos y la firma de las funciones que llama o que se llaman como ella; main lee además
+# las variables globales. Con eso se guarda su resultado (RegionCheck) y se reutiliza
+# mientras no cambie. Las regiones que hay que analizar se parsean solas: el encabezado
+# del programa, la región y el token que la sigue. Un error sintáctico detiene el parser
+# en el mismo token que en el archivo completo, y lo reconocido hasta ahí se analiza
+# igual que lo hace p_error(). El resultado es el mismo que el de compilar_codigo() con
+# check_only; lo que no se puede reproducir así (errores léxicos, un encabezado con
+# errores o una función llamada 'global') se analiza con el archivo completo.
+#
+# La pila de tipos solo importa para las regiones con errores: una expresión sin errores
+# apila exactamente lo que después se saca, pero una con errores puede dejar tipos en la
+# pila o sacar los que dejó una región anterior.
+
+class RegionCheck:
+    """Resultado del análisis semántico de una función o de main.
+
+    state es lo que la región lee del contexto además de deps ({función: tipos de sus
+    parámetros o None si no está declarada}): (nombre del programa o encabezado, pila de
+    tipos al entrar o None si la región no tuvo errores). diagnostics guarda (fase,
+    mensaje, posición relativa al inicio de la región)."""
+    __slots__ = ('state', 'deps', 'name', 'params', 'symbols', 'stack_out', 'diagnostics')
+
+
+class HeaderInfo:
+    """Encabezado parseado: texto, nombre del programa, variables globales y fin de 'program nombre;'"""
+    __slots__ = ('text', 'name', 'vars', 'prefix_end')
+
+
+class _RegionParsed(Exception):
+    """El parser pidió un token después del último rango: la región se reconoció completa"""
+
+    def __init__(self, symbols):
+        super().__init__()
+        self.symbols = symbols
+
+
+class _SyntaxStop(Exception):
+    """Error sintáctico en la región: token del error (None al fin del archivo), pila del parser
+    y contexto del parseo"""
+
+    def __init__(self, token, symbols, context):
+        super().__init__()
+        self.token = token
+        self.symbols = symbols
+        self.context = context
+
+
+def region_tokens(lexer, text, ranges):
+    """Función de tokens que lee solo los rangos (inicio, fin, lineno) del texto"""
+    pending = ranges[::-1]
+
+    def token():
+        while True:
+            tok = lexer.token()
+            if tok is not None or not pending:
+                return tok
+            lexer.lexpos, lexer.lexlen, lexer.lineno = pending.pop()
+
+    lexer.input(text)
+    lexer.lexlen = 0
+    return token
+
+def parse_region(source, ranges, to_eof=False):
+    """Parsea los rangos como un solo programa en un contexto aparte.
+
+    Retorna (contexto, resultado): el Program si to_eof, si no la pila del parser al
+    pedir un token después del último rango. Un error sintáctico se lanza como _SyntaxStop."""
+    scratch = CompilationContext(quiet=True, check_only=True)
+    scratch.source = source
+    lexer = get_lexer(scratch)
+    parser = get_parser(scratch)
+    next_token = region_tokens(lexer, source.text, ranges)
+
+    def token():
+        tok = next_token()
+        if tok is None and not to_eof:
+            raise _RegionParsed(parser.symstack)
+        return tok
+
+    def stop(token):
+        raise _SyntaxStop(token, parser.symstack, scratch)
+
+    parser.errorfunc = stop
+    try:
+        return scratch, parser.parse(lexer=lexer, tokenfunc=token)
+    except _RegionParsed as parsed:
+        return scratch, parsed.symbols
+
+def called_functions(statements, names):
+    """Agrega a names las funciones que llaman los estatutos"""
+    for statement in statements:
+        statement_type = type(statement)
+        if statement_type is Call:
+            names.add(statement.name)
+        elif statement_type is If:
+            called_functions(statement.then_body, names)
+            if statement.else_body is not None:
+                called_functions(statement.else_body, names)
+        elif statement_type is While or statement_type is DoWhile:
+            called_functions(statement.body, names)
+    return names
+
+def param_types(function_info):
+    return None if function_info is None else tuple(param[1] for param in function_info['params'])
+
+def region_diagnostics(ctx, first, start):
+    """Diagnósticos de ctx desde first con su posición relativa a start (None si alguno no tiene posición)"""
+    starts = ctx.source.line_starts()
+    diagnostics = []
+    for diagnostic in ctx.diagnostics[first:]:
+        if diagnostic.column is None:
+            return None
+        offset = starts[diagnostic.line - 1] + diagnostic.column - 1
+        diagnostics.append((diagnostic.phase, diagnostic.message, offset - start))
+    return diagnostics
+
+def check_region(ctx, region_start, func=None, body=None, context_key=None):
+    """Analiza una función (o el cuerpo de main) y retorna su RegionCheck"""
+    directory = ctx.function_directory
+    check = RegionCheck()
+    stack_in = tuple(ctx.stack_args)
+    names = called_functions(func.body if func is not None else body, set())
+    if func is not None:
+        names.add(func.name)
+    check.deps = {name: param_types(directory.get(name)) for name in names}
+    first = len(ctx.diagnostics)
+    if func is not None:
+        declared = func.name in directory
+        check_function(ctx, func)
+        check.name = func.name
+        check.params = directory[func.name]['params'] if not declared and func.name in directory else None
+        check.symbols = ctx.symbol_table[ctx.scope_ids[func.name]]
+    else:
+        check_statements(ctx, body)
+        check.name = check.params = check.symbols = None
+    check.stack_out = tuple(ctx.stack_args)
+    check.diagnostics = region_diagnostics(ctx, first, region_start)
+    if check.diagnostics == [] and check.stack_out == stack_in:
+        check.state = (context_key, None)
+        check.stack_out = None
+    else:
+        check.state = (context_key, stack_in)
+    return check
+
+def partial_diagnostics(ctx, stop):
+    """Termina el análisis en un error sintáctico como lo hace p_error() con el archivo completo.
+
+    ctx ya tiene analizado todo lo anterior a la región, así que de la pila del parser se
+    vacían las variables globales y las funciones previas que trae el parseo de la región."""
+    symbols = list(stop.symbols)
+    for i in (4, 5):
+        if i < len(symbols) and symbols[i].type in ('program_vars', 'funcs', 'program_funcs'):
+            symbols[i] = copy.copy(symbols[i])
+            symbols[i].value = []
+    ctx.lexer = stop.context.lexer  # Línea del fin de archivo inesperado
+    try:
+        p_error(stop.token, context=ctx, symbols=symbols)
+    except CompilationHalted:
+        pass
+    return ctx.diagnostics
+
+def reusable(ctx, check, context_key):
+    if check is None or check.diagnostics is None or check.state[0] != context_key:
+        return False
+    if check.state[1] is not None and check.state[1] != tuple(ctx.stack_args):
+        return False
+    directory = ctx.function_directory
+    return all(param_types(directory.get(name)) == types for name, types in check.deps.items())
+
+def replay_region(ctx, check, region_start):
+    """Aplica al contexto un RegionCheck guardado (lo mismo que haría volver a analizar la región)"""
+    position = ctx.source.position
+    for phase, message, offset in check.diagnostics:
+        ctx.parser_errors.append(message)
+        ctx.diagnostics.append(Diagnostic(phase, message, *position(region_start + offset)))
+    if check.name is not None:
+        scope = ctx.open_scope(check.name)
+        ctx.symbol_table[scope] = check.symbols
+        ctx.current_scope = GLOBAL_SCOPE
+        if check.params is not None:
+            ctx.function_directory[check.name] = {'type': 'void', 'params': check.params, 'vars': {},
+                                                  'start_quad': None}
+    if check.stack_out is not None:
+        ctx.stack_args[:] = check.stack_out
+
+
+class Document:
+    """Documento abierto en el editor, con sus regiones y los análisis que se pueden reutilizar"""
+
+    def __init__(self, text, version=None):
+        self.version = version
+        self.header = None  # HeaderInfo del último análisis
+        self.checks = {}  # huella de la región -> RegionCheck
+        self.full_analyses = 0  # Análisis que necesitaron el archivo completo
+        self.set_text(text)
+
+    def set_text(self, text):
+        self.text = text
+        self.source = SourceText(text)
+        self.layout = scan_layout(text)
+
+    def edit(self, start, end, inserted):
+        """Reemplaza [start, end) por inserted"""
+        old_text = self.text
+        self.source = self.source.replace(start, end, inserted)
+        self.text = self.source.text
+        self.layout = update_layout(self.layout, old_text, start, end, inserted, self.text)
+
+    def full_diagnostics(self):
+        self.full_analyses += 1
+        return compilar_codigo(self.text, CompilationContext(quiet=True, check_only=True)).diagnostics
+
+    def parse_header(self, header_end, boundary_line):
+        """Parsea el encabezado y lo guarda como HeaderInfo; retorna None si tiene errores"""
+        try:
+            scratch, symbols = parse_region(self.source, [(0, header_end, 1),
+                                                          (header_end, header_end + 4, boundary_line)])
+        except _SyntaxStop:
+            return None
+        if scratch.lexer_errors or [symbol.type for symbol in symbols[1:5]] != ['PROGRAM', 'ID', 'SEMICOL',
+                                                                                 'program_vars']:
+            return None
+        header = HeaderInfo()
+        header.text = self.text[:header_end]
+        header.name = symbols[2].value
+        header.vars = symbols[4].value
+        header.prefix_end = symbols[3].lexpos + 1
+        return header
+
+    def diagnostics(self):
+        """Diagnósticos del documento, los mismos (y en el mismo orden) que los de compilar_codigo() con check_only"""
+        if self.layout is None:
+            return self.full_diagnostics()
+        (header_end, hidden), spans, main = self.layout
+        text = self.text
+        source = self.source
+        line_starts = source.line_starts()
+
+        def lexer_line(position):
+            # Línea que lleva el lexer en position (no cuenta los saltos ocultos)
+            return bisect.bisect_right(line_starts, position) - hidden
+
+        header = self.header
+        if header is None or header.text != text[:header_end]:
+            header = self.header = self.parse_header(header_end, lexer_line(header_end))
+            if header is None:
+                return self.full_diagnostics()
+        prefix = (0, header.prefix_end, 1)
+
+        ctx = CompilationContext(quiet=True, check_only=True)
+        ctx.source = source
+        ctx.program_name = header.name
+        declare_variables(ctx, header.vars)
+
+        checks = {}
+        regions = spans + [main]
+        for i, (start, end, key, region_hidden) in enumerate(regions):
+            is_main = i == len(spans)
+            context_key = header.text if is_main else header.name
+            check = self.checks.get(key)
+            if reusable(ctx, check, context_key):
+                replay_region(ctx, check, start)
+            else:
+                start_line = lexer_line(start)
+                try:
+                    if is_main:
+                        scratch, program = parse_region(source, [prefix, (start, end, start_line)], to_eof=True)
+                        func, body = None, program.body
+                    else:
+                        boundary_line = start_line + text.count('\n', start, end) - region_hidden
+                        scratch, symbols = parse_region(source, [prefix, (start, end, start_line),
+                                                                 (end, end + 4, boundary_line)])
+                        funcs = symbols[5].value if len(symbols) > 5 else None
+                        if not funcs or len(funcs) != 1 or type(funcs[0]) is not Function:
+                            return self.full_diagnostics()
+                        func, body = funcs[0], None
+                except _SyntaxStop as stop:
+                    if stop.context.lexer_errors:
+                        return self.full_diagnostics()
+                    self.keep_checks(checks, regions[i:])
+                    return partial_diagnostics(ctx, stop)
+                if scratch.lexer_errors:
+                    return self.full_diagnostics()
+                if func is not None and func.name == 'global':
+                    return self.full_diagnostics()
+                check = check_region(ctx, start, func, body, context_key)
+            checks[key] = check
+            hidden += region_hidden
+        self.checks = checks
+        return ctx.diagnostics
+
+    def keep_checks(self, checks, regions):
+        """Conserva los análisis de las regiones que no se alcanzaron a revisar"""
+        for _, _, key, _ in regions:
+            if key in self.checks and key not in checks:
+                checks[key] = self.checks[key]
+        self.checks = checks
+
+###############################################################
+#              PROTOCOLO (JSON-RPC POR STDIO)
+###############################################################
+
+# Las posiciones del protocolo son (línea, carácter) desde 0, con los caracteres
+# contados en unidades UTF-16
+_TOKEN_AT = re.compile(r'"(?:[^"\\\n]|\\.)*"|\w+')
+
+def read_message(stream):
+    """Lee un mensaje con encabezado Content-Length; retorna None al cerrarse la entrada"""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is not None:
+                break
+            continue
+        name, _, value = line.decode('ascii', 'replace').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return json.loads(stream.read(length).decode('utf-8'))
+
+def write_message(stream, message):
+    body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    stream.write(b'Content-Length: %d\r\n\r\n%s' % (len(body), body))
+    stream.flush()
+
+def to_offset(source, position):
+    """Posición del protocolo -> posición en el texto"""
+    text = source.text
+    starts = source.line_starts()
+    line = position['line']
+    if line >= len(starts):
+        return len(text)
+    start = starts[line]
+    end = starts[line + 1] - 1 if line + 1 < len(starts) else len(text)
+    character = position['character']
+    segment = text[start:end]
+    if segment.isascii():
+        return start + min(character, len(segment))
+    units = 0
+    for i, char in enumerate(segment):
+        if units >= character:
+            return start + i
+        units += 2 if ord(char) > 0xFFFF else 1
+    return end
+
+def to_position(source, offset):
+    """Posición en el texto -> posición del protocolo"""
+    line, column = source.position(offset)
+    prefix = source.text[offset - column + 1:offset]
+    return {'line': line - 1, 'character': len(prefix) + sum(1 for char in prefix if ord(char) > 0xFFFF)}
+
+def lsp_diagnostic(source, diagnostic):
+    """Diagnostic -> diagnóstico del protocolo, marcando el token donde está el error"""
+    if diagnostic.line is None:
+        start = end = {'line': 0, 'character': 0}
+    elif diagnostic.column is None:
+        start = end = {'line': diagnostic.line - 1, 'character': 0}
+    else:
+        offset = source.line_starts()[diagnostic.line - 1] + diagnostic.column - 1
+        match = _TOKEN_AT.match(source.text, offset)
+        start = to_position(source, offset)
+        end = to_position(source, match.end() if match else min(offset + 1, len(source.text)))
+    return {'range': {'start': start, 'end': end}, 'severity': 1, 'source': 'little-duck',
+            'message': diagnostic.message}
+
+
+class LanguageServer:
+    """Estado del servidor: documentos abiertos y los que falta volver a analizar"""
+
+    def __init__(self, output):
+        self.output = output
+        self.documents = {}  # uri -> Document
+        self.pending = []  # uris con cambios sin diagnósticos publicados
+        self.shutdown_requested = False
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        write_message(self.output, message)
+
+    def handle(self, message):
+        """Atiende una petición o notificación del cliente"""
+        method = message.get('method')
+        handler = self.METHODS.get(method)
+        if handler is None:
+            if 'id' in message and method is not None:
+                self.send({'id': message['id'], 'error': {'code': -32601, 'message': f"Método no soportado: {method}"}})
+            return
+        try:
+            result = handler(self, message.get('params') or {})
+        except Exception as e:
+            if 'id' not in message:
+                print(f"ERROR en {method}: {e!r}", file=sys.stderr)
+                return
+            self.send({'id': message['id'], 'error': {'code': -32603, 'message': repr(e)}})
+        else:
+            if 'id' in message:
+                self.send({'id': message['id'], 'result': result})
+
+    def initialize(self, params):
+        return {'capabilities': {'textDocumentSync': {'openClose': True, 'change': 2}},
+                'serverInfo': {'name': 'little-duck'}}
+
+    def initialized(self, params):
+        return None
+
+    def shutdown(self, params):
+        self.shutdown_requested = True
+        return None
+
+    def did_open(self, params):
+        document = params['textDocument']
+        self.documents[document['uri']] = Document(document['text'], document.get('version'))
+        self.mark(document['uri'])
+
+    def did_change(self, params):
+        uri = params['textDocument']['uri']
+        document = self.documents[uri]
+        for change in params['contentChanges']:
+            if 'range' in change:
+                source = document.source
+                document.edit(to_offset(source, change['range']['start']), to_offset(source, change['range']['end']),
+                              change['text'])
+            else:
+                document.set_text(change['text'])
+        document.version = params['textDocument'].get('version')
+        self.mark(uri)
+
+    def did_close(self, params):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        if uri in self.pending:
+            self.pending.remove(uri)
+        self.send({'method': 'textDocument/publishDiagnostics', 'params': {'uri': uri, 'diagnostics': []}})
+
+    def mark(self, uri):
+        if uri not in self.pending:
+            self.pending.append(uri)
+
+    def publish_pending(self):
+        """Analiza los documentos con cambios y publica sus diagnósticos"""
+        while self.pending:
+            uri = self.pending.pop(0)
+            document = self.documents[uri]
+            source = document.source
+            diagnostics = [lsp_diagnostic(source, diagnostic) for diagnostic in document.diagnostics()]
+            self.send({'method': 'textDocument/publishDiagnostics',
+                       'params': {'uri': uri, 'version': document.version, 'diagnostics': diagnostics}})
+
+    METHODS = {
+        'initialize': initialize,
+        'initialized': initialized,
+        'shutdown': shutdown,
+        'textDocument/didOpen': did_open,
+        'textDocument/didChange': did_change,
+        'textDocument/didClose': did_close,
+    }
+
+###############################################################
+#                           MAIN
+###############################################################
+
+def ejecutar_servidor(entrada, salida):
+    """Atiende mensajes de entrada hasta recibir exit; retorna el código de salida.
+
+    Este hilo lee los mensajes y otro los atiende: antes de analizar se atienden todos
+    los que ya llegaron, así una ráfaga de cambios produce un solo análisis por documento."""
+    mensajes = queue.Queue()
+    server = LanguageServer(salida)
+
+    def atender():
+        while True:
+            mensaje = mensajes.get()
+            while mensaje is not None:
+                server.handle(mensaje)
+                try:
+                    mensaje = mensajes.get_nowait()
+                except queue.Empty:
+                    break
+            server.publish_pending()
+            if mensaje is None:
+                return
+
+    # Construye (o carga) las tablas del lexer y del parser antes del primer documento
+    compilar_codigo("program p; main { } end", CompilationContext(quiet=True, check_only=True))
+    worker = threading.Thread(target=atender)
+    worker.start()
+    while True:
+        mensaje = read_message(entrada)
+        if mensaje is None or mensaje.get('method') == 'exit':
+            mensajes.put(None)
+            worker.join()
+            return 0 if mensaje is not None and server.shutdown_requested else 1
+        mensajes.put(mensaje)
+
+if __name__ == "__main__":
+    salida = sys.stdout.buffer
+    sys.stdout = sys.stderr  # Nada impreso por error debe mezclarse con el protocolo
+    sys.exit(ejecutar_servidor(sys.stdin.buffer, salida))
@@ -0,0 +1,19 @@
+# Pruebas del compilador Little Duck. Los módulos del compilador están en la raíz del
+# repositorio: se agrega al path para importarlos igual que los scripts.
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+CASOS = os.path.join(RAIZ, 'test_cases')
+
+def caso(*partes):
+    """Ruta de un archivo de test_cases/"""
+    return os.path.join(CASOS, *partes)
+
+def leer(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return f.read()
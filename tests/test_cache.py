@@ -0,0 +1,84 @@
+# Caché de compilación (CompileCache) y caché de funciones (FunctionCache)
+
+import os
+import time
+
+from conftest import caso, leer
+from main_virtual import CompilationContext, CompileCache, compilar_codigo
+
+def compilar(codigo, cache, filename='programa.txt'):
+    ctx = CompilationContext(quiet=True)
+    return compilar_codigo(codigo, ctx, cache, cache.functions(filename))
+
+def archivos(directorio):
+    return sorted(name for name in os.listdir(directorio) if name.endswith('.pickle'))
+
+def envejecer(directorio, segundos):
+    """Hace que las entradas existentes parezcan usadas hace segundos"""
+    for name in archivos(directorio):
+        path = os.path.join(directorio, name)
+        stamp = time.time() - segundos
+        os.utime(path, (stamp, stamp))
+
+def test_acierto_reutiliza_la_compilacion(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    codigo = leer(caso('valid', '04_functions.txt'))
+    original = compilar(codigo, cache)
+    cached = compilar(codigo, cache)
+    assert cached.from_cache
+    assert cached.quadruples == original.quadruples
+    assert cached.constants_table == original.constants_table
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0}
+
+def test_no_guarda_compilaciones_con_errores(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    compilar(leer(caso('errors', '01_type_mismatch.txt')), cache)
+    assert archivos(tmp_path) == []
+
+def test_desaloja_las_entradas_menos_usadas(tmp_path):
+    cache = CompileCache(str(tmp_path))
+    compilar(leer(caso('valid', '01_arithmetic.txt')), cache, 'a.txt')
+    compilar(leer(caso('valid', '02_conditionals.txt')), cache, 'b.txt')
+    envejecer(tmp_path, 60)
+    viejas = archivos(tmp_path)
+    assert len(viejas) == 2
+    os.utime(os.path.join(tmp_path, cache.key(leer(caso('valid', '01_arithmetic.txt'))) + '.pickle'))
+
+    # Solo cabe una entrada más: se desaloja la de b.txt, que se usó hace más tiempo
+    cache.max_bytes = max(os.path.getsize(os.path.join(tmp_path, name)) for name in viejas) * 2 + 1
+    compilar(leer(caso('valid', '03_loops.txt')), cache, 'c.txt')
+    assert cache.key(leer(caso('valid', '02_conditionals.txt'))) + '.pickle' not in archivos(tmp_path)
+    assert cache.key(leer(caso('valid', '01_arithmetic.txt'))) + '.pickle' in archivos(tmp_path)
+    assert cache.evictions >= 1
+
+def test_desalojo_cuenta_las_funciones(tmp_path):
+    """Las FunctionCache de funciones/ entran en el límite y se desalojan como las demás"""
+    funciones = tmp_path / 'funciones'
+    cache = CompileCache(str(tmp_path))
+    codigo = leer(caso('valid', '11_function_chain.txt'))
+    compilar(codigo, cache, 'a.txt')
+    assert len(archivos(funciones)) == 1
+    envejecer(tmp_path, 60)
+    envejecer(funciones, 120)
+
+    # Caben las compilaciones pero no las funciones de a.txt: se desaloja la más vieja
+    compilaciones = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in archivos(tmp_path))
+    cache.max_bytes = 2 * compilaciones + 1
+    compilar(codigo.replace('processNumber(10)', 'processNumber(11)'), cache, 'b.txt')
+    assert cache.evictions >= 1
+    assert len(archivos(funciones)) == 1
+
+    total = sum(os.path.getsize(os.path.join(directorio, name))
+                for directorio in (tmp_path, funciones) for name in archivos(directorio))
+    assert total <= cache.max_bytes
+
+def test_funciones_sin_limite_se_desalojan(tmp_path):
+    """Compilaciones incrementales de muchos archivos no crecen más allá de max_bytes"""
+    cache = CompileCache(str(tmp_path), max_bytes=64 * 1024)
+    codigo = leer(caso('valid', '04_functions.txt'))
+    for i in range(40):
+        compilar(codigo.replace('suma(5, 3)', f'suma({i}, 3)'), cache, f'{i}.txt')
+    total = sum(os.path.getsize(os.path.join(directorio, name))
+                for directorio in (tmp_path, tmp_path / 'funciones') for name in archivos(directorio))
+    assert total <= cache.max_bytes
+    assert cache.evictions > 0
@@ -0,0 +1,57 @@
+# Listas de declaraciones (id_list, param_list, var_list) en tiempo lineal y secuencias
+# de estatutos y de funciones con la pila del parser acotada
+
+import time
+
+from escalamiento import TokenReplay, growth_exponent
+from generador_programas import generar_programa
+from medir_pila import SHAPES, medir
+from main_virtual import CompilationContext, SourceText, get_lexer, get_parser, check_program
+
+# Tamaños del escalamiento (identificadores por lista) y exponente máximo aceptado:
+# las listas que se copian en cada paso crecen como N^2
+SIZES = (1000, 10000, 100000)
+MAX_EXPONENT = 1.3
+
+def declaraciones(n):
+    """Programa con un var de n identificadores, n bloques de var y una función de n parámetros"""
+    ids = ', '.join(f'a{i}' for i in range(n))
+    groups = ' '.join(f'b{i} : float;' for i in range(n))
+    params = ', '.join(f'p{i} : int' for i in range(n))
+    return f"program escala;\nvar {ids} : int;\n{groups}\nvoid f({params})\n[ {{ }} ];\nmain {{ }}\nend\n"
+
+def analizar(n, repetitions):
+    """Segundos del parser y del análisis semántico (el mejor de repetitions) y el programa analizado"""
+    codigo = declaraciones(n)
+    ctx = CompilationContext(quiet=True, check_only=True)
+    ctx.source = SourceText(codigo)
+    lexer = get_lexer(ctx)
+    lexer.input(codigo)
+    tokens_list = list(iter(lexer.token, None))
+    best = None
+    for _ in range(repetitions):
+        ctx = CompilationContext(quiet=True, check_only=True)
+        start = time.perf_counter()
+        program = get_parser(ctx).parse(lexer=TokenReplay(tokens_list))
+        check_program(ctx, program)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    assert not ctx.diagnostics
+    return best, program
+
+def test_declaraciones_escalan_linealmente():
+    seconds = []
+    for n in SIZES:
+        # Las mediciones cortas son las ruidosas; la más larga basta con una vez
+        best, program = analizar(n, 1 if n == SIZES[-1] else 3)
+        assert len(program.vars) == 2 * n
+        assert len(program.funcs[0].params) == n
+        seconds.append(best)
+    exponent = growth_exponent(SIZES, seconds)
+    assert exponent < MAX_EXPONENT, f"crece como N^{exponent:.2f}: {seconds}"
+
+def test_pila_del_parser_acotada():
+    """Las secuencias de estatutos y de funciones no acumulan símbolos en la pila del parser"""
+    for name, sizes in (('estatutos', (100, 2000)), ('funciones', (5, 100))):
+        depths = {medir(generar_programa(**SHAPES[name](n)))[0] for n in sizes}
+        assert len(depths) == 1, f"{name}: {depths}"
@@ -0,0 +1,75 @@
+# Lectura del código fuente (SourceText): mmap, pipes, fines de línea e índice de líneas
+
+import os
+import subprocess
+import sys
+import threading
+
+from conftest import RAIZ, caso, leer
+from main_virtual import CompilationContext, SourceText, analizar_archivo
+
+def test_archivo_regular(tmp_path):
+    filename = caso('valid', '01_arithmetic.txt')
+    assert SourceText.from_file(filename).text == leer(filename)
+
+def test_archivo_vacio(tmp_path):
+    filename = tmp_path / 'vacio.txt'
+    filename.write_text('')
+    assert SourceText.from_file(filename).text == ''
+
+def test_fifo(tmp_path):
+    """Un FIFO reporta tamaño 0 pero sí tiene contenido: se lee sin mmap"""
+    codigo = leer(caso('valid', '01_arithmetic.txt'))
+    fifo = tmp_path / 'programa.fifo'
+    os.mkfifo(fifo)
+
+    def escribir():
+        with open(fifo, 'w', encoding='utf-8') as f:
+            f.write(codigo)
+
+    writer = threading.Thread(target=escribir)
+    writer.start()
+    try:
+        assert SourceText.from_file(fifo).text == codigo
+    finally:
+        writer.join()
+
+def test_pipe_por_linea_de_comandos():
+    """Equivale a python main_virtual.py <(cat programa.txt) --check"""
+    codigo = leer(caso('valid', '01_arithmetic.txt')).encode('utf-8')
+    read_fd, write_fd = os.pipe()
+    try:
+        proceso = subprocess.Popen([sys.executable, 'main_virtual.py', f'/dev/fd/{read_fd}', '--check', '--quiet'],
+                                   cwd=RAIZ, pass_fds=(read_fd,), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        os.close(read_fd)
+        os.write(write_fd, codigo)
+        os.close(write_fd)
+        write_fd = None
+        out, err = proceso.communicate(timeout=60)
+    finally:
+        if write_fd is not None:
+            os.close(write_fd)
+    assert proceso.returncode == 0, err.decode()
+    assert err == b''
+
+def test_fines_de_linea_se_normalizan(tmp_path):
+    for newline in ('\r\n', '\r'):
+        filename = tmp_path / 'programa.txt'
+        filename.write_bytes(newline.join(['program p;', 'var x : int;', '', 'main {', '  y = 1;', '}', 'end', '']).encode())
+        source = SourceText.from_file(filename)
+        assert '\r' not in source.text
+        assert list(source.lines())[4] == '  y = 1;'
+
+        ctx = CompilationContext(quiet=True, check_only=True)
+        assert not analizar_archivo(str(filename), ctx)
+        assert [(d.line, d.column) for d in ctx.diagnostics] == [(5, 3)]
+
+def test_posicion_y_reemplazo():
+    source = SourceText('a\nbc\n\ndef')
+    assert source.position(0) == (1, 1)
+    assert source.position(3) == (2, 2)
+    assert source.position(6) == (4, 1)
+    # Con el índice ya construido, replace() lo ajusta en lugar de recalcularlo
+    edited = source.replace(2, 4, 'x\ny\nz')
+    assert edited.text == 'a\nx\ny\nz\n\ndef'
+    assert list(edited.line_starts()) == list(SourceText(edited.text).line_starts())
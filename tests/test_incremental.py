@@ -0,0 +1,58 @@
+# Compilación incremental (FunctionCache): recompilar solo las funciones que cambiaron
+# produce el mismo programa que compilar todo de nuevo
+
+from main_virtual import CompilationContext, FunctionCache, compilar_codigo
+from generador_programas import generar_programa
+
+CODIGO = generar_programa(functions=6, statements=6, depth=1, recursion_depth=3)
+
+def compilar(codigo, functions=None):
+    ctx = compilar_codigo(codigo, CompilationContext(quiet=True), functions=functions)
+    assert not ctx.diagnostics
+    return ctx
+
+def assert_mismo_programa(incremental, completa):
+    assert incremental.quadruples == completa.quadruples
+    assert incremental.constants_table == completa.constants_table
+    assert incremental.function_directory == completa.function_directory
+    assert incremental.memory_manager.get_memory_usage() == completa.memory_manager.get_memory_usage()
+
+def editar(codigo, funcion, anterior, nuevo):
+    """Reemplaza texto solo dentro de la función indicada"""
+    inicio = codigo.index(f'void {funcion}(')
+    fin = codigo.index('];', inicio)
+    cuerpo = codigo[inicio:fin]
+    assert anterior in cuerpo
+    return codigo[:inicio] + cuerpo.replace(anterior, nuevo, 1) + codigo[fin:]
+
+def test_sin_cambios_reutiliza_todas_las_funciones():
+    functions = FunctionCache()
+    compilar(CODIGO, functions)
+    ctx = compilar(CODIGO, functions)
+    assert ctx.reused_functions == (7, 0)
+    assert_mismo_programa(ctx, compilar(CODIGO))
+
+def test_recompila_solo_la_funcion_editada():
+    functions = FunctionCache()
+    compilar(CODIGO, functions)
+    editado = editar(CODIGO, 'f3', '{', '{\n    print("editado", 12345);')
+    ctx = compilar(editado, functions)
+    assert ctx.reused_functions == (6, 1)
+    assert_mismo_programa(ctx, compilar(editado))
+
+def test_cambio_de_firma_recompila_a_quien_la_llama():
+    """f1 llama a f0: si f0 cambia de parámetros, la unidad guardada de f1 ya no sirve"""
+    functions = FunctionCache()
+    compilar(CODIGO, functions)
+    editado = editar(CODIGO, 'f0', 'f0()', 'f0(extra : int)').replace('f0();', 'f0(1);')
+    ctx = compilar(editado, functions)
+    assert_mismo_programa(ctx, compilar(editado))
+
+def test_funcion_nueva():
+    functions = FunctionCache()
+    compilar(CODIGO, functions)
+    nueva = 'void nueva(a : int)\n[ {\n    print(a * 2);\n  }\n];\n\nmain {'
+    editado = CODIGO.replace('main {', nueva, 1).replace('\n}\nend', '\n  nueva(7);\n}\nend')
+    ctx = compilar(editado, functions)
+    assert ctx.reused_functions == (7, 1)
+    assert_mismo_programa(ctx, compilar(editado))
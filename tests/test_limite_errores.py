@@ -0,0 +1,53 @@
+# Límite de errores de CompilationContext (--max-errors / --fail-fast)
+
+import subprocess
+import sys
+
+import pytest
+
+from conftest import RAIZ
+from main_virtual import CompilationContext, compilar_codigo
+
+def con_errores(n):
+    """Programa con n asignaciones a variables no declaradas y un carácter ilegal al final"""
+    body = '\n'.join(f'  y{i} = {i};' for i in range(n))
+    return f"program errores;\nvar x : int;\nmain {{\n{body}\n  x = 1 @ ;\n}}\nend\n"
+
+def compilar(codigo, max_errors=None):
+    return compilar_codigo(codigo, CompilationContext(quiet=True, max_errors=max_errors))
+
+def test_sin_limite_reporta_todos():
+    ctx = compilar(con_errores(30))
+    assert len(ctx.diagnostics) == 31
+    # Los errores léxicos salen al parsear, antes del análisis semántico del AST
+    assert [d.phase for d in ctx.diagnostics[:2]] == ['léxico', 'semántico']
+    assert not ctx.truncated
+
+@pytest.mark.parametrize('max_errors', [1, 5, 30])
+def test_se_detiene_al_alcanzar_el_limite(max_errors):
+    completo = compilar(con_errores(30))
+    ctx = compilar(con_errores(30), max_errors)
+    assert ctx.truncated
+    assert [d.to_dict() for d in ctx.diagnostics] == [d.to_dict() for d in completo.diagnostics[:max_errors]]
+    assert ctx.quadruples == []
+
+def test_limite_mayor_que_los_errores():
+    ctx = compilar(con_errores(3), 10)
+    assert len(ctx.diagnostics) == 4
+    assert not ctx.truncated
+
+def test_sin_errores_no_se_trunca():
+    ctx = compilar("program p;\nvar x : int;\nmain {\n  x = 1;\n}\nend\n", 1)
+    assert not ctx.diagnostics and not ctx.truncated
+    assert ctx.quadruples
+
+def test_fail_fast_por_linea_de_comandos(tmp_path):
+    filename = tmp_path / 'errores.txt'
+    filename.write_text(con_errores(10))
+    proceso = subprocess.run([sys.executable, 'main_virtual.py', str(filename), '--check', '--quiet', '--fail-fast'],
+                             cwd=RAIZ, capture_output=True, text=True, timeout=60)
+    assert proceso.returncode == 1
+    lineas = proceso.stderr.splitlines()
+    assert len(lineas) == 2
+    assert lineas[0].endswith("Carácter ilegal '@'")
+    assert 'límite de 1 errores' in lineas[1]
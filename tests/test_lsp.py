@@ -0,0 +1,65 @@
+# Servidor de lenguaje: los diagnósticos incrementales son los del análisis completo,
+# una edición solo vuelve a analizar su región, y la sesión de medir_lsp.py es mucho
+# más rápida por tecla que un análisis completo
+
+import statistics
+
+import pytest
+
+import servidor_lsp
+from conftest import caso, leer
+from medir_lsp import diagnosticos_completos, medir, programa
+from servidor_lsp import Document
+
+def como_dicts(diagnostics):
+    return [d.to_dict() for d in diagnostics]
+
+@pytest.fixture
+def analizadas(monkeypatch):
+    """Lista con la posición de cada región que se vuelve a analizar"""
+    starts = []
+    check_region = servidor_lsp.check_region
+
+    def contar(ctx, region_start, *args, **kwargs):
+        starts.append(region_start)
+        return check_region(ctx, region_start, *args, **kwargs)
+
+    monkeypatch.setattr(servidor_lsp, 'check_region', contar)
+    return starts
+
+def test_editar_una_funcion_reanaliza_solo_esa_region(analizadas):
+    codigo = programa(20)
+    document = Document(codigo)
+    document.diagnostics()
+    assert len(analizadas) == 21  # 20 funciones y main
+    analizadas.clear()
+    position = codigo.index('{', codigo.index('void f10(')) + 1
+    document.edit(position, position, '\n    v0 = 1;')
+    assert document.diagnostics() == []
+    assert analizadas == [document.layout[1][10][0]]
+    assert document.full_analyses == 0
+
+def test_sin_cambios_no_reanaliza(analizadas):
+    document = Document(programa(10))
+    document.diagnostics()
+    analizadas.clear()
+    document.diagnostics()
+    assert analizadas == []
+
+def test_error_semantico_en_una_funcion():
+    codigo = leer(caso('valid', '04_functions.txt'))
+    document = Document(codigo)
+    assert como_dicts(document.diagnostics()) == como_dicts(diagnosticos_completos(codigo))
+    position = codigo.index('{', codigo.index('void ')) + 1
+    document.edit(position, position, '\n  sin_declarar = 1;')
+    diagnostics = document.diagnostics()
+    assert diagnostics
+    assert como_dicts(diagnostics) == como_dicts(diagnosticos_completos(document.text))
+
+def test_sesion_igual_al_analisis_completo():
+    medir(12, verificar=True)
+
+def test_latencia_por_tecla():
+    full, results = medir(150)
+    for name, latencies in results.items():
+        assert statistics.median(latencies) < full / 5, name
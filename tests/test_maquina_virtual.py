@@ -0,0 +1,81 @@
+# Máquina virtual: los cuádruplos se decodifican una vez al cargar el programa (con las
+# constantes como valores inmediatos), y un cuádruplo inválido solo es un error si se
+# llega a ejecutar
+
+from conftest import caso, leer
+from main_virtual import CompilationContext, VirtualMachine, compilar_codigo
+
+# Direcciones: enteros globales desde 1000, temporales enteros desde 12000 y
+# constantes enteras desde 17000
+CONSTANTES = {'int': {3: 17000, 2: 17001, 0: 17002}, 'float': {}, 'string': {}}
+
+def cargar(quads, constants=CONSTANTES):
+    vm = VirtualMachine()
+    vm.load_program(quads, constants, {})
+    return vm
+
+def compilar(nombre):
+    ctx = compilar_codigo(leer(caso('valid', nombre)), CompilationContext(quiet=True))
+    vm = VirtualMachine()
+    vm.load_program(ctx.quadruples, ctx.constants_table, ctx.function_directory,
+                    ctx.memory_manager.get_memory_usage())
+    return vm
+
+def test_una_instruccion_por_cuadruplo():
+    vm = compilar('04_functions.txt')
+    assert len(vm.code) == len(vm.quadruples)
+    assert all(callable(instruction) for instruction in vm.code)
+
+def test_reset_reutiliza_el_codigo_decodificado(capsys):
+    vm = compilar('05_recursion.txt')
+    code = vm.code
+    assert vm.run(quiet=True)
+    first = capsys.readouterr().out
+    vm.reset()
+    assert vm.run(quiet=True)
+    assert vm.code is code
+    assert capsys.readouterr().out == first
+
+def test_direccion_invalida_sin_ejecutar():
+    vm = cargar([('=', 17000, None, 1000), ('END', None, None, None), ('=', 99999, None, 1000)])
+    assert vm.run(quiet=True)
+    assert vm.global_memory[0] == 3
+
+def test_direccion_invalida_al_ejecutar(capsys):
+    vm = cargar([('=', 17000, None, 1000), ('=', 99999, None, 1000), ('END', None, None, None)])
+    assert not vm.run(quiet=True)
+    out = capsys.readouterr().out
+    assert 'en cuádruplo 1' in out
+    assert 'Dirección de memoria inválida: 99999' in out
+    assert vm.global_memory[0] == 3
+
+def test_escritura_en_constantes(capsys):
+    vm = cargar([('=', 17001, None, 17000), ('END', None, None, None)])
+    assert not vm.run(quiet=True)
+    assert 'No se puede escribir en memoria de constantes' in capsys.readouterr().out
+
+def test_operador_desconocido(capsys):
+    vm = cargar([('??', 17000, 17001, 12000), ('END', None, None, None)])
+    assert not vm.run(quiet=True)
+    assert 'Operador desconocido: ??' in capsys.readouterr().out
+
+# Constantes como valores inmediatos (se leen de la memoria de constantes al cargar)
+
+def sin_constantes(vm):
+    vm.constant_memory[:] = [None] * len(vm.constant_memory)
+
+def test_operandos_constantes_al_cargar():
+    # x = 3 * 2; y = x + 3; y = -y
+    vm = cargar([('*', 17000, 17001, 12000), ('=', 12000, None, 1000), ('+', 1000, 17000, 12001),
+                 ('=', 12001, None, 1001), ('UMINUS', 1001, None, 1001), ('END', None, None, None)])
+    sin_constantes(vm)
+    assert vm.run(quiet=True)
+    assert vm.global_memory[:2] == [6, -9]
+
+def test_division_entre_cero_constante_al_ejecutar(capsys):
+    vm = cargar([('=', 17000, None, 1000), ('/', 1000, 17002, 13000), ('END', None, None, None)])
+    assert not vm.run(quiet=True)
+    out = capsys.readouterr().out
+    assert 'en cuádruplo 1' in out
+    assert 'División entre cero' in out
+    assert vm.global_memory[0] == 3
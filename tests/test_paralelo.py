@@ -0,0 +1,45 @@
+# Compilación paralela (--jobs): mismo programa que la compilación en un proceso, y
+# compilación secuencial cuando no hay CPUs de sobra o pocas funciones
+
+import main_virtual
+from main_virtual import CompilationContext, PARALLEL_MIN_FUNCTIONS, compilar_codigo
+from generador_programas import generar_programa
+
+def programa(funciones):
+    return generar_programa(functions=funciones, statements=8, depth=1, expression_length=2, recursion_depth=0)
+
+def compilar(codigo, jobs):
+    ctx = compilar_codigo(codigo, CompilationContext(quiet=True, jobs=jobs))
+    assert not ctx.diagnostics
+    return ctx
+
+def assert_mismo_programa(paralela, secuencial):
+    assert paralela.quadruples == secuencial.quadruples
+    assert paralela.constants_table == secuencial.constants_table
+    assert paralela.function_directory == secuencial.function_directory
+    assert paralela.memory_manager.get_memory_usage() == secuencial.memory_manager.get_memory_usage()
+
+def test_paralela_igual_a_secuencial(monkeypatch):
+    monkeypatch.setattr(main_virtual, 'available_cpus', lambda: 2)
+    codigo = programa(PARALLEL_MIN_FUNCTIONS * 2 + 3)
+    paralela = compilar(codigo, 2)
+    assert paralela.parallel_functions == PARALLEL_MIN_FUNCTIONS * 2 + 3
+    assert paralela.parallel_jobs == 2
+    assert_mismo_programa(paralela, compilar(codigo, 1))
+
+def test_un_cpu_compila_en_este_proceso(monkeypatch):
+    monkeypatch.setattr(main_virtual, 'available_cpus', lambda: 1)
+    codigo = programa(PARALLEL_MIN_FUNCTIONS * 4)
+    ctx = compilar(codigo, 4)
+    assert ctx.parallel_functions == 0
+    assert_mismo_programa(ctx, compilar(codigo, 1))
+
+def test_procesos_limitados_a_los_cpus(monkeypatch):
+    monkeypatch.setattr(main_virtual, 'available_cpus', lambda: 2)
+    ctx = compilar(programa(PARALLEL_MIN_FUNCTIONS * 2), 8)
+    assert ctx.parallel_jobs == 2
+
+def test_pocas_funciones_compila_en_este_proceso(monkeypatch):
+    monkeypatch.setattr(main_virtual, 'available_cpus', lambda: 4)
+    ctx = compilar(programa(PARALLEL_MIN_FUNCTIONS * 2 - 1), 2)
+    assert ctx.parallel_functions == 0
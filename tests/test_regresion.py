@@ -0,0 +1,47 @@
+# Regresión contra la versión original: cuádruplos de los programas de test_cases/ iguales
+# a los _intermediate.txt guardados y salida de la máquina virtual igual a la de
+# tests/esperado/ (capturada con la versión original; solo cambia la dirección de la
+# instrucción en runtime_04, por el orden en que ahora se asignan las variables).
+
+import glob
+import os
+import shutil
+
+import pytest
+
+from conftest import CASOS, RAIZ, caso, leer
+from main_virtual import CompilationContext, compilar_codigo, compile_and_run, save_intermediate_code
+
+ESPERADO = os.path.join(RAIZ, 'tests', 'esperado')
+
+# Programas con su código intermedio guardado junto a ellos
+CON_INTERMEDIO = sorted(path for path in glob.glob(os.path.join(CASOS, '*', '*.txt'))
+                        if not path.endswith('_intermediate.txt')
+                        and os.path.exists(path.replace('.txt', '_intermediate.txt')))
+
+# Salidas esperadas: <carpeta>_<programa>.txt
+SALIDAS = sorted(os.path.basename(path) for path in glob.glob(os.path.join(ESPERADO, '*.txt')))
+
+@pytest.mark.parametrize('path', CON_INTERMEDIO, ids=os.path.basename)
+def test_cuadruplos(path, tmp_path):
+    filename = shutil.copy(path, tmp_path)
+    ctx = compilar_codigo(leer(path), CompilationContext(quiet=True))
+    assert not ctx.diagnostics
+    save_intermediate_code(filename, ctx)
+    assert leer(filename.replace('.txt', '_intermediate.txt')) == leer(path.replace('.txt', '_intermediate.txt'))
+
+@pytest.mark.parametrize('salida', SALIDAS)
+def test_salida_de_la_maquina_virtual(salida, tmp_path, capsys):
+    carpeta, _, programa = salida.partition('_')
+    filename = shutil.copy(caso(carpeta, programa), tmp_path)
+    compile_and_run(filename, quiet=True)
+    assert capsys.readouterr().out == leer(os.path.join(ESPERADO, salida))
+
+def test_ast_se_libera_despues_de_compilar():
+    codigo = leer(caso('valid', '04_functions.txt'))
+    assert compilar_codigo(codigo, CompilationContext(quiet=True)).ast is None
+    ctx = CompilationContext(quiet=True)
+    ctx.keep_ast = True
+    program = compilar_codigo(codigo, ctx).ast
+    assert [type(func).__name__ for func in program.funcs] == ['Function'] * len(program.funcs)
+    assert program.funcs
@@ -0,0 +1,36 @@
+# Modo silencioso: sin reportes ni encabezados, errores como Diagnostic
+
+import shutil
+
+from conftest import caso
+from main_virtual import CompilationContext, Diagnostic, analizar_archivo, compile_and_run
+
+def copiar(tmp_path, *partes):
+    """Copia un caso de prueba a tmp_path (el _intermediate.txt se escribe junto al fuente)"""
+    return shutil.copy(caso(*partes), tmp_path)
+
+def test_compilar_y_ejecutar_solo_imprime_el_programa(tmp_path, capsys):
+    filename = copiar(tmp_path, 'valid', '01_arithmetic.txt')
+    assert compile_and_run(filename, quiet=True)
+    salida = capsys.readouterr().out
+    assert salida == "5 + 3 * 2 = 11\n(5 + 3) * 2 = 16\n10 / 4 = 2.5\n10 - 2 * 3 + 4 = 8\n"
+
+def test_sin_quiet_imprime_los_encabezados(tmp_path, capsys):
+    filename = copiar(tmp_path, 'valid', '01_arithmetic.txt')
+    assert compile_and_run(filename)
+    salida = capsys.readouterr().out
+    assert "EJECUCIÓN DEL PROGRAMA" in salida and "FIN DE LA EJECUCIÓN" in salida
+
+def test_errores_como_diagnosticos(tmp_path, capsys):
+    filename = copiar(tmp_path, 'errors', '02_undeclared.txt')
+    ctx = CompilationContext(quiet=True)
+    assert not analizar_archivo(filename, ctx)
+    assert capsys.readouterr().out == ''
+    assert ctx.diagnostics and all(type(d) is Diagnostic for d in ctx.diagnostics)
+    assert all(d.phase == 'semántico' and d.line is not None for d in ctx.diagnostics)
+
+def test_reportes_a_pedido(tmp_path, capsys):
+    filename = copiar(tmp_path, 'valid', '01_arithmetic.txt')
+    assert analizar_archivo(filename, quiet=True, reports=('quadruples',))
+    salida = capsys.readouterr().out
+    assert 'GOTOMAIN' in salida and 'CÓDIGO FUENTE' not in salida
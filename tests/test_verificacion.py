@@ -0,0 +1,27 @@
+# Modo de solo verificación (--check): mismos errores que la compilación completa, sin código
+
+import glob
+import os
+import shutil
+
+import pytest
+
+from conftest import CASOS, caso, leer
+from main_virtual import CompilationContext, analizar_archivo, compilar_codigo, verificar_codigo
+
+PROGRAMAS = sorted(path for path in glob.glob(os.path.join(CASOS, '*', '*.txt'))
+                   if not path.endswith('_intermediate.txt'))
+
+@pytest.mark.parametrize('path', PROGRAMAS, ids=os.path.basename)
+def test_mismos_diagnosticos_que_la_compilacion(path):
+    codigo = leer(path)
+    completa = compilar_codigo(codigo, CompilationContext(quiet=True))
+    verificacion = verificar_codigo(codigo)
+    assert [d.to_dict() for d in verificacion.diagnostics] == [d.to_dict() for d in completa.diagnostics]
+    assert verificacion.quadruples == []
+    assert verificacion.constants_table == {'int': {}, 'float': {}, 'string': {}}
+
+def test_no_escribe_codigo_intermedio(tmp_path):
+    filename = shutil.copy(caso('valid', '04_functions.txt'), tmp_path)
+    assert analizar_archivo(filename, quiet=True, check_only=True)
+    assert os.listdir(tmp_path) == ['04_functions.txt']